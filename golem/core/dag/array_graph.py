@@ -0,0 +1,378 @@
+from array import array
+from copy import deepcopy
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple, Type, TypeVar, Union
+
+from golem.core.dag.compact_graph import ENCODED_NODE_ATTRIBUTES, pack_uids, unpack_uids
+from golem.core.dag.graph import Graph, ReconnectType
+from golem.core.dag.graph_delegate import GraphDelegate
+from golem.core.dag.graph_node import GraphNode, _node_descriptive_id, _node_structural_hash, roots_structural_hash
+from golem.core.dag.linked_graph import LinkedGraph, NodePostprocessCallable
+from golem.core.dag.linked_graph_node import LinkedGraphNode, ParentNodes
+from golem.core.paths import copy_doc
+from golem.utilities.data_structures import ensure_wrapped_in_sequence
+
+# label id of the nodes without name in the content
+NO_LABEL = -1
+
+V = TypeVar('V')
+
+
+class GraphArrays:
+    """Structure of the graph nodes in the int32 arrays.
+
+    Parents of the i-th node are ``parent_ids[parent_offsets[i]:parent_offsets[i + 1]]`` (CSR format).
+    Node names are interned in ``labels`` and referenced by ``label_ids``, node parameters
+    and the rest of the content are kept in the side tables only for the nodes that have them.
+
+    Only ``LinkedGraphNode`` nodes without additional state can be stored (see `is_storable`).
+
+    Args:
+        nodes: nodes to store, all their parents must be among them
+    """
+
+    __slots__ = ('labels', 'label_ids', 'parent_offsets', 'parent_ids', 'params', 'contents',
+                 'node_classes', 'node_class_ids', 'uids')
+
+    def __init__(self, nodes: Sequence[LinkedGraphNode]):
+        node_ids = {id(node): i for i, node in enumerate(nodes)}
+        interned_labels: Dict[Hashable, int] = {}
+        interned_classes: Dict[type, int] = {}
+        self.labels: List[Any] = []
+        self.label_ids = array('i')
+        self.parent_offsets = array('i', [0])
+        self.parent_ids = array('i')
+        self.params: Dict[int, Any] = {}
+        self.contents: Dict[int, dict] = {}
+        self.node_classes: List[Type[LinkedGraphNode]] = []
+        self.node_class_ids = array('i')
+        for i, node in enumerate(nodes):
+            content = node.content
+            self.label_ids.append(_intern(content['name'], self.labels, interned_labels)
+                                  if 'name' in content else NO_LABEL)
+            if 'params' in content:
+                self.params[i] = content['params']
+            other_content = {key: value for key, value in content.items() if key not in ('name', 'params')}
+            if other_content:
+                self.contents[i] = other_content
+            self.node_class_ids.append(_intern(type(node), self.node_classes, interned_classes))
+            self.parent_ids.extend(node_ids[id(parent)] for parent in node.nodes_from)
+            self.parent_offsets.append(len(self.parent_ids))
+        self.uids = pack_uids([node.uid for node in nodes])
+
+    @staticmethod
+    def is_storable(nodes: Sequence[GraphNode]) -> bool:
+        """Checks if the nodes can be exactly restored from the arrays."""
+        node_ids = set(map(id, nodes))
+        return all(isinstance(node, LinkedGraphNode) and
+                   node.__dict__.keys() == ENCODED_NODE_ATTRIBUTES and
+                   all(id(parent) in node_ids for parent in node.nodes_from)
+                   for node in nodes)
+
+    def __len__(self) -> int:
+        return len(self.label_ids)
+
+    def restore_nodes(self) -> List[LinkedGraphNode]:
+        """Creates nodes from the arrays. Nodes take the parameters and contents of the side tables,
+        so the arrays mustn't be used after that."""
+        nodes = [self._new_node(i, uid) for i, uid in enumerate(unpack_uids(self.uids))]
+        parent_offsets = self.parent_offsets
+        for i, node in enumerate(nodes):
+            node._nodes_from = ParentNodes((nodes[parent_id]
+                                            for parent_id in self.parent_ids[parent_offsets[i]:parent_offsets[i + 1]]))
+        return nodes
+
+    def _new_node(self, i: int, uid: str) -> LinkedGraphNode:
+        label_id = self.label_ids[i]
+        content = {} if label_id == NO_LABEL else {'name': self.labels[label_id]}
+        if i in self.params:
+            content['params'] = self.params[i]
+        content.update(self.contents.get(i, ()))
+        node_class = self.node_classes[self.node_class_ids[i]]
+        # node state is restored directly, it consists only of the stored attributes
+        node = node_class.__new__(node_class)
+        node.content = content
+        node.uid = uid
+        return node
+
+    def node_labels(self) -> List[str]:
+        """Returns labels of the nodes (see `GraphNode.description`).
+        They're computed on the temporary parentless nodes, so the arrays stay usable."""
+        return [self._new_node(i, uid).description() for i, uid in enumerate(unpack_uids(self.uids))]
+
+    def root_ids(self) -> List[int]:
+        """Returns indices of the nodes without children in the order of the nodes."""
+        has_children = bytearray(len(self))
+        for parent_id in self.parent_ids:
+            has_children[parent_id] = 1
+        return [i for i, is_parent in enumerate(has_children) if not is_parent]
+
+    def fold_nodes(self, node_value: Callable[[str, Tuple[V, ...]], V]) -> Optional[List[V]]:
+        """Computes values of the nodes from their labels and the values of their parents
+        like `fold_preceding_nodes` does for the node objects.
+
+        Args:
+            node_value: computes value of the node from its label and values of its parents
+
+        Returns:
+            values of the nodes by their indices or None if the graph has cycles
+        """
+        nodes_num = len(self)
+        labels = self.node_labels()
+        parent_offsets, parent_ids = self.parent_offsets, self.parent_ids
+        children: List[List[int]] = [[] for _ in range(nodes_num)]
+        pending_parents = [parent_offsets[i + 1] - parent_offsets[i] for i in range(nodes_num)]
+        for child_id in range(nodes_num):
+            for parent_id in parent_ids[parent_offsets[child_id]:parent_offsets[child_id + 1]]:
+                children[parent_id].append(child_id)
+        values: List[Optional[V]] = [None] * nodes_num
+        ready_ids = [i for i, pending in enumerate(pending_parents) if not pending]
+        computed_num = 0
+        while ready_ids:
+            i = ready_ids.pop()
+            values[i] = node_value(labels[i], tuple(values[parent_id] for parent_id in
+                                                    parent_ids[parent_offsets[i]:parent_offsets[i + 1]]))
+            computed_num += 1
+            for child_id in children[i]:
+                pending_parents[child_id] -= 1
+                if not pending_parents[child_id]:
+                    ready_ids.append(child_id)
+        # nodes in the cycles and their descendants are never ready
+        return values if computed_num == nodes_num else None
+
+    def edges(self) -> List[Tuple[int, int]]:
+        """Returns edges of the graph as pairs of the parent and the child node indices."""
+        return [(parent_id, child_id)
+                for child_id in range(len(self))
+                for parent_id in self.parent_ids[self.parent_offsets[child_id]:self.parent_offsets[child_id + 1]]]
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+
+class ArrayGraph(Graph):
+    """Graph implementation that stores the structure of the graph in the compact arrays
+    (see ``GraphArrays``) instead of the linked node objects.
+
+    Node objects (``LinkedGraphNode``) are created from the arrays on the first access to the nodes
+    (e.g. by ``nodes``, ``root_nodes`` or the modifications), so the graph operators, mutations and verifiers
+    work with the graph as with ``LinkedGraph``. Queries that don't return nodes (``length``, ``depth``,
+    ``descriptive_id``, ``structural_hash`` and the comparison) are answered from the arrays of the packed graph.
+    `pack` returns the graph into the compact form dropping the node objects, it's done by the optimizer
+    for the evaluated graphs (see `pack_at_rest`). Copies and pickles of the graph are compact.
+
+    Args:
+        nodes: nodes of the Graph
+        postprocess_nodes: nodes postprocessing function used after their modification
+    """
+
+    def __init__(self, nodes: Union[GraphNode, Sequence[GraphNode]] = (),
+                 postprocess_nodes: Optional[NodePostprocessCallable] = None):
+        self._postprocess_nodes = postprocess_nodes or LinkedGraph._empty_postprocess
+        self._graph: Optional[LinkedGraph] = LinkedGraph(ensure_wrapped_in_sequence(nodes), self._postprocess)
+        self._arrays: Optional[GraphArrays] = None
+
+    @staticmethod
+    def from_graph(graph: Graph) -> 'ArrayGraph':
+        """Creates packed copy of the graph (e.g. ``LinkedGraph``).
+
+        Args:
+            graph: graph with ``LinkedGraphNode`` nodes without additional state
+        """
+        if not GraphArrays.is_storable(graph.nodes):
+            raise ValueError('Nodes of the graph can not be stored in the arrays.')
+        array_graph = ArrayGraph()
+        array_graph._graph = None
+        array_graph._arrays = deepcopy(GraphArrays(graph.nodes))
+        return array_graph
+
+    def to_linked_graph(self) -> LinkedGraph:
+        """Returns copy of the graph as ``LinkedGraph``."""
+        linked_graph = LinkedGraph(postprocess_nodes=self._postprocess_nodes)
+        if self._graph is None:
+            linked_graph.nodes = deepcopy(self._arrays).restore_nodes()
+        else:
+            linked_graph.nodes = deepcopy(list(self._graph.nodes))
+        return linked_graph
+
+    @property
+    def is_packed(self) -> bool:
+        return self._graph is None
+
+    @property
+    def arrays(self) -> GraphArrays:
+        """Returns arrays of the packed graph."""
+        self.pack()
+        return self._arrays
+
+    def pack(self):
+        """Stores the graph in the arrays dropping the node objects,
+        so the nodes obtained from the graph before don't belong to it anymore.
+        Raises ValueError if the nodes can't be stored."""
+        if self._graph is None:
+            return
+        if not GraphArrays.is_storable(self._graph.nodes):
+            raise ValueError('Nodes of the graph can not be stored in the arrays.')
+        self._arrays = GraphArrays(self._graph.nodes)
+        self._graph = None
+
+    @property
+    def _linked_graph(self) -> LinkedGraph:
+        if self._graph is None:
+            graph = LinkedGraph(postprocess_nodes=self._postprocess)
+            graph.nodes = self._arrays.restore_nodes()
+            self._graph = graph
+            self._arrays = None
+        return self._graph
+
+    def _postprocess(self, graph: LinkedGraph, nodes: Sequence[GraphNode]):
+        self._postprocess_nodes(self, nodes)
+
+    @copy_doc(Graph.add_node)
+    def add_node(self, node: GraphNode):
+        self._linked_graph.add_node(node)
+
+    @copy_doc(Graph.update_node)
+    def update_node(self, old_node: GraphNode, new_node: GraphNode):
+        self._linked_graph.update_node(old_node, new_node)
+
+    @copy_doc(Graph.update_subtree)
+    def update_subtree(self, old_subtree: GraphNode, new_subtree: GraphNode):
+        self._linked_graph.update_subtree(old_subtree, new_subtree)
+
+    @copy_doc(Graph.delete_node)
+    def delete_node(self, node: GraphNode, reconnect: ReconnectType = ReconnectType.single):
+        self._linked_graph.delete_node(node, reconnect)
+
+    @copy_doc(Graph.delete_subtree)
+    def delete_subtree(self, subtree: GraphNode):
+        self._linked_graph.delete_subtree(subtree)
+
+    @copy_doc(Graph.node_children)
+    def node_children(self, node: GraphNode) -> Sequence[Optional[GraphNode]]:
+        return self._linked_graph.node_children(node)
+
+    @copy_doc(Graph.connect_nodes)
+    def connect_nodes(self, node_parent: GraphNode, node_child: GraphNode):
+        self._linked_graph.connect_nodes(node_parent, node_child)
+
+    @copy_doc(Graph.disconnect_nodes)
+    def disconnect_nodes(self, node_parent: GraphNode, node_child: GraphNode,
+                         clean_up_leftovers: bool = False):
+        self._linked_graph.disconnect_nodes(node_parent, node_child, clean_up_leftovers)
+
+    @copy_doc(Graph.get_edges)
+    def get_edges(self) -> Sequence[Tuple[GraphNode, GraphNode]]:
+        return self._linked_graph.get_edges()
+
+    @copy_doc(Graph.__eq__)
+    def __eq__(self, other_graph: Graph) -> bool:
+        if isinstance(other_graph, Graph) and self.structural_hash != other_graph.structural_hash:
+            return False
+        return set(self._root_descriptive_ids()) == set(_root_descriptive_ids(other_graph))
+
+    def _root_descriptive_ids(self) -> List[str]:
+        if self._graph is None:
+            node_ids = self._arrays.fold_nodes(_node_descriptive_id)
+            if node_ids is not None:
+                return [node_ids[i] for i in self._arrays.root_ids()]
+        # ids of the nodes in the cycles depend on the path to them, so they're computed on the nodes
+        graph = self._graph if self._graph is not None else self.to_linked_graph()
+        return [root.descriptive_id for root in graph.root_nodes()]
+
+    def root_nodes(self) -> Sequence[GraphNode]:
+        return self._linked_graph.root_nodes()
+
+    @property
+    def nodes(self) -> List[GraphNode]:
+        return self._linked_graph.nodes
+
+    @nodes.setter
+    def nodes(self, new_nodes: List[GraphNode]):
+        self._linked_graph.nodes = new_nodes
+
+    @copy_doc(Graph.descriptive_id)
+    @property
+    def descriptive_id(self) -> str:
+        if self._graph is not None:
+            return self._graph.descriptive_id
+        if not len(self._arrays):
+            return 'EMPTY'
+        node_ids = self._arrays.fold_nodes(_node_descriptive_id)
+        if node_ids is None:
+            return self.to_linked_graph().descriptive_id
+        return ''.join(node_ids[i] for i in self._arrays.root_ids())
+
+    @copy_doc(Graph.structural_hash)
+    @property
+    def structural_hash(self) -> int:
+        if self._graph is not None:
+            return self._graph.structural_hash
+        node_hashes = self._arrays.fold_nodes(_node_structural_hash)
+        if node_hashes is None:
+            return self.to_linked_graph().structural_hash
+        return roots_structural_hash(node_hashes[i] for i in self._arrays.root_ids())
+
+    @copy_doc(Graph.depth)
+    @property
+    def depth(self) -> int:
+        if self._graph is not None:
+            return self._graph.depth
+        if not len(self._arrays):
+            return 0
+        depths = self._arrays.fold_nodes(lambda _, parent_depths: max(parent_depths, default=0) + 1)
+        return max(depths) if depths is not None else -1
+
+    @copy_doc(Graph.length)
+    @property
+    def length(self) -> int:
+        return len(self._arrays) if self._graph is None else self._graph.length
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        if self._graph is not None and GraphArrays.is_storable(self._graph.nodes):
+            state['_graph'] = None
+            state['_arrays'] = GraphArrays(self._graph.nodes)
+        return state
+
+
+def pack_at_rest(graph: Graph):
+    """Packs the graph stored in the arrays (``ArrayGraph`` or ``GraphDelegate`` with it) that isn't modified
+    anymore, e.g. the evaluated graph kept in the population and the history.
+    Graphs with the nodes that can't be stored in the arrays and the other graphs are kept as is.
+
+    Args:
+        graph: graph to pack
+    """
+    if isinstance(graph, GraphDelegate):
+        graph = graph.operator
+    if isinstance(graph, ArrayGraph):
+        try:
+            graph.pack()
+        except ValueError:
+            pass
+
+
+def _root_descriptive_ids(graph: Graph) -> List[str]:
+    operator = graph.operator if isinstance(graph, GraphDelegate) else graph
+    if isinstance(operator, ArrayGraph):
+        return operator._root_descriptive_ids()
+    return [root.descriptive_id for root in graph.root_nodes()]
+
+
+def _intern(value: Any, values: List[Any], interned_ids: Dict[Hashable, int]) -> int:
+    # type distinguishes equal values of different types (e.g. 1 and True)
+    key = (type(value), value)
+    try:
+        value_id = interned_ids.get(key)
+    except TypeError:
+        # unhashable values are stored as is
+        values.append(value)
+        return len(values) - 1
+    if value_id is None:
+        value_id = interned_ids[key] = len(values)
+        values.append(value)
+    return value_id
@@ -0,0 +1,206 @@
+import pickle
+import struct
+from array import array
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Union
+
+from golem.core.dag.graph import Graph
+from golem.core.dag.graph_delegate import GraphDelegate
+from golem.core.dag.linked_graph import LinkedGraph
+from golem.core.dag.linked_graph_node import LINKED_NODE_ATTRIBUTES, LinkedGraphNode, ParentNodes
+
+UUID_BYTES_LENGTH = 16
+ENCODED_NODE_ATTRIBUTES = LINKED_NODE_ATTRIBUTES
+# header of the binary form: numbers of nodes and parent ids, whether uids are packed, sizes of uids and contents
+BINARY_HEADER = struct.Struct('=5i')
+ARRAY_TYPECODE = 'i'
+
+
+class CompactGraph:
+    """Compact array-based encoding of the graph structure that is cheap to pickle.
+    It's used for sending graphs between the processes (e.g. to evaluation workers).
+
+    The structure is kept in flat integer arrays: parents of the i-th node are
+    ``parent_ids[parent_offsets[i]:parent_offsets[i + 1]]``. Node contents are interned,
+    so the equal contents of different nodes are stored only once.
+    Node uids are packed into bytes if they are UUIDs.
+
+    Only ``GraphDelegate`` graphs of ``LinkedGraphNode`` nodes without additional state are
+    encoded exactly, use `encode_graph` to encode the graph only if it's possible.
+
+    Args:
+        graph: graph to encode
+    """
+
+    __slots__ = ('contents', 'content_ids', 'parent_offsets', 'parent_ids', 'uids')
+
+    def __init__(self, graph: GraphDelegate):
+        nodes = graph.nodes
+        node_ids = {id(node): i for i, node in enumerate(nodes)}
+        contents: List[dict] = []
+        interned_content_ids: Dict[Hashable, int] = {}
+
+        self.content_ids = array(ARRAY_TYPECODE)
+        self.parent_offsets = array(ARRAY_TYPECODE, [0])
+        self.parent_ids = array(ARRAY_TYPECODE)
+        for node in nodes:
+            self.content_ids.append(_intern_content(node.content, contents, interned_content_ids))
+            self.parent_ids.extend(node_ids[id(parent)] for parent in node.nodes_from)
+            self.parent_offsets.append(len(self.parent_ids))
+        self.contents = contents
+        self.uids = pack_uids([node.uid for node in nodes])
+
+    @staticmethod
+    def is_encodable(graph: Graph) -> bool:
+        """Checks if the graph can be exactly restored from the compact encoding."""
+        if type(graph) is not GraphDelegate or type(graph.operator) is not LinkedGraph:
+            return False
+        if graph.operator._postprocess_nodes is not LinkedGraph._empty_postprocess:
+            return False
+        node_ids = set(map(id, graph.nodes))
+        return all(type(node) is LinkedGraphNode and
+                   node.__dict__.keys() == ENCODED_NODE_ATTRIBUTES and
+                   all(id(parent) in node_ids for parent in node.nodes_from)
+                   for node in graph.nodes)
+
+    def decode(self) -> GraphDelegate:
+        uids = unpack_uids(self.uids)
+        used_contents = set()
+        nodes = []
+        for content_id, uid in zip(self.content_ids, uids):
+            content = self.contents[content_id]
+            if content_id in used_contents:
+                # nodes must not share mutable content; only interned contents can be repeated
+                content = _copy_content(content)
+            used_contents.add(content_id)
+            # node state is restored directly, it consists only of the encoded attributes
+            node = LinkedGraphNode.__new__(LinkedGraphNode)
+            node.content = content
+            node.uid = uid
+            nodes.append(node)
+        parent_offsets = self.parent_offsets
+        for i, node in enumerate(nodes):
+            node._nodes_from = ParentNodes((nodes[parent_id]
+                                            for parent_id in self.parent_ids[parent_offsets[i]:parent_offsets[i + 1]]))
+        graph = GraphDelegate()
+        graph.nodes = nodes
+        return graph
+
+    def to_buffers(self) -> List[Union[bytes, memoryview]]:
+        """Returns the binary form of the encoding as the sequence of buffers to write one after another.
+        Structure arrays are written as is, so they are read back without copying (see `from_buffer`).
+        Its size is a multiple of the array item size, so the binary forms can be written one after another."""
+        uids_packed = isinstance(self.uids, bytes)
+        uids = self.uids if uids_packed else pickle.dumps(self.uids, protocol=pickle.HIGHEST_PROTOCOL)
+        contents = pickle.dumps(self.contents, protocol=pickle.HIGHEST_PROTOCOL)
+        header = BINARY_HEADER.pack(len(self.content_ids), len(self.parent_ids), uids_packed, len(uids), len(contents))
+        buffers = [header] + [memoryview(values).cast('B')
+                              for values in (self.content_ids, self.parent_offsets, self.parent_ids)]
+        buffers += [uids, contents]
+        padding = -sum(map(len, buffers)) % self.content_ids.itemsize
+        return buffers + [bytes(padding)] if padding else buffers
+
+    @staticmethod
+    def from_buffer(buffer: memoryview) -> 'CompactGraph':
+        """Reads the binary form written by `to_buffers`.
+        Structure arrays are the views of the buffer, call `release` when the encoding is no longer needed,
+        the buffer can't be released before that."""
+        buffer = memoryview(buffer).cast('B')
+        nodes_num, parent_ids_num, uids_packed, uids_size, contents_size = BINARY_HEADER.unpack_from(buffer)
+        compact_graph = CompactGraph.__new__(CompactGraph)
+        offset = BINARY_HEADER.size
+        for slot, length in (('content_ids', nodes_num), ('parent_offsets', nodes_num + 1),
+                             ('parent_ids', parent_ids_num)):
+            size = length * array(ARRAY_TYPECODE).itemsize
+            setattr(compact_graph, slot, buffer[offset:offset + size].cast(ARRAY_TYPECODE))
+            offset += size
+        uids = buffer[offset:offset + uids_size]
+        compact_graph.uids = bytes(uids) if uids_packed else pickle.loads(uids)
+        offset += uids_size
+        compact_graph.contents = pickle.loads(buffer[offset:offset + contents_size])
+        return compact_graph
+
+    def release(self):
+        """Releases the views of the buffer the encoding was read from with `from_buffer`."""
+        for slot in ('content_ids', 'parent_offsets', 'parent_ids'):
+            values = getattr(self, slot)
+            if isinstance(values, memoryview):
+                values.release()
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __setstate__(self, state):
+        for slot, value in zip(self.__slots__, state):
+            setattr(self, slot, value)
+
+
+def encode_graph(graph: Optional[Graph]) -> Union[CompactGraph, Graph, None]:
+    """Returns compact encoding of the graph if it's possible, otherwise the graph itself."""
+    if graph is not None and CompactGraph.is_encodable(graph):
+        return CompactGraph(graph)
+    return graph
+
+
+def decode_graph(graph: Union[CompactGraph, Graph, None]) -> Optional[Graph]:
+    """Restores the graph encoded with `encode_graph`. Not encoded graphs are returned as is."""
+    if isinstance(graph, CompactGraph):
+        return graph.decode()
+    return graph
+
+
+def _intern_content(content: dict, contents: List[dict], interned_content_ids: Dict[Hashable, int]) -> int:
+    try:
+        key = _freeze(content)
+    except TypeError:
+        key = None  # unhashable content is stored as is
+    content_id = interned_content_ids.get(key) if key is not None else None
+    if content_id is None:
+        content_id = len(contents)
+        contents.append(content)
+        if key is not None:
+            interned_content_ids[key] = content_id
+    return content_id
+
+
+def _freeze(value: Any) -> Hashable:
+    """Returns hashable representation of the value that distinguishes types of values.
+    Raises TypeError if the value (or any of its items) is not hashable."""
+    if isinstance(value, dict):
+        return dict, tuple(sorted((_freeze(key), _freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_freeze(item) for item in value)
+    hash(value)
+    return type(value), value
+
+
+def _copy_content(value: Any) -> Any:
+    """Copies interned content that consists of containers and hashable values."""
+    if isinstance(value, dict):
+        return {key: _copy_content(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_content(item) for item in value]
+    if isinstance(value, tuple):
+        return tuple(_copy_content(item) for item in value)
+    return value
+
+
+def pack_uids(uids: Sequence[str]) -> Union[bytes, List[str]]:
+    """Packs UUID uids into bytes, other uids are kept as is."""
+    try:
+        packed_uids = bytes.fromhex(''.join(uids).replace('-', ''))
+    except (ValueError, TypeError):
+        return list(uids)
+    # uids must be restored exactly in the same form
+    if len(packed_uids) != len(uids) * UUID_BYTES_LENGTH or unpack_uids(packed_uids) != uids:
+        return list(uids)
+    return packed_uids
+
+
+def unpack_uids(uids: Union[bytes, List[str]]) -> List[str]:
+    """Restores uids packed with `pack_uids`."""
+    if not isinstance(uids, bytes):
+        return uids
+    hex_uids = uids.hex()
+    return [f'{hex_uids[i:i + 8]}-{hex_uids[i + 8:i + 12]}-{hex_uids[i + 12:i + 16]}-'
+            f'{hex_uids[i + 16:i + 20]}-{hex_uids[i + 20:i + 32]}'
+            for i in range(0, len(hex_uids), 2 * UUID_BYTES_LENGTH)]
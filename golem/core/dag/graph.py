@@ -1,11 +1,12 @@
 from abc import ABC, abstractmethod
+from copy import deepcopy
 from enum import Enum
 from os import PathLike
 from typing import Any, Callable, Dict, List, Literal, Optional, Sequence, Tuple, TypeVar, Union
 
 import networkx as nx
 
-from golem.core.dag.graph_node import GraphNode
+from golem.core.dag.graph_node import GraphNode, graph_structural_hash
 from golem.visualisation.graph_viz import GraphVisualizer, NodeColorType
 
 NodeType = TypeVar('NodeType', bound=GraphNode, covariant=False, contravariant=False)
@@ -273,6 +274,35 @@ class Graph(ABC):
         else:
             return sorted(self.nodes, key=lambda x: x.uid)[0].descriptive_id
 
+    @property
+    def structural_hash(self) -> int:
+        """Returns fixed-size hash of the graph structure and the nodes labels.
+        Equal graphs have equal hashes, so it can be used for the fast check of inequality
+        and as the key for the deduplication of the graphs.
+
+        Returns:
+            int: 128-bit hash of the graph
+        """
+        return graph_structural_hash(self.root_nodes())
+
+    def clone(self) -> 'Graph':
+        """Returns copy of the graph for modification, e.g. by the evolutionary operators.
+
+        It's a fast structural copy that is cheaper than ``deepcopy``: every node is copied
+        (see `_clone_nodes`), but the copies share the immutable values of their contents
+        (e.g. names and numeric parameters) with the nodes of this graph.
+        Nodes aren't shared between the graphs, so there's no copy-on-write.
+
+        Returns:
+            Graph: copy of the graph
+        """
+        return deepcopy(self, self._clone_nodes())
+
+    def _clone_nodes(self) -> Dict[int, Any]:
+        """Returns copies of the graph nodes by the ids of the nodes that are used by `clone`
+        as the memo of ``deepcopy``. Nodes that aren't in the result are deep-copied."""
+        return {}
+
     def __str__(self):
         return str(self.graph_description)
 
@@ -1,4 +1,4 @@
-from typing import Union, Sequence, List, Optional, Tuple, Type
+from typing import Any, Dict, Union, Sequence, List, Optional, Tuple, Type
 
 from golem.core.dag.graph import Graph, ReconnectType
 from golem.core.dag.graph_node import GraphNode
@@ -73,6 +73,10 @@ class GraphDelegate(Graph):
     def descriptive_id(self):
         return self.operator.descriptive_id
 
+    @property
+    def structural_hash(self) -> int:
+        return self.operator.structural_hash
+
     @property
     def length(self) -> int:
         return self.operator.length
@@ -80,3 +84,6 @@ class GraphDelegate(Graph):
     @property
     def depth(self) -> int:
         return self.operator.depth
+
+    def _clone_nodes(self) -> Dict[int, Any]:
+        return self.operator._clone_nodes()
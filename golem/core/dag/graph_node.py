@@ -1,8 +1,15 @@
 from abc import ABC, abstractmethod
 from copy import copy
-from typing import List, Optional, Iterable
+from hashlib import blake2b
+from typing import Any, Callable, Dict, List, Optional, Iterable, Sequence, Set, Tuple, TypeVar
 from uuid import uuid4
 
+STRUCTURAL_HASH_BYTES = 16
+
+V = TypeVar('V')
+# label of the node, values of its parents and the value of the node
+NodeValueCache = Tuple[str, Tuple[Any, ...], Any]
+
 
 class GraphNode(ABC):
     """Definition of the node in directed graph structure.
@@ -73,13 +80,161 @@ class GraphNode(ABC):
         Returns:
             str: text description of the content in the node and its parameters
         """
-        return descriptive_id_recursive(self)
+        return descriptive_id_iterative(self)
+
+    @property
+    def structural_hash(self) -> int:
+        """Returns fixed-size hash of the subgraph starting at this node.
+        Nodes with equal descriptive ids have equal hashes.
+
+        Returns:
+            int: 128-bit hash of the node labels and the structure of the preceding nodes
+        """
+        return structural_hashes([self])[0]
+
+    def _get_cached_value(self, key: str) -> Optional[NodeValueCache]:
+        """Returns value of the node cached by `fold_preceding_nodes` with the ``key``.
+        ``None`` means that the cache is invalidated or isn't supported by the node.
+
+        Args:
+            key: kind of the cached value
+
+        Returns:
+            Optional[NodeValueCache]: label of the node, values of its parents and the value of the node
+        """
+        return None
+
+    def _cache_value(self, key: str, cache: NodeValueCache):
+        """Caches value of the node computed by `fold_preceding_nodes` with the ``key``.
+
+        Args:
+            key: kind of the cached value
+            cache: label of the node, values of its parents and the value of the node
+        """
+        pass
+
+
+def fold_preceding_nodes(nodes: Sequence[GraphNode], key: str,
+                         node_value: Callable[[str, Tuple[V, ...]], V]) -> Tuple[Dict[int, V], Set[int]]:
+    """Computes values of the nodes from the labels of the nodes and the values of their parents
+    visiting each preceding node once.
+
+    Values are computed only for the nodes without cycles among their preceding nodes.
+    They're taken from the node cache if the label of the node and the values of its parents
+    are unchanged since the caching.
+
+    Args:
+        nodes: nodes to start from
+        key: kind of the computed values for the node cache
+        node_value: computes value of the node from its label and values of its parents
+
+    Returns:
+        values of the nodes by ``id`` of the nodes and ``id`` of the nodes with cycles among preceding nodes
+    """
+    node_values: Dict[int, V] = {}
+    cycled_nodes: Set[int] = set()
+    for start_node in nodes:
+        if id(start_node) in node_values or id(start_node) in cycled_nodes:
+            continue
+        stack = [(start_node, iter(start_node.nodes_from))]
+        on_stack = {id(start_node)}
+        while stack:
+            node, parents = stack[-1]
+            for parent in parents:
+                parent_key = id(parent)
+                if parent_key in on_stack or parent_key in cycled_nodes:
+                    # node and all the nodes on the stack are the descendants of the cycle
+                    cycled_nodes.update(on_stack)
+                elif parent_key not in node_values:
+                    stack.append((parent, iter(parent.nodes_from)))
+                    on_stack.add(parent_key)
+                    break
+            else:
+                stack.pop()
+                on_stack.discard(id(node))
+                if id(node) not in cycled_nodes:
+                    node_values[id(node)] = _fold_node(node, key, node_values, node_value)
+    return node_values, cycled_nodes
+
+
+def _fold_node(node: GraphNode, key: str, node_values: Dict[int, V],
+               node_value: Callable[[str, Tuple[V, ...]], V]) -> V:
+    node_label = node.description()
+    parent_values = tuple(node_values[id(parent)] for parent in node.nodes_from)
+    cache = node._get_cached_value(key)
+    if cache is not None and cache[0] == node_label and cache[1] == parent_values:
+        return cache[2]
+    value = node_value(node_label, parent_values)
+    node._cache_value(key, (node_label, parent_values, value))
+    return value
+
+
+def descriptive_id_iterative(current_node: GraphNode) -> str:
+    """Returns descriptive id with nodes names (the same as `descriptive_id_recursive`)
+    visiting each preceding node once."""
+    node_ids, cycled_nodes = fold_preceding_nodes([current_node], 'descriptive_id', _node_descriptive_id)
+    if id(current_node) in cycled_nodes:
+        # ids of the nodes in the cycles depend on the path to them
+        return _descriptive_id_recursive(current_node, [], node_ids)
+    return node_ids[id(current_node)]
+
+
+def _node_descriptive_id(node_label: str, parent_ids: Tuple[str, ...]) -> str:
+    full_path = f'/{node_label}'
+    if parent_ids:
+        previous_items = sorted(f'{parent_id};' for parent_id in parent_ids)
+        full_path = f'({";".join(previous_items)}){full_path}'
+    return full_path
+
+
+def structural_hashes(nodes: Sequence[GraphNode]) -> List[int]:
+    """Returns structural hashes of the nodes (see `GraphNode.structural_hash`).
+
+    Hash of the node is computed from its label and the sorted hashes of its parents, like in the
+    Weisfeiler-Lehman refinement directed to the parents, so it's a hash of the descriptive id
+    that doesn't require to build it. Hashes of the nodes with cycles among the preceding nodes
+    are computed from their descriptive ids.
+    """
+    node_hashes, cycled_nodes = fold_preceding_nodes(nodes, 'structural_hash', _node_structural_hash)
+    return [node_hashes[id(node)] if id(node) not in cycled_nodes
+            else _combine_hashes(descriptive_id_iterative(node), ())
+            for node in nodes]
+
+
+def _node_structural_hash(node_label: str, parent_hashes: Tuple[int, ...]) -> int:
+    return _combine_hashes(node_label, sorted(parent_hashes))
+
+
+def _combine_hashes(label: str, hashes: Iterable[int]) -> int:
+    node_hash = blake2b(label.encode(), digest_size=STRUCTURAL_HASH_BYTES)
+    for parent_hash in hashes:
+        node_hash.update(parent_hash.to_bytes(STRUCTURAL_HASH_BYTES, 'big'))
+    return int.from_bytes(node_hash.digest(), 'big')
+
+
+def graph_structural_hash(root_nodes: Sequence[GraphNode]) -> int:
+    """Returns structural hash of the graph by its root nodes.
+    Graphs with equal sets of root descriptive ids have equal hashes."""
+    return roots_structural_hash(structural_hashes(root_nodes))
+
+
+def roots_structural_hash(root_hashes: Iterable[int]) -> int:
+    """Returns structural hash of the graph by the structural hashes of its root nodes."""
+    return _combine_hashes('graph', sorted(set(root_hashes)))
 
 
 def descriptive_id_recursive(current_node: GraphNode, visited_nodes=None) -> str:
     """ Returns descriptive id with nodes names. """
-    if visited_nodes is None:
-        visited_nodes = []
+    return _descriptive_id_recursive(current_node, visited_nodes if visited_nodes is not None else [], {})
+
+
+def _descriptive_id_recursive(current_node: GraphNode, visited_nodes: List[GraphNode],
+                              known_ids: Dict[int, str]) -> str:
+    """Implements `descriptive_id_recursive` using already known ids of the nodes without cycles
+    among their preceding nodes, because they don't depend on the path to the node."""
+    known_id = known_ids.get(id(current_node))
+    if known_id is not None:
+        return known_id
 
     node_label = current_node.description()
 
@@ -90,7 +245,7 @@ def descriptive_id_recursive(current_node: GraphNode, visited_nodes=None) -> str
     if current_node.nodes_from:
         previous_items = []
         for parent_node in current_node.nodes_from:
-            previous_items.append(f'{descriptive_id_recursive(parent_node, copy(visited_nodes))};')
+            previous_items.append(f'{_descriptive_id_recursive(parent_node, copy(visited_nodes), known_ids)};')
         previous_items.sort()
         previous_items_str = ';'.join(previous_items)
 
@@ -1,4 +1,5 @@
-from typing import Sequence, List, TYPE_CHECKING, Callable, Union, Optional
+from typing import Sequence, List, TYPE_CHECKING, Callable, Union, Optional, Dict, Generic, Iterable, Iterator, \
+    Tuple, TypeVar
 
 from golem.utilities.data_structures import ensure_wrapped_in_sequence
 
@@ -6,6 +7,8 @@ if TYPE_CHECKING:
     from golem.core.dag.graph import Graph
     from golem.core.dag.graph_node import GraphNode
 
+T = TypeVar('T')
+
 
 def distance_to_root_level(graph: 'Graph', node: 'GraphNode') -> int:
     """Gets distance to the final output node
@@ -266,3 +269,63 @@ def get_connected_components(graph: 'Graph', nodes: Optional[List['GraphNode']])
             visited.update(c)
             components.append(c)
     return components
+
+
+class GraphDict(Generic[T]):
+    """Insertion ordered dict with the graphs as the keys, equal graphs are the same key.
+
+    Graphs are looked up by their structural hashes (see ``Graph.structural_hash``),
+    so they're compared only if the hashes are equal.
+    Graphs mustn't be modified while they're the keys of the dict.
+
+    Args:
+        items: pairs of the graphs and the values
+    """
+
+    def __init__(self, items: Iterable[Tuple['Graph', T]] = ()):
+        self._indices_by_hash: Dict[int, List[int]] = {}
+        self._keys: List['Graph'] = []
+        self._values: List[T] = []
+        for graph, value in items:
+            self[graph] = value
+
+    def _find(self, graph: 'Graph') -> Tuple[int, Optional[int]]:
+        graph_hash = graph.structural_hash
+        for index in self._indices_by_hash.get(graph_hash, ()):
+            if self._keys[index] == graph:
+                return graph_hash, index
+        return graph_hash, None
+
+    def __contains__(self, graph: 'Graph') -> bool:
+        return self._find(graph)[1] is not None
+
+    def __getitem__(self, graph: 'Graph') -> T:
+        index = self._find(graph)[1]
+        if index is None:
+            raise KeyError(graph)
+        return self._values[index]
+
+    def get(self, graph: 'Graph', default: Optional[T] = None) -> Optional[T]:
+        index = self._find(graph)[1]
+        return default if index is None else self._values[index]
+
+    def __setitem__(self, graph: 'Graph', value: T):
+        graph_hash, index = self._find(graph)
+        if index is not None:
+            self._values[index] = value
+            return
+        self._indices_by_hash.setdefault(graph_hash, []).append(len(self._keys))
+        self._keys.append(graph)
+        self._values.append(value)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self) -> Iterator['Graph']:
+        return iter(self._keys)
+
+    def values(self) -> List[T]:
+        return list(self._values)
+
+    def items(self) -> List[Tuple['Graph', T]]:
+        return list(zip(self._keys, self._values))
@@ -1,5 +1,5 @@
 from copy import deepcopy
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, Callable, Sequence
 
 from networkx import graph_edit_distance, set_node_attributes
 
@@ -7,12 +7,124 @@ from golem.core.dag.convert import graph_structure_as_nx_graph
 from golem.core.dag.graph import Graph, ReconnectType
 from golem.core.dag.graph_node import GraphNode
 from golem.core.dag.graph_utils import ordered_subnodes_hierarchy, node_depth, graph_has_cycle
+from golem.core.dag.linked_graph_node import ParentNodes, clone_nodes
 from golem.core.paths import copy_doc
-from golem.utilities.data_structures import ensure_wrapped_in_sequence, Copyable, remove_items
+from golem.utilities.data_structures import ensure_wrapped_in_sequence, Copyable, remove_items, \
+    ObservableListMixin, list_difference
 
 NodePostprocessCallable = Callable[[Graph, Sequence[GraphNode]], Any]
 
 
+class _ChildrenIndex:
+    """Reverse adjacency of the graph nodes: children of each node by ``id`` of the node.
+
+    Index observes the parent lists (see ``ParentNodes``) of the indexed nodes and is updated
+    only for the changed edges, whatever way they are changed: by the graph methods or directly.
+    Nodes are indexed by identity, so the changes of the node attributes (e.g. ``uid``) don't affect it.
+    Index becomes invalid if some node keeps its parents in the list that can't be observed
+    or that is shared with another node.
+
+    Args:
+        nodes: nodes of the graph
+    """
+
+    def __init__(self, nodes: Sequence[GraphNode]):
+        # children are kept in the insertion ordered dicts by their ids
+        self.children: Dict[int, Dict[int, GraphNode]] = {}
+        # number of occurrences of the nodes in the graph nodes by their ids
+        self.nodes_count: Dict[int, int] = {}
+        self._nodes_by_parents: Dict[int, GraphNode] = {}
+        self.is_valid = True
+        for node in nodes:
+            self.add_node(node)
+
+    def add_node(self, node: GraphNode):
+        if not self.is_valid:
+            return
+        count = self.nodes_count.get(id(node), 0)
+        self.nodes_count[id(node)] = count + 1
+        if count:
+            return
+        parents = node.nodes_from
+        if not isinstance(parents, ParentNodes) or id(parents) in self._nodes_by_parents:
+            self.is_valid = False
+            return
+        self._nodes_by_parents[id(parents)] = node
+        parents.add_observer(self)
+        for parent in parents:
+            self._add_edge(parent, node)
+
+    def remove_node(self, node: GraphNode):
+        if not self.is_valid:
+            return
+        count = self.nodes_count.get(id(node), 0)
+        if count > 1:
+            self.nodes_count[id(node)] = count - 1
+            return
+        elif not count:
+            return
+        del self.nodes_count[id(node)]
+        parents = node.nodes_from
+        del self._nodes_by_parents[id(parents)]
+        parents.remove_observer(self)
+        for parent in parents:
+            self._remove_edge(parent, node)
+
+    def on_parents_changed(self, parents: ParentNodes, removed: Sequence[GraphNode], added: Sequence[GraphNode],
+                           replaced: Optional[ParentNodes] = None):
+        if not self.is_valid:
+            return
+        if replaced is not None:
+            node = self._nodes_by_parents.pop(id(replaced), None)
+            if node is not None:
+                self._nodes_by_parents[id(parents)] = node
+        else:
+            node = self._nodes_by_parents.get(id(parents))
+        if node is None:
+            return
+        for parent in removed:
+            self._remove_edge(parent, node)
+        for parent in added:
+            self._add_edge(parent, node)
+
+    def _add_edge(self, parent: GraphNode, child: GraphNode):
+        self.children.setdefault(id(parent), {})[id(child)] = child
+
+    def _remove_edge(self, parent: GraphNode, child: GraphNode):
+        children = self.children.get(id(parent))
+        if children is None:
+            return
+        children.pop(id(child), None)
+        if not children:
+            del self.children[id(parent)]
+
+
+class _GraphNodes(ObservableListMixin, list):
+    """List of the graph nodes that keeps the children index of the graph actual.
+    Index isn't copied with the list and is built on demand."""
+
+    def __init__(self, iterable: Iterable[GraphNode] = ()):
+        super().__init__(iterable)
+        self.children_index: Optional[_ChildrenIndex] = None
+
+    def _on_change(self, removed: Sequence[GraphNode], added: Sequence[GraphNode]):
+        index = self.children_index
+        if index is None:
+            return
+        if not index.is_valid:
+            # the changed nodes may be indexed, so the index is built again on demand
+            self.children_index = None
+            return
+        for node in removed:
+            index.remove_node(node)
+        for node in added:
+            index.add_node(node)
+
+    def __reduce_ex__(self, protocol):
+        # items are restored after the list, so the nodes of the cyclic graphs can be restored
+        return _GraphNodes, (), None, iter(self)
+
+
 class LinkedGraph(Graph, Copyable):
     """Graph implementation based on linked graph node
     that directly stores its parent nodes.
@@ -24,7 +136,7 @@ class LinkedGraph(Graph, Copyable):
 
     def __init__(self, nodes: Union[GraphNode, Sequence[GraphNode]] = (),
                  postprocess_nodes: Optional[NodePostprocessCallable] = None):
-        self._nodes = []
+        self._nodes = _GraphNodes()
         for node in ensure_wrapped_in_sequence(nodes):
             self.add_node(node)
         self._postprocess_nodes = postprocess_nodes or self._empty_postprocess
@@ -59,7 +171,7 @@ class LinkedGraph(Graph, Copyable):
     @copy_doc(Graph.delete_subtree)
     def delete_subtree(self, subtree: GraphNode):
         subtree_nodes = ordered_subnodes_hierarchy(subtree)
-        self._nodes = remove_items(self._nodes, subtree_nodes)
+        self._set_nodes(remove_items(self._nodes, subtree_nodes))
         # prune all edges coming from the removed subtree
         for subtree in self._nodes:
             subtree.nodes_from = remove_items(subtree.nodes_from, subtree_nodes)
@@ -75,7 +187,7 @@ class LinkedGraph(Graph, Copyable):
 
     @copy_doc(Graph.update_subtree)
     def update_subtree(self, old_subtree: GraphNode, new_subtree: GraphNode):
-        new_subtree = deepcopy(new_subtree)
+        new_subtree = deepcopy(new_subtree, clone_nodes([new_subtree]))
         self.actualise_old_node_children(old_subtree, new_subtree)
         self.delete_subtree(old_subtree)
         self.add_node(new_subtree)
@@ -83,10 +195,17 @@ class LinkedGraph(Graph, Copyable):
 
     @copy_doc(Graph.add_node)
     def add_node(self, node: GraphNode):
-        if node not in self._nodes:
-            self._nodes.append(node)
-            for n in node.nodes_from:
-                self.add_node(n)
+        index = self._children_index()
+        known_nodes = index.nodes_count if index is not None else set(map(id, self._nodes))
+        new_nodes = {}
+        # preceding nodes are added in the depth-first order
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if id(node) not in known_nodes and id(node) not in new_nodes:
+                new_nodes[id(node)] = node
+                stack.extend(reversed(node.nodes_from))
+        self._nodes.extend(new_nodes.values())
 
     def actualise_old_node_children(self, old_node: GraphNode, new_node: GraphNode):
         """Changes parent of ``old_node`` children to ``new_node``
@@ -102,11 +221,37 @@ class LinkedGraph(Graph, Copyable):
     def sort_nodes(self):
         """ Layer by layer sorting """
         if not isinstance(self.root_node, Sequence) and not graph_has_cycle(self):
-            self._nodes = ordered_subnodes_hierarchy(self.root_node)
+            self._set_nodes(ordered_subnodes_hierarchy(self.root_node))
+
+    def _children_index(self) -> Optional[_ChildrenIndex]:
+        """Returns the children index of the graph nodes building it on demand
+        or ``None`` if the nodes can't be indexed."""
+        nodes = self._nodes
+        if type(nodes) is not _GraphNodes:
+            # graph was restored with the plain list of nodes
+            nodes = self._nodes = _GraphNodes(nodes)
+        if nodes.children_index is None:
+            nodes.children_index = _ChildrenIndex(nodes)
+        return nodes.children_index if nodes.children_index.is_valid else None
+
+    def _set_nodes(self, new_nodes: Iterable[GraphNode]):
+        """Replaces the graph nodes updating the children index for the changed nodes only."""
+        old_nodes = self._nodes
+        if new_nodes is old_nodes:
+            return
+        nodes = self._nodes = _GraphNodes(new_nodes)
+        index = getattr(old_nodes, 'children_index', None)
+        if index is not None:
+            old_nodes.children_index = None
+            nodes.children_index = index
+            nodes._on_change(*list_difference(old_nodes, nodes))
 
     @copy_doc(Graph.node_children)
     def node_children(self, node: GraphNode) -> List[Optional[GraphNode]]:
         """ Returns list of children of specified node. """
+        index = self._children_index()
+        if index is not None:
+            return list(index.children.get(id(node), {}).values())
         return [other_node for other_node in self._nodes
                 if other_node.nodes_from and
                 node in other_node.nodes_from]
@@ -143,6 +288,9 @@ class LinkedGraph(Graph, Copyable):
         self._postprocess_nodes(self, self._nodes)
 
     def root_nodes(self) -> Sequence[GraphNode]:
+        index = self._children_index()
+        if index is not None:
+            return [node for node in self._nodes if id(node) not in index.children]
         return [node for node in self._nodes if not any(self.node_children(node))]
 
     @property
@@ -151,10 +299,12 @@ class LinkedGraph(Graph, Copyable):
 
     @nodes.setter
     def nodes(self, new_nodes: List[GraphNode]):
-        self._nodes = new_nodes
+        self._set_nodes(new_nodes)
 
     @copy_doc(Graph.__eq__)
     def __eq__(self, other_graph: Graph) -> bool:
+        if isinstance(other_graph, Graph) and self.structural_hash != other_graph.structural_hash:
+            return False
         return \
             set(rn.descriptive_id for rn in self.root_nodes()) == \
             set(rn.descriptive_id for rn in other_graph.root_nodes())
@@ -189,6 +339,9 @@ class LinkedGraph(Graph, Copyable):
                     edges.append((parent_node, node))
         return edges
 
+    def _clone_nodes(self) -> Dict[int, Any]:
+        return clone_nodes(self._nodes)
+
 
 def get_distance_between(graph_1: Graph, graph_2: Graph) -> int:
     """
@@ -1,6 +1,65 @@
-from typing import Union, Optional, Iterable, List
-from golem.core.dag.graph_node import GraphNode
-from golem.utilities.data_structures import UniqueList
+import weakref
+from copy import deepcopy
+from typing import Any, Dict, Union, Optional, Iterable, List, Sequence
+
+from golem.core.dag.graph_node import GraphNode, NodeValueCache
+from golem.utilities.data_structures import ObservableListMixin, UniqueList, list_difference
+
+# attributes of the ``LinkedGraphNode`` state, nodes with other attributes (e.g. set by subclasses) have extra state
+LINKED_NODE_ATTRIBUTES = {'content', '_nodes_from', 'uid'}
+# immutable values of the node content that are shared by the copies of the node
+_ATOMIC_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+
+class ParentNodes(ObservableListMixin, UniqueList):
+    """List of the parent nodes of the ``LinkedGraphNode`` that notifies its observers
+    (children indices of the graphs with the node) about the added and removed parents,
+    so the indices are updated only for the changed edges.
+    It also keeps the cached structural values of the node (e.g. descriptive id)
+    that are dropped when the parents change. Observers and cache aren't copied with the list.
+
+    Args:
+        iterable: parent nodes
+    """
+
+    def __init__(self, iterable: Optional[Iterable['LinkedGraphNode']] = None):
+        super().__init__(iterable)
+        self.cache: Optional[Dict[str, NodeValueCache]] = None
+        self._observers: Optional[List[weakref.ref]] = None
+
+    def add_observer(self, observer):
+        """Subscribes ``observer`` to the changes of the list. Observer must have method
+        ``on_parents_changed(parents, removed_parents, added_parents, replaced_parents)``.
+        Only weak reference to the observer is kept."""
+        if self._observers is None:
+            self._observers = []
+        self._observers.append(weakref.ref(observer))
+
+    def remove_observer(self, observer):
+        if self._observers:
+            self._observers = [ref for ref in self._observers if ref() is not None and ref() is not observer] or None
+
+    def replace(self, old_parents: 'ParentNodes'):
+        """Takes the observers of the replaced parents list of the same node and notifies them about the changes."""
+        self._observers, old_parents._observers = old_parents._observers, None
+        self._notify(*list_difference(old_parents, self), replaced=old_parents)
+
+    def _on_change(self, removed: Sequence['LinkedGraphNode'], added: Sequence['LinkedGraphNode']):
+        self.cache = None
+        self._notify(removed, added)
+
+    def _notify(self, removed: Sequence['LinkedGraphNode'], added: Sequence['LinkedGraphNode'],
+                replaced: Optional['ParentNodes'] = None):
+        if not self._observers:
+            return
+        for ref in self._observers:
+            observer = ref()
+            if observer is not None:
+                observer.on_parents_changed(self, removed, added, replaced)
+
+    def __reduce_ex__(self, protocol):
+        # items are restored after the list, so the nodes of the cyclic graphs can be restored
+        return ParentNodes, (), None, iter(self)
 
 
 class LinkedGraphNode(GraphNode):
@@ -25,7 +84,7 @@ class LinkedGraphNode(GraphNode):
             content = {'name': content}
 
         self.content: dict = content
-        self._nodes_from = UniqueList(nodes_from or ())
+        self._nodes_from = ParentNodes(nodes_from)
 
         super().__init__()
 
@@ -35,7 +94,23 @@ class LinkedGraphNode(GraphNode):
 
     @nodes_from.setter
     def nodes_from(self, nodes: Optional[Iterable['LinkedGraphNode']]):
-        self._nodes_from = UniqueList(nodes)
+        old_parents = self._nodes_from
+        parents = self._nodes_from = ParentNodes(nodes)
+        if isinstance(old_parents, ParentNodes) and old_parents._observers:
+            parents.replace(old_parents)
+
+    def _get_cached_value(self, key: str) -> Optional[NodeValueCache]:
+        cache = getattr(self._nodes_from, 'cache', None)
+        return cache.get(key) if cache else None
+
+    def _cache_value(self, key: str, cache: NodeValueCache):
+        parents = self._nodes_from
+        if type(parents) is not ParentNodes:
+            # parents were assigned directly to the attribute, so the changes of the list aren't tracked
+            return
+        if parents.cache is None:
+            parents.cache = {}
+        parents.cache[key] = cache
 
     @property
     def name(self) -> str:
@@ -74,3 +149,63 @@ class LinkedGraphNode(GraphNode):
             # If instance of Operation is placed in 'name'
             node_label = label.description(self.parameters)
         return node_label
+
+
+def clone_nodes(nodes: Iterable[GraphNode]) -> Dict[int, Any]:
+    """Makes copies of the nodes and all their preceding nodes for the memo of ``deepcopy``.
+
+    It's a fast structural copy rather than structural sharing: all the nodes are copied,
+    node content and its parameters are new dicts that share immutable values
+    (e.g. names and numeric parameters) with the nodes, other values are deep-copied.
+    Cached structural values of the nodes (e.g. descriptive ids) are kept by the copies.
+    Nodes are copied only if all of them are ``LinkedGraphNode`` without additional state.
+
+    Args:
+        nodes: nodes to copy
+
+    Returns:
+        copies of the nodes by the ids of the nodes or empty dict if the nodes can't be copied structurally
+    """
+    clones = {}
+    cloned_nodes = []
+    # values shared by several nodes are shared by their copies as with deepcopy
+    values_memo = {}
+    stack = list(nodes)
+    while stack:
+        node = stack.pop()
+        if id(node) in clones:
+            continue
+        if not (isinstance(node, LinkedGraphNode) and node.__dict__.keys() == LINKED_NODE_ATTRIBUTES and
+                isinstance(node.content, dict)):
+            return {}
+        node_class = type(node)
+        clone = node_class.__new__(node_class)
+        clone.content = _copy_values(node.content, values_memo)
+        clone._nodes_from = None
+        clone.uid = node.uid
+        clones[id(node)] = clone
+        cloned_nodes.append(node)
+        stack.extend(node.nodes_from)
+
+    for node in cloned_nodes:
+        clone = clones[id(node)]
+        parents = node.nodes_from
+        clone._nodes_from = ParentNodes(clones[id(parent)] for parent in parents)
+        if getattr(parents, 'cache', None):
+            clone._nodes_from.cache = dict(parents.cache)
+    return clones
+
+
+def _copy_values(values: dict, memo: Dict[int, Any]) -> dict:
+    """Copies the dict of the node content (e.g. parameters) sharing its immutable values."""
+    if id(values) in memo:
+        return memo[id(values)]
+    copied = memo[id(values)] = {}
+    for key, value in values.items():
+        if type(value) in _ATOMIC_TYPES:
+            copied[key] = value
+        elif type(value) is dict:
+            copied[key] = _copy_values(value, memo)
+        else:
+            copied[key] = deepcopy(value, memo)
+    return copied
@@ -0,0 +1,175 @@
+import pickle
+import sys
+from contextlib import contextmanager
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from golem.core.dag.compact_graph import CompactGraph, decode_graph, encode_graph
+from golem.core.dag.graph import Graph
+
+# Segments created by the stores of this process by their names
+_owned_segments: Dict[str, SharedMemory] = {}
+# Segments attached in this process by their names.
+# Worker process keeps only the segment of the current population attached.
+_attached_segments: Dict[str, SharedMemory] = {}
+
+
+class SharedGraphHandle(NamedTuple):
+    """Small handle of the graph in the shared memory segment that is sent to the workers instead of the graph."""
+    segment_name: str
+    offset: int
+    size: int
+    # whether the graph is stored in the binary compact form, otherwise it's pickled
+    is_compact: bool = True
+
+
+class SharedGraphStore:
+    """Store of the population graphs in the shared memory.
+
+    Graphs are written once in the binary compact form (see ``CompactGraph.to_buffers``) into the single
+    shared memory segment, the other processes restore them by their handles with `load_graph`.
+    Structure arrays of the graphs are read in place from the segment without copying,
+    only the interned node contents are unpickled. Graphs that can't be encoded are pickled.
+    So only the handles are sent to the evaluation workers.
+
+    Store owns the segment: it must be closed with `close()` when the graphs are no longer needed.
+
+    Args:
+        graphs: graphs to store
+    """
+
+    def __init__(self, graphs: Sequence[Graph]):
+        payloads = [_graph_buffers(graph) for graph in graphs]
+        # segment can't be empty
+        segment_size = sum(len(buffer) for buffers, _ in payloads for buffer in buffers)
+        self._segment: Optional[SharedMemory] = SharedMemory(create=True, size=max(1, segment_size))
+        self.handles: List[SharedGraphHandle] = []
+        offset = 0
+        for buffers, is_compact in payloads:
+            start = offset
+            for buffer in buffers:
+                self._segment.buf[offset:offset + len(buffer)] = buffer
+                offset += len(buffer)
+            self.handles.append(SharedGraphHandle(self._segment.name, start, offset - start, is_compact))
+        _owned_segments[self._segment.name] = self._segment
+
+    @property
+    def size(self) -> int:
+        """Size of the stored graphs in bytes."""
+        return sum(handle.size for handle in self.handles)
+
+    def close(self):
+        """Releases the segment. Workers that still have it attached can read it until they detach."""
+        if self._segment is None:
+            return
+        _owned_segments.pop(self._segment.name, None)
+        self._segment.close()
+        self._segment.unlink()
+        self._segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class GraphTransport:
+    """Defines the form the graphs are sent to the other processes in.
+
+    Graphs are sent in the compact form (see ``CompactGraph``) when it's possible.
+    If shared memory is enabled, the graphs of the population are written once into ``SharedGraphStore``
+    while the population is shared (see `share`) and only their small handles are sent.
+    Receiving side restores the graphs with `load_graph`.
+
+    Args:
+        shared_memory: whether the graphs of the shared population are sent through the shared memory.
+    """
+
+    def __init__(self, shared_memory: bool = False):
+        self.shared_memory = shared_memory
+        self._handles: Dict[str, SharedGraphHandle] = {}
+
+    @property
+    def is_sharing(self) -> bool:
+        """Whether the graphs of the population are in the shared memory now."""
+        return bool(self._handles)
+
+    @contextmanager
+    def share(self, graphs: Dict[str, Graph]) -> Iterator['GraphTransport']:
+        """Keeps the graphs in the shared memory until the exit from the context, if shared memory is enabled.
+
+        Args:
+            graphs: graphs by their ids (e.g. the uids of their individuals)
+        """
+        if not self.shared_memory or not graphs:
+            yield self
+            return
+        with SharedGraphStore(list(graphs.values())) as graph_store:
+            self._handles = dict(zip(graphs, graph_store.handles))
+            try:
+                yield self
+            finally:
+                self._handles = {}
+
+    def pack(self, graph_id: str, graph: Graph) -> Union[SharedGraphHandle, CompactGraph, Graph]:
+        """Returns the form of the graph that is sent to the other process."""
+        return self._handles.get(graph_id) or encode_graph(graph)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # segments are owned by the sending process
+        state['_handles'] = {}
+        return state
+
+
+def load_graph(graph: Union[SharedGraphHandle, CompactGraph, Graph, None]) -> Optional[Graph]:
+    """Restores the graph by its handle in the shared memory.
+    Graphs that aren't in the shared memory are decoded with `decode_graph`."""
+    if not isinstance(graph, SharedGraphHandle):
+        return decode_graph(graph)
+    segment = _attach(graph.segment_name)
+    with segment.buf[graph.offset:graph.offset + graph.size] as payload:
+        if not graph.is_compact:
+            return pickle.loads(payload)
+        encoded_graph = CompactGraph.from_buffer(payload)
+        try:
+            return encoded_graph.decode()
+        finally:
+            encoded_graph.release()
+
+
+def _graph_buffers(graph: Graph) -> Tuple[List[Union[bytes, memoryview]], bool]:
+    encoded_graph = encode_graph(graph)
+    if isinstance(encoded_graph, CompactGraph):
+        return encoded_graph.to_buffers(), True
+    return [pickle.dumps(graph, protocol=pickle.HIGHEST_PROTOCOL)], False
+
+
+def _attach(segment_name: str) -> SharedMemory:
+    segment = _owned_segments.get(segment_name) or _attached_segments.get(segment_name)
+    if segment is None:
+        # segments of the previous populations are already released by their owner
+        for name in list(_attached_segments):
+            _detach(name)
+        segment = _open_untracked(segment_name)
+        _attached_segments[segment_name] = segment
+    return segment
+
+
+def _open_untracked(segment_name: str) -> SharedMemory:
+    """Opens the existing segment without registering it in the resource tracker,
+    because the segment is owned by the store and mustn't be unlinked when the attached process exits."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=segment_name, track=False)
+    segment = SharedMemory(name=segment_name)
+    # before Python 3.13 the attached segment is always registered
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+def _detach(segment_name: str):
+    segment = _attached_segments.pop(segment_name, None)
+    if segment is not None:
+        segment.close()
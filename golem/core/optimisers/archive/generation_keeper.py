@@ -6,7 +6,7 @@ import numpy as np
 
 from golem.core.optimisers.fitness import is_metric_worse
 from golem.core.optimisers.genetic.operators.operator import PopulationT
-from golem.core.optimisers.objective.objective import Objective
+from golem.core.optimisers.objective.objective import MultiFidelityObjective, Objective
 from golem.core.optimisers.opt_history_objects.individual import Individual
 from .individuals_containers import HallOfFame, ParetoFront
 
@@ -61,6 +61,8 @@ class GenerationKeeper(ImprovementWatcher):
 
     Args:
         objective: Objective that specifies metrics and if it's multi objective optimization.
+         NB: in the case of ``MultiFidelityObjective`` only the individuals evaluated
+         at the highest fidelity are compared and kept in the archive.
         keep_n_best: How many best individuals to keep from all generations.
          NB: relevant only for single-objective optimization.
         initial_generation: Optional first generation;
@@ -81,6 +83,8 @@ class GenerationKeeper(ImprovementWatcher):
         self._objective = objective
         self._metrics_improvement: Dict[Any, bool] = {}
         self._reset_metrics_improvement()
+        # archive fitness before the individuals of the unfinished generation were added
+        self._pending_archive_fitness: Optional[Dict[Any, Sequence[float]]] = None
 
         if objective.is_multi_objective:
             self.archive = ParetoFront(maxsize=keep_n_best * PARETO_MAX_POP_SIZE_MULTIPLIER,
@@ -133,10 +137,30 @@ class GenerationKeeper(ImprovementWatcher):
         return self._objective.metric_names
 
     def append(self, population: PopulationT):
-        previous_archive_fitness = self._archive_fitness()
-        self.archive.update(population)
+        previous_archive_fitness = self._pending_archive_fitness
+        if previous_archive_fitness is None:
+            previous_archive_fitness = self._archive_fitness()
+        self._pending_archive_fitness = None
+        self.archive.update(self._comparable_individuals(population))
         self._update_improvements(previous_archive_fitness)
 
+    def update_archive(self, individuals: PopulationT):
+        """Adds individuals to the archive without finishing the generation.
+        Used when individuals are evaluated one by one (e.g. in asynchronous evolution),
+        so the best ones are available right away. Improvements are still computed
+        once per generation on the next `append()`."""
+        if self._pending_archive_fitness is None:
+            self._pending_archive_fitness = self._archive_fitness()
+        self.archive.update(self._comparable_individuals(individuals))
+
+    def _comparable_individuals(self, individuals: PopulationT) -> PopulationT:
+        """Returns individuals which fitness is comparable with the fitness of the archive."""
+        if not isinstance(self._objective, MultiFidelityObjective):
+            return individuals
+        max_fidelity = self._objective.max_fidelity
+        return [ind for ind in individuals
+                if ind.metadata.get('evaluation_fidelity', max_fidelity) == max_fidelity]
+
     def _archive_fitness(self) -> Dict[Any, Sequence[float]]:
         archive_pop_metrics = (ind.fitness.values for ind in self.archive.items)
         archive_fitness_per_metric = zip(*archive_pop_metrics)  # transpose nested array
@@ -1,2 +1,3 @@
 from .fitness import Fitness, SingleObjFitness, null_fitness, is_metric_worse
 from .multi_objective_fitness import MultiObjFitness
+from .ranking import sort_by_fitness
@@ -0,0 +1,79 @@
+import math
+from typing import Callable, List, Sequence, TypeVar
+
+from golem.core.optimisers.fitness.fitness import Fitness
+from golem.core.optimisers.fitness.multi_objective_fitness import MultiObjFitness
+
+T = TypeVar('T')
+
+
+def sort_by_fitness(items: Sequence[T], key: Callable[[T], Fitness]) -> List[T]:
+    """Sorts items from the best fitness to the worst one in the total order
+    that doesn't depend on the order of the items.
+
+    Multi-objective fitness is ranked with non-dominated sorting: items of the better Pareto fronts go first,
+    items of the same front are ordered by decreasing crowding distance and then by fitness comparison.
+    Other fitness is ordered with its comparison. Items with invalid fitness go last.
+
+    Args:
+        items: items to sort, e.g. individuals or evaluation results
+        key: function that returns fitness of the item
+
+    Returns:
+        List[T]: sorted items.
+    """
+    valid_items = [item for item in items if key(item).valid]
+    invalid_items = [item for item in items if not key(item).valid]
+    if not all(isinstance(key(item), MultiObjFitness) for item in valid_items):
+        return sorted(valid_items, key=key, reverse=True) + invalid_items
+    sorted_items = []
+    for front in _pareto_fronts(valid_items, key):
+        distances = _crowding_distances([key(item).values for item in front])
+        ranked_front = sorted(zip(front, distances), key=lambda pair: (pair[1], key(pair[0])), reverse=True)
+        sorted_items.extend(item for item, _ in ranked_front)
+    return sorted_items + invalid_items
+
+
+def _pareto_fronts(items: Sequence[T], key: Callable[[T], Fitness]) -> List[List[T]]:
+    """Splits the items into Pareto fronts from the best to the worst one."""
+    dominated_items: List[List[int]] = [[] for _ in items]
+    domination_counts = [0] * len(items)
+    for i, item in enumerate(items):
+        for j in range(i + 1, len(items)):
+            if key(item).dominates(key(items[j])):
+                dominated_items[i].append(j)
+                domination_counts[j] += 1
+            elif key(items[j]).dominates(key(item)):
+                dominated_items[j].append(i)
+                domination_counts[i] += 1
+
+    fronts = []
+    front = [i for i, count in enumerate(domination_counts) if count == 0]
+    while front:
+        fronts.append([items[i] for i in front])
+        next_front = []
+        for i in front:
+            for j in dominated_items[i]:
+                domination_counts[j] -= 1
+                if domination_counts[j] == 0:
+                    next_front.append(j)
+        front = next_front
+    return fronts
+
+
+def _crowding_distances(values: Sequence[Sequence[float]]) -> List[float]:
+    """Computes crowding distance of each point of the front, the boundary points have infinite distance."""
+    distances = [0.] * len(values)
+    if not values:
+        return distances
+    for objective in range(len(values[0])):
+        # points with the same objective value are ordered by all values, so the boundary points don't depend
+        # on the order of the points
+        order = sorted(range(len(values)), key=lambda i: (values[i][objective], tuple(values[i])))
+        objective_range = values[order[-1]][objective] - values[order[0]][objective]
+        if objective_range == 0:
+            continue
+        distances[order[0]] = distances[order[-1]] = math.inf
+        for prev_idx, idx, next_idx in zip(order, order[1:], order[2:]):
+            distances[idx] += (values[next_idx][objective] - values[prev_idx][objective]) / objective_range
+    return distances
@@ -0,0 +1,204 @@
+import asyncio
+import datetime
+import inspect
+import threading
+import timeit
+from concurrent.futures import Future, wait
+from typing import Optional
+
+from golem.core.adapter import BaseOptimizationAdapter
+from golem.core.dag.graph import Graph
+from golem.core.optimisers.fitness import Fitness, null_fitness
+from golem.core.optimisers.genetic.evaluation import BaseGraphEvaluationDispatcher, DelegateEvaluator, \
+    EvalResultsList
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache
+from golem.core.optimisers.genetic.operators.operator import EvaluationOperator, PopulationT
+from golem.core.optimisers.graph import OptGraph
+from golem.core.optimisers.objective import GraphFunction, ObjectiveFunction
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
+from golem.core.optimisers.timer import Timer
+
+
+class AsyncDispatcher(BaseGraphEvaluationDispatcher):
+    """Evaluates objective function on population concurrently with asyncio.
+
+    It's suitable for the objectives that mostly wait for the external services
+    (e.g. submit the graph to the simulator and await the result): objective can be
+    an ``async def`` function, so hundreds of evaluations run concurrently on the single event loop
+    without blocking processes or threads. Synchronous objectives are supported too,
+    but they are evaluated one by one.
+
+    Event loop runs in the dedicated background thread and is reused across generations until `shutdown()`.
+    Evaluations aren't started after the time limit of the timer is reached
+    and the unfinished ones are cancelled.
+
+    Usage: call `dispatch(objective_function)` to get evaluation function.
+
+    Args:
+        adapter: adapter for graphs
+        n_jobs: max number of concurrent evaluations or -1 for no limit.
+        graph_cleanup_fn: function to call after graph evaluation, primarily for memory cleanup.
+        delegate_evaluator: delegate graph fitter (e.g. for remote graph fitting before evaluation)
+        fitness_cache: optional cache of fitness for structurally identical graphs
+        max_graph_fit_time: optional time limit for evaluation of each graph.
+        objective_batch_size: isn't supported, graphs are evaluated one by one, so it must be None.
+        return_evaluated_graphs: whether to return the graphs after evaluation.
+        collect_garbage: isn't supported, garbage isn't collected after each evaluation
+            not to block the event loop, so it must be False.
+    """
+
+    def __init__(self,
+                 adapter: BaseOptimizationAdapter,
+                 n_jobs: int = 1,
+                 graph_cleanup_fn: Optional[GraphFunction] = None,
+                 delegate_evaluator: Optional[DelegateEvaluator] = None,
+                 fitness_cache: Optional[FitnessCache] = None,
+                 max_graph_fit_time: Optional[datetime.timedelta] = None,
+                 objective_batch_size: Optional[int] = None,
+                 return_evaluated_graphs: bool = True,
+                 collect_garbage: bool = False):
+        if objective_batch_size is not None:
+            raise ValueError(f'{self.__class__.__name__} evaluates graphs one by one, '
+                             f'objective_batch_size is not supported')
+        if collect_garbage:
+            raise ValueError(f'{self.__class__.__name__} does not collect garbage after each evaluation, '
+                             f'collect_garbage is not supported')
+        super().__init__(adapter, n_jobs, graph_cleanup_fn, delegate_evaluator, fitness_cache,
+                         max_graph_fit_time, objective_batch_size, return_evaluated_graphs, collect_garbage)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._concurrency_limit: Optional[asyncio.Semaphore] = None
+
+    def dispatch(self, objective: ObjectiveFunction, timer: Optional[Timer] = None) -> EvaluationOperator:
+        super().dispatch(objective, timer)
+        return self.evaluate_with_cache
+
+    def shutdown(self, kill_workers: bool = False):
+        self._cancel_pending_evaluations()
+        self._stop_loop()
+        super().shutdown(kill_workers)
+
+    def evaluate_population(self, individuals: PopulationT) -> PopulationT:
+        individuals_to_evaluate, individuals_to_skip = self.split_individuals_to_evaluate(individuals)
+        evaluation_results = self.evaluate_with_fitness_cache(individuals_to_evaluate, self._evaluate_concurrently)
+        self._update_evaluation_stats(evaluation_results)
+        individuals_evaluated = self.apply_evaluation_results(individuals_to_evaluate, evaluation_results)
+        successful_evals = individuals_evaluated + individuals_to_skip
+        self.population_evaluation_info(evaluated_pop_size=len(successful_evals),
+                                        pop_size=len(individuals))
+        # If there were no successful evals then try once again getting at least one,
+        # even if time limit was reached
+        if not successful_evals:
+            for single_ind in individuals:
+                evaluation_result = self._run_in_loop(
+                    self.evaluate_single_async(self._graph_to_evaluate(single_ind), single_ind.uid,
+                                               with_time_limit=False)).result()
+                successful_evals = self.apply_evaluation_results([single_ind], [evaluation_result])
+                if successful_evals:
+                    break
+        return successful_evals
+
+    async def evaluate_single_async(self, graph: OptGraph, uid_of_individual: str, with_time_limit: bool = True,
+                                    fidelity: Optional[float] = None) -> Optional[GraphEvalResult]:
+        if with_time_limit and self.timer.is_time_limit_reached():
+            return None
+        if fidelity is None and self._is_multi_fidelity_objective:
+            fidelity = self._objective_eval.max_fidelity
+
+        domain_graph = self._adapter.restore(graph)
+        start_time = timeit.default_timer()
+        try:
+            fitness = await asyncio.wait_for(self._evaluate_graph_async(domain_graph, fidelity),
+                                             self._graph_fit_seconds)
+            timed_out = False
+        except asyncio.TimeoutError:
+            self.logger.warning(f'Evaluation of the graph of individual {uid_of_individual} '
+                                f'was interrupted by the timeout {self._max_graph_fit_time}')
+            fitness = null_fitness()
+            timed_out = True
+        end_time = timeit.default_timer()
+
+        return GraphEvalResult(
+            uid_of_individual=uid_of_individual, fitness=fitness,
+            graph=self._adapter.adapt(domain_graph) if self._return_evaluated_graphs else None,
+            metadata=self._evaluation_metadata(end_time - start_time, timed_out, fidelity)
+        )
+
+    async def _evaluate_graph_async(self, domain_graph: Graph, fidelity: Optional[float] = None) -> Fitness:
+        if fidelity is None:
+            fitness = self._objective_eval(domain_graph)
+        else:
+            fitness = self._objective_eval(domain_graph, fidelity=fidelity)
+        if inspect.isawaitable(fitness):
+            fitness = await fitness
+
+        if self._post_eval_callback:
+            self._post_eval_callback(domain_graph)
+        if self._cleanup:
+            self._cleanup(domain_graph)
+        return fitness
+
+    async def _evaluate_with_concurrency_limit(self, graph: OptGraph, uid_of_individual: str,
+                                               fidelity: Optional[float] = None) -> Optional[GraphEvalResult]:
+        if self._n_jobs == -1:
+            return await self.evaluate_single_async(graph, uid_of_individual, fidelity=fidelity)
+        if self._concurrency_limit is None:
+            # semaphore is created inside the loop it's used in
+            self._concurrency_limit = asyncio.Semaphore(max(1, self._n_jobs))
+        async with self._concurrency_limit:
+            return await self.evaluate_single_async(graph, uid_of_individual, fidelity=fidelity)
+
+    def _evaluate_concurrently(self, individuals: PopulationT, fidelity: Optional[float] = None) -> EvalResultsList:
+        futures = [self._run_in_loop(
+            self._evaluate_with_concurrency_limit(self._graph_to_evaluate(ind), ind.uid, fidelity))
+            for ind in individuals]
+        done, not_done = wait(futures, timeout=self._remaining_seconds())
+        for future in not_done:
+            future.cancel()
+        return [future.result() if future in done else None for future in futures]
+
+    def _submit_single(self, individual: Individual) -> Future:
+        return self._run_in_loop(self._evaluate_with_concurrency_limit(self._graph_to_evaluate(individual),
+                                                                     individual.uid))
+
+    def _run_in_loop(self, coroutine) -> Future:
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name='async-evaluation', daemon=True)
+            self._loop_thread.start()
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def _stop_loop(self):
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(_cancel_tasks(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+        self._loop.close()
+        self._loop = None
+        self._loop_thread = None
+        self._concurrency_limit = None
+
+    @property
+    def _graph_fit_seconds(self) -> Optional[float]:
+        return self._max_graph_fit_time.total_seconds() if self._max_graph_fit_time is not None else None
+
+    def _remaining_seconds(self) -> Optional[float]:
+        if self.timer.timeout is None:
+            return None
+        return max(0., (self.timer.timeout - self.timer.spent_time).total_seconds())
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_loop'] = None
+        state['_loop_thread'] = None
+        state['_concurrency_limit'] = None
+        return state
+
+
+async def _cancel_tasks():
+    """Cancels all tasks of the running loop except the current one and waits for them."""
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,440 @@
+import argparse
+import datetime
+import itertools
+import os
+import secrets
+import socket
+import threading
+import timeit
+from collections import deque
+from concurrent.futures import Future, wait
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from golem.core.adapter import BaseOptimizationAdapter
+from golem.core.dag.compact_graph import decode_graph, encode_graph
+from golem.core.log import default_log
+from golem.core.optimisers.fitness import null_fitness
+from golem.core.optimisers.genetic.evaluation import BaseGraphEvaluationDispatcher, DelegateEvaluator, \
+    EvalResultsList, HUNG_WORKERS_POLL_SECONDS
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache
+from golem.core.optimisers.genetic.operators.operator import EvaluationOperator, PopulationT
+from golem.core.optimisers.objective import GraphFunction, ObjectiveFunction
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
+from golem.core.optimisers.timer import Timer
+
+# how often the worker agent reports that it's alive
+HEARTBEAT_INTERVAL_SECONDS = 1.
+# after how many seconds without any message the worker is considered lost
+WORKER_LOST_TIMEOUT_SECONDS = 10.
+
+Address = Tuple[str, int]
+
+
+class _Task:
+    """Evaluation of the single graph that is leased to the workers."""
+
+    __slots__ = ('task_id', 'individual', 'graph', 'fidelity', 'future', 'attempts')
+
+    def __init__(self, task_id: int, individual: Individual, graph: Any, fidelity: Optional[float]):
+        self.task_id = task_id
+        self.individual = individual
+        self.graph = graph
+        self.fidelity = fidelity
+        self.future = Future()
+        self.attempts = 0
+
+
+class _Coordinator:
+    """Coordinator of the worker agents: accepts their registration, leases the tasks to them
+    and re-queues the tasks of the lost workers. Each worker connection is served by its own thread
+    that is the only one using the connection."""
+
+    def __init__(self, address: Address, authkey: bytes, get_dispatcher: Callable[[], Tuple[int, Any]],
+                 max_task_attempts: int, worker_lost_timeout: float):
+        self._authkey = authkey
+        self._get_dispatcher = get_dispatcher
+        self._max_task_attempts = max_task_attempts
+        self._worker_lost_timeout = worker_lost_timeout
+        self._listener = Listener(address, authkey=authkey)
+        self._tasks: Deque[_Task] = deque()
+        self._leases: Dict[int, Tuple[_Task, str]] = {}
+        self._task_ids = itertools.count()
+        self._condition = threading.Condition()
+        self._is_stopped = False
+        self.workers: Set[str] = set()
+        self.lost_workers_num = 0
+        self.logger = default_log(self)
+        self._accept_thread = threading.Thread(target=self._accept_workers, name='evaluation-coordinator',
+                                               daemon=True)
+        self._accept_thread.start()
+
+    @property
+    def address(self) -> Address:
+        return self._listener.address
+
+    def submit(self, individual: Individual, graph: Any, fidelity: Optional[float] = None) -> Future:
+        with self._condition:
+            task = _Task(next(self._task_ids), individual, graph, fidelity)
+            self._tasks.append(task)
+            self._condition.notify()
+        return task.future
+
+    def take_task(self) -> Optional[_Task]:
+        """Takes the queued task to evaluate it in the coordinator process."""
+        with self._condition:
+            while self._tasks:
+                task = self._tasks.popleft()
+                if _start_task(task):
+                    task.attempts += 1
+                    return task
+        return None
+
+    def stop(self):
+        with self._condition:
+            if self._is_stopped:
+                return
+            self._is_stopped = True
+            self._condition.notify_all()
+            for task in self._tasks:
+                task.future.cancel()
+            self._tasks.clear()
+        # serving threads send 'stop' to their workers as soon as they see that the coordinator is stopped
+        # listener is closed by connecting to it, because accept() can't be interrupted
+        try:
+            Client(self.address, authkey=self._authkey).close()
+        except (OSError, EOFError):
+            pass
+        self._accept_thread.join()
+
+    def _accept_workers(self):
+        while True:
+            try:
+                connection = self._listener.accept()
+            except (OSError, EOFError):
+                # failed authentication or closed listener
+                if self._is_stopped:
+                    break
+                continue
+            if self._is_stopped:
+                connection.close()
+                break
+            threading.Thread(target=self._serve_worker, args=(connection,), daemon=True).start()
+        self._listener.close()
+
+    def _serve_worker(self, connection: Connection):
+        worker = None
+        dispatcher_version = None
+        try:
+            _, worker = connection.recv()
+            with self._condition:
+                self.workers.add(worker)
+            self.logger.info(f'Evaluation worker {worker} is registered')
+            while not self._is_stopped:
+                if not connection.poll(self._worker_lost_timeout):
+                    raise TimeoutError(f'no heartbeats for {self._worker_lost_timeout} seconds')
+                message = connection.recv()
+                if message[0] == 'result':
+                    self._complete_task(*message[1:])
+                elif message[0] == 'ready':
+                    task = self._lease_task(worker)
+                    if task is None:
+                        break
+                    version, dispatcher = self._get_dispatcher()
+                    if version != dispatcher_version:
+                        connection.send(('dispatcher', dispatcher))
+                        dispatcher_version = version
+                    connection.send(('task', task.task_id, task.graph, task.individual.uid, task.fidelity))
+        except (OSError, EOFError, TimeoutError) as ex:
+            if worker is not None and not self._is_stopped:
+                self.logger.warning(f'Evaluation worker {worker} is lost: {ex}')
+                self.lost_workers_num += 1
+        finally:
+            with self._condition:
+                self.workers.discard(worker)
+            if self._is_stopped:
+                _send(connection, ('stop',))
+            connection.close()
+            if worker is not None:
+                self._requeue_leased(worker)
+
+    def _lease_task(self, worker: str) -> Optional[_Task]:
+        with self._condition:
+            while not self._is_stopped:
+                while self._tasks:
+                    task = self._tasks.popleft()
+                    if not _start_task(task):
+                        continue
+                    task.attempts += 1
+                    self._leases[task.task_id] = (task, worker)
+                    return task
+                self._condition.wait()
+        return None
+
+    def _complete_task(self, task_id: int, eval_res: Optional[GraphEvalResult]):
+        with self._condition:
+            task, _ = self._leases.pop(task_id, (None, None))
+        if task is not None and not task.future.done():
+            task.future.set_result(eval_res)
+
+    def _requeue_leased(self, worker: str):
+        with self._condition:
+            lost_tasks = [task for task, task_worker in self._leases.values() if task_worker == worker]
+            for task in lost_tasks:
+                del self._leases[task.task_id]
+                if task.future.done():
+                    continue
+                if task.attempts < self._max_task_attempts:
+                    self._tasks.appendleft(task)
+                    self._condition.notify()
+                else:
+                    task.future.set_result(GraphEvalResult(uid_of_individual=task.individual.uid,
+                                                           fitness=null_fitness(), graph=task.individual.graph,
+                                                           metadata={'evaluation_crashed': True}))
+        if lost_tasks:
+            self.logger.warning(f'{len(lost_tasks)} tasks of the lost worker {worker} are re-queued')
+
+
+class DistributedDispatcher(BaseGraphEvaluationDispatcher):
+    """Evaluates objective function on population with the worker agents connected over TCP,
+    so several machines can evaluate one population. No external services are needed:
+    the dispatcher runs the coordinator that listens on ``address``.
+
+    Worker agents are started with `run_evaluation_worker` (or ``python -m
+    golem.core.optimisers.genetic.distributed_evaluation --address host:port --authkey key``),
+    they can join and leave at any time. Coordinator ships the dispatcher with the objective to the worker
+    on its registration, then leases the tasks to the worker one by one and gets the results
+    as soon as they're ready. Worker sends heartbeats, the tasks of the worker that is lost
+    (disconnected or silent longer than ``worker_lost_timeout``) are re-queued to the other workers.
+    If there are no workers, the queued tasks are evaluated in the coordinator process.
+
+    Objective must be picklable and the same ``golem`` and objective code must be available on the workers.
+    Graphs are sent in the compact form (see ``CompactGraph``). Delegate evaluator is applied
+    in the coordinator process before the graphs are sent to the workers.
+
+    Usage: call `dispatch(objective_function)` to get evaluation function.
+
+    Args:
+        adapter: adapter for graphs
+        n_jobs: expected number of workers, it's used only for scheduling of the evaluations.
+        graph_cleanup_fn: function to call after graph evaluation, primarily for memory cleanup.
+        delegate_evaluator: delegate graph fitter (e.g. for remote graph fitting before evaluation)
+        fitness_cache: optional cache of fitness for structurally identical graphs
+        max_graph_fit_time: optional time limit for evaluation of each graph.
+        objective_batch_size: isn't used, graphs are evaluated one by one.
+        return_evaluated_graphs: whether to return the graphs after evaluation.
+        collect_garbage: whether to run garbage collection after each graph evaluation.
+        address: host and port of the coordinator, port 0 means any free port (see `address` property).
+        authkey: key that authenticates the workers. By default random printable key is generated
+            and logged, it's available as ``authkey`` attribute.
+        max_task_attempts: how many times the task is leased if the workers evaluating it are lost.
+        worker_lost_timeout: seconds without heartbeats after which the worker is considered lost.
+        no_workers_timeout: seconds without the registered workers after which
+            the queued tasks are evaluated in the coordinator process.
+    """
+
+    def __init__(self,
+                 adapter: BaseOptimizationAdapter,
+                 n_jobs: int = 1,
+                 graph_cleanup_fn: Optional[GraphFunction] = None,
+                 delegate_evaluator: Optional[DelegateEvaluator] = None,
+                 fitness_cache: Optional[FitnessCache] = None,
+                 max_graph_fit_time: Optional[datetime.timedelta] = None,
+                 objective_batch_size: Optional[int] = None,
+                 return_evaluated_graphs: bool = True,
+                 collect_garbage: bool = True,
+                 address: Address = ('localhost', 0),
+                 authkey: Optional[bytes] = None,
+                 max_task_attempts: int = 3,
+                 worker_lost_timeout: float = WORKER_LOST_TIMEOUT_SECONDS,
+                 no_workers_timeout: float = WORKER_LOST_TIMEOUT_SECONDS):
+        super().__init__(adapter, n_jobs, graph_cleanup_fn, delegate_evaluator, fitness_cache,
+                         max_graph_fit_time, objective_batch_size, return_evaluated_graphs, collect_garbage)
+        self._address = address
+        if not authkey:
+            authkey = secrets.token_hex(16).encode()
+            self.logger.info(f'Evaluation workers are authenticated with the generated key {authkey.decode()}')
+        self.authkey = authkey
+        self._max_task_attempts = max_task_attempts
+        self._worker_lost_timeout = worker_lost_timeout
+        self._no_workers_timeout = no_workers_timeout
+        self._coordinator: Optional[_Coordinator] = None
+        self._dispatcher_version = 0
+
+    @property
+    def address(self) -> Address:
+        """Address the coordinator listens on, the coordinator is started if it isn't yet."""
+        return self._get_coordinator().address
+
+    @property
+    def workers(self) -> List[str]:
+        """Registered workers."""
+        return sorted(self._coordinator.workers) if self._coordinator is not None else []
+
+    def dispatch(self, objective: ObjectiveFunction, timer: Optional[Timer] = None) -> EvaluationOperator:
+        super().dispatch(objective, timer)
+        # workers get the new objective with the next task
+        self._dispatcher_version += 1
+        self._get_coordinator()
+        return self.evaluate_with_cache
+
+    def set_graph_evaluation_callback(self, callback: Optional[GraphFunction]):
+        super().set_graph_evaluation_callback(callback)
+        self._dispatcher_version += 1
+
+    def shutdown(self, kill_workers: bool = False):
+        self._cancel_pending_evaluations()
+        if self._coordinator is not None:
+            self._coordinator.stop()
+            self._coordinator = None
+        super().shutdown(kill_workers)
+
+    def evaluate_population(self, individuals: PopulationT) -> PopulationT:
+        individuals_to_evaluate, individuals_to_skip = self.split_individuals_to_evaluate(individuals)
+        evaluation_results = self.evaluate_with_fitness_cache(individuals_to_evaluate, self._evaluate_remotely)
+        self._update_evaluation_stats(evaluation_results)
+        individuals_evaluated = self.apply_evaluation_results(individuals_to_evaluate, evaluation_results)
+        successful_evals = individuals_evaluated + individuals_to_skip
+        self.population_evaluation_info(evaluated_pop_size=len(successful_evals),
+                                        pop_size=len(individuals))
+        # If there were no successful evals then try once again getting at least one,
+        # even if time limit was reached
+        if not successful_evals:
+            for single_ind in individuals:
+                evaluation_result = self.evaluate_single(single_ind.graph, single_ind.uid, with_time_limit=False)
+                successful_evals = self.apply_evaluation_results([single_ind], [evaluation_result])
+                if successful_evals:
+                    break
+        return successful_evals
+
+    def _evaluate_remotely(self, individuals: PopulationT, fidelity: Optional[float] = None) -> EvalResultsList:
+        futures = [self._submit_task(ind, fidelity) for ind in individuals]
+        no_workers_since = timeit.default_timer()
+        while not all(future.done() for future in futures):
+            if self.timer.is_time_limit_reached():
+                break
+            wait(futures, timeout=HUNG_WORKERS_POLL_SECONDS)
+            if self._coordinator.workers:
+                no_workers_since = timeit.default_timer()
+            elif timeit.default_timer() - no_workers_since > self._no_workers_timeout:
+                self._evaluate_queued_locally()
+        for future in futures:
+            future.cancel()
+        return [future.result() if future.done() and not future.cancelled() else None for future in futures]
+
+    def _evaluate_queued_locally(self):
+        self.logger.warning('There are no evaluation workers, queued graphs are evaluated by the coordinator')
+        while True:
+            task = self._coordinator.take_task()
+            if task is None:
+                break
+            task.future.set_result(self.evaluate_single(decode_graph(task.graph), task.individual.uid,
+                                                        fidelity=task.fidelity))
+
+    def _submit_task(self, individual: Individual, fidelity: Optional[float] = None) -> Future:
+        graph = encode_graph(self._graph_to_evaluate(individual))
+        return self._get_coordinator().submit(individual, graph, fidelity)
+
+    def _submit_single(self, individual: Individual) -> Future:
+        return self._submit_task(individual)
+
+    def _get_coordinator(self) -> _Coordinator:
+        if self._coordinator is None:
+            self._coordinator = _Coordinator(self._address, self.authkey, self._shipped_dispatcher,
+                                             self._max_task_attempts, self._worker_lost_timeout)
+            self.logger.info(f'Evaluation coordinator listens on {self._coordinator.address}')
+        return self._coordinator
+
+    def _shipped_dispatcher(self) -> Tuple[int, 'DistributedDispatcher']:
+        return self._dispatcher_version, self
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        # coordinator belongs to the main process
+        state['_coordinator'] = None
+        return state
+
+
+def run_evaluation_worker(address: Address, authkey: bytes,
+                          heartbeat_interval: float = HEARTBEAT_INTERVAL_SECONDS,
+                          name: Optional[str] = None):
+    """Runs the worker agent that evaluates graphs for ``DistributedDispatcher`` until the coordinator stops.
+
+    Args:
+        address: host and port of the coordinator
+        authkey: key of the coordinator
+        heartbeat_interval: how often the worker reports that it's alive in seconds
+        name: name of the worker, by default it's made of the host name and the process id
+    """
+    name = name or f'{socket.gethostname()}:{os.getpid()}'
+    connection = Client(tuple(address), authkey=authkey)
+    send_lock = threading.Lock()
+    is_stopped = threading.Event()
+
+    def send(message: tuple):
+        with send_lock:
+            connection.send(message)
+
+    def send_heartbeats():
+        while not is_stopped.wait(heartbeat_interval):
+            try:
+                send(('heartbeat',))
+            except (OSError, EOFError):
+                break
+
+    threading.Thread(target=send_heartbeats, name='evaluation-heartbeat', daemon=True).start()
+    dispatcher: Optional[DistributedDispatcher] = None
+    try:
+        send(('register', name))
+        while True:
+            send(('ready',))
+            message = connection.recv()
+            if message[0] == 'dispatcher':
+                dispatcher = message[1]
+                message = connection.recv()
+            if message[0] != 'task':
+                break
+            task_id, graph, uid, fidelity = message[1:]
+            eval_res = dispatcher.evaluate_single(decode_graph(graph), uid,
+                                                  with_time_limit=False, fidelity=fidelity)
+            if eval_res is not None:
+                eval_res.graph = encode_graph(eval_res.graph)
+            send(('result', task_id, eval_res))
+    except (OSError, EOFError):
+        pass
+    finally:
+        is_stopped.set()
+        connection.close()
+        if dispatcher is not None:
+            dispatcher.shutdown()
+
+
+def _start_task(task: _Task) -> bool:
+    """Marks the task as running, returns False if it's cancelled or already done."""
+    if task.future.done():
+        return False
+    # re-queued tasks are already running
+    return task.attempts > 0 or task.future.set_running_or_notify_cancel()
+
+
+def _send(connection: Connection, message: tuple):
+    try:
+        connection.send(message)
+    except (OSError, EOFError):
+        pass
+
+
+def _parse_address(address: str) -> Address:
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Worker agent that evaluates graphs for DistributedDispatcher')
+    parser.add_argument('--address', required=True, help='address of the coordinator as host:port')
+    parser.add_argument('--authkey', default=os.environ.get('GOLEM_AUTHKEY'),
+                        help='key of the coordinator, GOLEM_AUTHKEY environment variable by default')
+    args = parser.parse_args()
+    if not args.authkey:
+        parser.error('--authkey or GOLEM_AUTHKEY environment variable is required')
+    run_evaluation_worker(_parse_address(args.address), args.authkey.encode())
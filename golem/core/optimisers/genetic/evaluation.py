@@ -1,22 +1,39 @@
+import datetime
 import gc
 import logging
 import pathlib
+import queue
+import threading
 import timeit
 from abc import ABC, abstractmethod
-from datetime import datetime
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from functools import partial
-from typing import List, Optional, Sequence, Tuple, TypeVar, Dict
+from itertools import chain
+from math import ceil
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Set, Tuple, TypeVar, Dict, Union
 
-from joblib import Parallel, delayed
+import psutil
+from func_timeout import FunctionTimedOut, func_timeout
+from joblib.externals.loky import ProcessPoolExecutor
 
 from golem.core.adapter import BaseOptimizationAdapter
+from golem.core.dag.array_graph import pack_at_rest
+from golem.core.dag.compact_graph import CompactGraph, decode_graph, encode_graph
 from golem.core.dag.graph import Graph
+from golem.core.dag.shared_graph_store import GraphTransport, SharedGraphHandle, load_graph
 from golem.core.log import default_log, Log
-from golem.core.optimisers.fitness import Fitness
+from golem.core.optimisers.fitness import Fitness, null_fitness, sort_by_fitness
+from golem.core.optimisers.genetic.evaluation_cost import EvaluationCostModel, EvaluationCostScheduler
+from golem.core.optimisers.genetic.evaluation_crashes import CrashIsolation, is_worker_crashed
+from golem.core.optimisers.genetic.evaluation_memory import MemoryBudget, PeakMemoryMonitor
+from golem.core.optimisers.genetic.evaluation_speculation import SpeculativeEvaluation
+from golem.core.optimisers.genetic.evaluation_telemetry import EvaluationTelemetryRecorder, TelemetryCallback
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache, CachedEvalResult, structural_key
 from golem.core.optimisers.genetic.operators.operator import EvaluationOperator, PopulationT
 from golem.core.optimisers.graph import OptGraph
-from golem.core.optimisers.objective import GraphFunction, ObjectiveFunction
-from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult
+from golem.core.optimisers.objective import BatchObjective, GraphFunction, MultiFidelityObjective, \
+    ObjectiveFunction
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
 from golem.core.optimisers.timer import Timer, get_forever_timer
 from golem.utilities.serializable import Serializable
 from golem.utilities.memory import MemoryAnalytics
@@ -25,13 +42,64 @@ from golem.utilities.utilities import determine_n_jobs
 # the percentage of successful evaluations,
 # at which evolution is not threatened with stagnation at the moment
 STAGNATION_EVALUATION_PERCENTAGE = 0.5
+# additional time given to the worker process after the graph evaluation timeout before it's killed
+WORKER_KILL_GRACE_SECONDS = 5.
+# how often the pool checks for the hung workers and the slow evaluations
+HUNG_WORKERS_POLL_SECONDS = 0.5
 
 EvalResultsList = List[GraphEvalResult]
 G = TypeVar('G', bound=Serializable)
 
+# Dispatcher copy that lives in the evaluation worker process.
+# It's shipped once by the pool initializer instead of being pickled with each task.
+_worker_dispatcher: Optional['BaseGraphEvaluationDispatcher'] = None
+
+
+def _init_evaluation_worker(dispatcher: 'BaseGraphEvaluationDispatcher',
+                            logs_initializer: Tuple[int, pathlib.Path]):
+    global _worker_dispatcher
+    Log.setup_in_mp(*logs_initializer)
+    _worker_dispatcher = dispatcher
+
+
+def _evaluate_in_worker(graph: Union[SharedGraphHandle, CompactGraph, OptGraph], uid_of_individual: str,
+                        with_time_limit: bool = True, fidelity: Optional[float] = None) -> GraphEvalResult:
+    with PeakMemoryMonitor(enabled=_worker_dispatcher.is_memory_measured) as memory_monitor:
+        eval_res = _worker_dispatcher.evaluate_single(load_graph(graph), uid_of_individual, with_time_limit,
+                                                      fidelity=fidelity)
+    memory_monitor.save_to([eval_res])
+    return _encode_result_graph(eval_res)
+
+
+def _evaluate_batch_in_worker(graphs: Sequence[Union[SharedGraphHandle, CompactGraph, OptGraph]],
+                              uids_of_individuals: Sequence[str],
+                              with_time_limit: bool = True) -> EvalResultsList:
+    with PeakMemoryMonitor(enabled=_worker_dispatcher.is_memory_measured) as memory_monitor:
+        evaluation_results = _worker_dispatcher.evaluate_batch([load_graph(graph) for graph in graphs],
+                                                               uids_of_individuals, with_time_limit)
+    memory_monitor.save_to(evaluation_results)
+    return [_encode_result_graph(eval_res) for eval_res in evaluation_results]
+
+
+def _encode_result_graph(eval_res: Optional[GraphEvalResult]) -> Optional[GraphEvalResult]:
+    if eval_res is not None:
+        eval_res.graph = encode_graph(eval_res.graph)
+    return eval_res
+
+
+def _resolved_future(result: Optional[GraphEvalResult]) -> Future:
+    future = Future()
+    future.set_result(result)
+    return future
+
 
 class DelegateEvaluator:
-    """Interface for delegate evaluator of graphs."""
+    """Interface for delegate evaluator of graphs.
+
+    Dispatcher evaluates the graphs as soon as they're computed by the delegate evaluator
+    (see `compute_graphs_streaming`), so the evaluation of the computed graphs overlaps
+    with the computation of the rest of them if the delegate evaluator streams the results.
+    """
 
     @property
     @abstractmethod
@@ -42,6 +110,67 @@ class DelegateEvaluator:
     def compute_graphs(self, graphs: Sequence[G]) -> Sequence[G]:
         raise NotImplementedError()
 
+    def compute_graphs_streaming(self, graphs: Sequence[G]) -> Iterator[Dict[int, G]]:
+        """Yields the computed graphs by their indices in ``graphs`` as soon as they're ready,
+        in one or several parts. Graphs that aren't yielded are evaluated as is.
+        By default, all graphs are computed at once with `compute_graphs`."""
+        yield dict(enumerate(self.compute_graphs(graphs)))
+
+
+class ChunkedDelegateEvaluator(DelegateEvaluator):
+    """Delegate evaluator that submits graphs for computation in chunks and streams the computed
+    chunks as soon as they're ready. Only ``max_pending_chunks`` chunks are submitted at once,
+    the next chunk is submitted when one of them is finished, so the remote side isn't flooded.
+
+    Implementations define `submit_chunk` that starts computation of the chunk without waiting for it.
+
+    Args:
+        chunk_size: max number of graphs in the chunk.
+        max_pending_chunks: max number of chunks that are computed at once.
+    """
+
+    def __init__(self, chunk_size: int = 10, max_pending_chunks: int = 2):
+        self.chunk_size = max(1, chunk_size)
+        self.max_pending_chunks = max(1, max_pending_chunks)
+
+    @abstractmethod
+    def submit_chunk(self, graphs: Sequence[G]) -> Future:
+        """Starts computation of the chunk of graphs.
+
+        Args:
+            graphs: graphs to compute
+
+        Returns:
+            Future: future that is resolved with the computed graphs in the same order.
+        """
+        raise NotImplementedError()
+
+    def compute_graphs(self, graphs: Sequence[G]) -> Sequence[G]:
+        computed_graphs = list(graphs)
+        for computed_part in self.compute_graphs_streaming(graphs):
+            for idx, graph in computed_part.items():
+                computed_graphs[idx] = graph
+        return computed_graphs
+
+    def compute_graphs_streaming(self, graphs: Sequence[G]) -> Iterator[Dict[int, G]]:
+        chunk_starts = iter(range(0, len(graphs), self.chunk_size))
+        pending_chunks: Dict[Future, int] = {}
+
+        def submit_next_chunk():
+            start = next(chunk_starts, None)
+            if start is not None:
+                pending_chunks[self.submit_chunk(graphs[start:start + self.chunk_size])] = start
+
+        for _ in range(self.max_pending_chunks):
+            submit_next_chunk()
+        while pending_chunks:
+            done, _ = wait(list(pending_chunks), return_when=FIRST_COMPLETED)
+            for future in done:
+                start = pending_chunks.pop(future)
+                # the remote side gets the next chunk before the results are processed
+                submit_next_chunk()
+                yield {start + offset: graph for offset, graph in enumerate(future.result())}
+
 
 class ObjectiveEvaluationDispatcher(ABC):
     """Builder for evaluation operator.
@@ -72,6 +201,26 @@ class ObjectiveEvaluationDispatcher(ABC):
         """
         pass
 
+    def set_telemetry_callback(self, callback: Optional[TelemetryCallback], count_ipc_bytes: bool = False):
+        """Set or reset (with None) callback that receives ``EvaluationTelemetry``
+        after each population evaluation.
+
+        Args:
+            callback: callback to be called with telemetry of each population evaluation
+            count_ipc_bytes: whether to count the volume of the data sent to the worker processes.
+                The data is pickled once more to count it, so it's disabled by default.
+        """
+        pass
+
+    def shutdown(self, kill_workers: bool = False):
+        """Releases resources (e.g. worker processes) held by the dispatcher.
+        Dispatcher stays usable: the resources are acquired again on the next evaluation.
+
+        Args:
+            kill_workers: whether to terminate the running evaluations instead of waiting for them
+        """
+        pass
+
     @staticmethod
     def split_individuals_to_evaluate(individuals: PopulationT) -> Tuple[PopulationT, PopulationT]:
         """Split individuals sequence to evaluated and skipped ones."""
@@ -88,14 +237,22 @@ class ObjectiveEvaluationDispatcher(ABC):
     def apply_evaluation_results(individuals: PopulationT,
                                  evaluation_results: EvalResultsList) -> PopulationT:
         """Applies results of evaluation to the evaluated population.
-        Excludes individuals that weren't evaluated."""
-        evaluation_results = {res.uid_of_individual: res for res in evaluation_results if res}
+        Excludes individuals that weren't evaluated.
+        Metadata of unsuccessful evaluations (e.g. timeout flag) is still saved in the individuals.
+        Graphs that are received from the evaluation workers in compact form are decoded,
+        evaluated graphs stored in the arrays are packed (see `pack_at_rest`)."""
+        evaluation_results = {res.uid_of_individual: res for res in evaluation_results if res is not None}
         individuals_evaluated = []
         for ind in individuals:
             eval_res = evaluation_results.get(ind.uid)
+            if eval_res is None:
+                continue
             if not eval_res:
+                ind.metadata.update(eval_res.metadata)
                 continue
+            eval_res.graph = decode_graph(eval_res.graph)
             ind.set_evaluation_result(eval_res)
+            pack_at_rest(ind.graph)
             individuals_evaluated.append(ind)
         return individuals_evaluated
 
@@ -110,18 +267,50 @@ class BaseGraphEvaluationDispatcher(ObjectiveEvaluationDispatcher):
         n_jobs: number of jobs for multiprocessing or 1 for no multiprocessing.
         graph_cleanup_fn: function to call after graph evaluation, primarily for memory cleanup.
         delegate_evaluator: delegate graph fitter (e.g. for remote graph fitting before evaluation)
+        fitness_cache: optional cache of fitness for structurally identical graphs
+        max_graph_fit_time: optional time limit for evaluation of each graph.
+            Evaluation that exceeds it is interrupted and gets invalid fitness
+            with ``evaluation_timeout`` flag in its metadata.
+        objective_batch_size: max number of graphs evaluated at once with ``BatchObjective``.
+            By default, population is evenly split between the jobs.
+        return_evaluated_graphs: whether to return the graphs after evaluation. Individuals keep
+            their own graphs otherwise, it's cheaper if the objective doesn't modify the graphs.
+        collect_garbage: whether to run garbage collection after each graph evaluation to contain the leaks.
+
+    Computation time of the graph evaluations is predicted with ``EvaluationCostModel``
+    that is fitted on the previous evaluations. In the case of parallel evaluation graphs are submitted
+    in the order of decreasing predicted time (longest job first), so the large graphs don't delay
+    the end of the generation. Predicted time is saved in the ``predicted_computation_time_in_seconds``
+    field of the evaluation metadata near the actual one.
+
+    Telemetry of each population evaluation (see ``EvaluationTelemetry``) is collected
+    only if the telemetry callback is set with `set_telemetry_callback`.
     """
 
     def __init__(self,
                  adapter: BaseOptimizationAdapter,
                  n_jobs: int = 1,
                  graph_cleanup_fn: Optional[GraphFunction] = None,
-                 delegate_evaluator: Optional[DelegateEvaluator] = None):
+                 delegate_evaluator: Optional[DelegateEvaluator] = None,
+                 fitness_cache: Optional[FitnessCache] = None,
+                 max_graph_fit_time: Optional[datetime.timedelta] = None,
+                 objective_batch_size: Optional[int] = None,
+                 return_evaluated_graphs: bool = True,
+                 collect_garbage: bool = True):
         self._adapter = adapter
         self._objective_eval = None
         self._cleanup = graph_cleanup_fn
         self._post_eval_callback = None
         self._delegate_evaluator = delegate_evaluator
+        self._fitness_cache = fitness_cache
+        self._pending_evaluations: Set[Future] = set()
+        self._max_graph_fit_time = max_graph_fit_time
+        self._objective_batch_size = objective_batch_size
+        self._return_evaluated_graphs = return_evaluated_graphs
+        self._collect_garbage = collect_garbage
+        self._cost_scheduler = EvaluationCostScheduler()
+        self._telemetry = EvaluationTelemetryRecorder()
+        self.timeouts_num = 0
 
         self.timer = None
         self.logger = default_log(self)
@@ -134,11 +323,83 @@ class BaseGraphEvaluationDispatcher(ObjectiveEvaluationDispatcher):
         and allows only to evaluate population with provided objective."""
         self._objective_eval = objective
         self.timer = timer or get_forever_timer()
+        if self._fitness_cache is not None:
+            self._fitness_cache.set_objective(objective)
         return self.evaluate_population
 
     def set_graph_evaluation_callback(self, callback: Optional[GraphFunction]):
         self._post_eval_callback = callback
 
+    def set_telemetry_callback(self, callback: Optional[TelemetryCallback], count_ipc_bytes: bool = False):
+        self._telemetry.callback = callback
+        self._telemetry.count_ipc_bytes = count_ipc_bytes
+
+    @property
+    def fitness_cache(self) -> Optional[FitnessCache]:
+        return self._fitness_cache
+
+    @property
+    def cost_model(self) -> EvaluationCostModel:
+        return self._cost_scheduler.cost_model
+
+    @property
+    def is_memory_measured(self) -> bool:
+        """Whether peak memory of the evaluations is measured in the workers."""
+        return False
+
+    def shutdown(self, kill_workers: bool = False):
+        self._cancel_pending_evaluations()
+        if self._fitness_cache is not None:
+            self._fitness_cache.close()
+
+    def submit(self, individual: Individual) -> Future:
+        """Starts evaluation of the single individual without waiting for its result.
+        Must be called after `dispatch()`.
+
+        Args:
+            individual: individual to evaluate
+
+        Returns:
+            Future: future that is resolved with ``GraphEvalResult`` or with None
+            if the individual wasn't evaluated (e.g. because of the time limit).
+            The result should be applied with `apply_evaluation_results`.
+        """
+        cache_key = None
+        if self._fitness_cache is not None:
+            cache_key = self._fitness_cache.key(individual.graph)
+            cached = self._fitness_cache.get(cache_key)
+            if cached is not None:
+                return _resolved_future(self._cached_eval_result(individual, cached))
+        future = self._submit_single(individual)
+        self._pending_evaluations.add(future)
+        future.add_done_callback(partial(self._on_submitted_evaluation_done, cache_key))
+        return future
+
+    def _submit_single(self, individual: Individual) -> Future:
+        """Starts evaluation of the individual. By default, it's evaluated right away."""
+        return _resolved_future(self.evaluate_single(individual.graph, individual.uid))
+
+    def _on_submitted_evaluation_done(self, cache_key: Optional[str], future: Future):
+        self._pending_evaluations.discard(future)
+        if future.cancelled() or future.exception() is not None:
+            return
+        eval_res = future.result()
+        self._update_evaluation_stats([eval_res])
+        if cache_key is not None and eval_res and self._is_full_fidelity(eval_res):
+            self._fitness_cache.put(cache_key, eval_res.fitness, eval_res.metadata)
+
+    def _update_evaluation_stats(self, evaluation_results: EvalResultsList):
+        timeouts_num = sum(1 for res in evaluation_results
+                           if res is not None and res.metadata.get('evaluation_timeout'))
+        if timeouts_num:
+            self.timeouts_num += timeouts_num
+            self.logger.warning(f'{timeouts_num} graph evaluations were interrupted by the timeout '
+                                f'({self.timeouts_num} in total)')
+
+    def _cancel_pending_evaluations(self):
+        for future in list(self._pending_evaluations):
+            future.cancel()
+
     def population_evaluation_info(self, pop_size: int, evaluated_pop_size: int):
         """ Shows the amount of successfully evaluated individuals and total number of individuals in population.
          If there are more that 50% of successful evaluations than it's more likely
@@ -151,6 +412,8 @@ class BaseGraphEvaluationDispatcher(ObjectiveEvaluationDispatcher):
         else:
             self.logger.message(f"{evaluated_pop_size} individuals out of {pop_size} in previous population "
                                 f"were evaluated successfully.")
+        if self.timeouts_num:
+            self.logger.message(f"{self.timeouts_num} graph evaluations exceeded the time limit in total.")
 
     @abstractmethod
     def evaluate_population(self, individuals: PopulationT) -> PopulationT:
@@ -158,9 +421,10 @@ class BaseGraphEvaluationDispatcher(ObjectiveEvaluationDispatcher):
 
     def evaluate_single(self, graph: OptGraph, uid_of_individual: str, with_time_limit: bool = True,
                         cache_key: Optional[str] = None,
-                        logs_initializer: Optional[Tuple[int, pathlib.Path]] = None) -> GraphEvalResult:
+                        logs_initializer: Optional[Tuple[int, pathlib.Path]] = None,
+                        fidelity: Optional[float] = None) -> GraphEvalResult:
 
-        graph = self.evaluation_cache.get(cache_key, graph)
+        graph = self.evaluation_cache.get(cache_key or uid_of_individual, graph)
 
         if with_time_limit and self.timer.is_time_limit_reached():
             return None
@@ -168,54 +432,322 @@ class BaseGraphEvaluationDispatcher(ObjectiveEvaluationDispatcher):
             # in case of multiprocessing run
             Log.setup_in_mp(*logs_initializer)
 
+        if fidelity is None and self._is_multi_fidelity_objective:
+            fidelity = self._objective_eval.max_fidelity
         adapted_evaluate = self._adapter.adapt_func(self._evaluate_graph)
         start_time = timeit.default_timer()
-        fitness, graph = adapted_evaluate(graph)
+        try:
+            fitness, graph = self._evaluate_with_timeout(adapted_evaluate, graph, fidelity=fidelity)
+            timed_out = False
+        except FunctionTimedOut:
+            self.logger.warning(f'Evaluation of the graph of individual {uid_of_individual} '
+                                f'was interrupted by the timeout {self._max_graph_fit_time}')
+            fitness = null_fitness()
+            timed_out = True
         end_time = timeit.default_timer()
-        eval_time_iso = datetime.now().isoformat()
 
         eval_res = GraphEvalResult(
-            uid_of_individual=uid_of_individual, fitness=fitness, graph=graph, metadata={
-                'computation_time_in_seconds': end_time - start_time,
-                'evaluation_time_iso': eval_time_iso
-            }
+            uid_of_individual=uid_of_individual, fitness=fitness,
+            graph=graph if self._return_evaluated_graphs else None,
+            metadata=self._evaluation_metadata(end_time - start_time, timed_out, fidelity)
         )
         return eval_res
 
-    def _evaluate_graph(self, domain_graph: Graph) -> Tuple[Fitness, Graph]:
-        fitness = self._objective_eval(domain_graph)
+    def evaluate_batch(self, graphs: Sequence[OptGraph], uids_of_individuals: Sequence[str],
+                       with_time_limit: bool = True) -> EvalResultsList:
+        """Evaluates the batch of graphs at once with ``BatchObjective``."""
+        if with_time_limit and self.timer.is_time_limit_reached():
+            return [None] * len(graphs)
+
+        adapted_evaluate = self._adapter.adapt_func(self._evaluate_graph_batch)
+        start_time = timeit.default_timer()
+        try:
+            fitnesses, graphs = self._evaluate_with_timeout(adapted_evaluate, list(graphs), len(graphs))
+            timed_out = False
+        except FunctionTimedOut:
+            self.logger.warning(f'Evaluation of the batch of {len(graphs)} graphs '
+                                f'was interrupted by the timeout {self._max_graph_fit_time} per graph')
+            fitnesses = [null_fitness() for _ in graphs]
+            timed_out = True
+        end_time = timeit.default_timer()
+
+        # computation time is shared equally between the graphs of the batch
+        computation_time = (end_time - start_time) / len(graphs)
+        if not self._return_evaluated_graphs:
+            graphs = [None] * len(graphs)
+        return [GraphEvalResult(uid_of_individual=uid, fitness=fitness, graph=graph,
+                                metadata=self._evaluation_metadata(computation_time, timed_out,
+                                                                   evaluation_batch_size=len(graphs)))
+                for uid, fitness, graph in zip(uids_of_individuals, fitnesses, graphs)]
+
+    @staticmethod
+    def _evaluation_metadata(computation_time: float, timed_out: bool = False, fidelity: Optional[float] = None,
+                             **metadata) -> Dict[str, Any]:
+        metadata.update({
+            'computation_time_in_seconds': computation_time,
+            'evaluation_time_iso': datetime.datetime.now().isoformat()
+        })
+        if timed_out:
+            metadata['evaluation_timeout'] = True
+        if fidelity is not None:
+            metadata['evaluation_fidelity'] = fidelity
+        return metadata
+
+    def _evaluate_with_timeout(self, evaluate: Callable, graph: Any, graphs_num: int = 1, **kwargs) -> Any:
+        if self._max_graph_fit_time is None:
+            return evaluate(graph, **kwargs)
+        # raises the exception inside the evaluating thread, so the evaluation is interrupted
+        return func_timeout(self._max_graph_fit_time.total_seconds() * graphs_num, evaluate,
+                            args=(graph,), kwargs=kwargs)
+
+    @property
+    def _is_batch_objective(self) -> bool:
+        return isinstance(self._objective_eval, BatchObjective)
+
+    @property
+    def _is_multi_fidelity_objective(self) -> bool:
+        return isinstance(self._objective_eval, MultiFidelityObjective)
+
+    def _split_into_batches(self, individuals: PopulationT, n_jobs: int) -> List[PopulationT]:
+        batch_size = self._objective_batch_size or max(1, ceil(len(individuals) / n_jobs))
+        return self._cost_scheduler.split_into_batches(individuals, batch_size)
+
+    def _evaluate_in_process(self, individuals: PopulationT, fidelity: Optional[float] = None) -> EvalResultsList:
+        if self._is_batch_objective:
+            return list(chain.from_iterable(self.evaluate_batch([self._graph_to_evaluate(ind) for ind in batch],
+                                                                [ind.uid for ind in batch])
+                                            for batch in self._split_into_batches(individuals, n_jobs=1)))
+        return [self.evaluate_single(ind.graph, ind.uid, fidelity=fidelity) for ind in individuals]
+
+    @staticmethod
+    def _timeout_eval_result(individual: Individual) -> GraphEvalResult:
+        return GraphEvalResult(uid_of_individual=individual.uid, fitness=null_fitness(),
+                               graph=individual.graph, metadata={'evaluation_timeout': True})
+
+    def evaluate_with_fitness_cache(self, individuals: PopulationT,
+                                    evaluate: Callable[..., EvalResultsList]) -> EvalResultsList:
+        """Evaluates individuals using ``evaluate`` function only for the graph structures
+        that are neither in the fitness cache nor repeated in the same population.
+        ``MultiFidelityObjective`` is evaluated with successive halving (see `evaluate_with_fidelities`),
+        only the results of the highest fidelity are cached.
+        Telemetry of the evaluation is reported to the telemetry callback if it's set."""
+        return self._telemetry.record(individuals, partial(self._evaluate_with_fitness_cache, evaluate=evaluate),
+                                      n_jobs=determine_n_jobs(self._n_jobs))
+
+    def _evaluate_with_fitness_cache(self, individuals: PopulationT,
+                                     evaluate: Callable[..., EvalResultsList]) -> EvalResultsList:
+        if self._fitness_cache is None:
+            return self.evaluate_with_fidelities(individuals, evaluate)
+
+        cached_results = []
+        individuals_to_evaluate = []
+        duplicates: List[Tuple[Individual, str]] = []
+        keys: Dict[str, str] = {}
+        pending_keys = set()
+        for ind in individuals:
+            key = self._fitness_cache.key(ind.graph)
+            if key in pending_keys:
+                duplicates.append((ind, key))
+                continue
+            cached = self._fitness_cache.get(key)
+            if cached is not None:
+                cached_results.append(self._cached_eval_result(ind, cached))
+            else:
+                keys[ind.uid] = key
+                pending_keys.add(key)
+                individuals_to_evaluate.append(ind)
+
+        evaluation_results = self.evaluate_with_fidelities(individuals_to_evaluate, evaluate)
+        for eval_res in evaluation_results:
+            if eval_res and self._is_full_fidelity(eval_res):
+                self._fitness_cache.put(keys[eval_res.uid_of_individual], eval_res.fitness, eval_res.metadata)
+        for ind, key in duplicates:
+            cached = self._fitness_cache.get(key)
+            if cached is not None:
+                cached_results.append(self._cached_eval_result(ind, cached))
+
+        self.logger.info(f'Fitness cache hit rate: {self._fitness_cache.hit_rate:.3f} ({self._fitness_cache})')
+        return list(evaluation_results) + cached_results
+
+    def evaluate_with_fidelities(self, individuals: PopulationT,
+                                 evaluate: Callable[..., EvalResultsList]) -> EvalResultsList:
+        """Evaluates ``MultiFidelityObjective`` with successive halving: all individuals are evaluated
+        at the lowest fidelity, then the best part of them is evaluated at the next fidelity and so on.
+        Individual gets the result of the highest fidelity it was evaluated at.
+        Other objectives are evaluated with ``evaluate`` function as is.
+
+        Args:
+            individuals: individuals to evaluate
+            evaluate: function that evaluates individuals at the fidelity passed as ``fidelity`` keyword argument
+        """
+        if not self._is_multi_fidelity_objective:
+            return self._evaluate_scheduled(individuals, evaluate)
+
+        objective: MultiFidelityObjective = self._objective_eval
+        evaluation_results: Dict[str, GraphEvalResult] = {}
+        candidates = individuals
+        for fidelity in objective.fidelities:
+            if not candidates:
+                break
+            stage_results = [res for res in self._evaluate_scheduled(candidates, evaluate, fidelity)
+                             if res is not None]
+            # result of the higher fidelity replaces the previous one, even if it's unsuccessful
+            evaluation_results.update((res.uid_of_individual, res) for res in stage_results)
+            # promoted results don't depend on the order of the results, even for multi-objective fitness
+            successful_results = sort_by_fitness([res for res in stage_results if res], key=lambda res: res.fitness)
+            promoted_num = ceil(len(successful_results) * objective.promotion_fraction)
+            promoted_uids = {res.uid_of_individual for res in successful_results[:promoted_num]}
+            candidates = [ind for ind in candidates if ind.uid in promoted_uids]
+            self.logger.info(f'{len(stage_results)} graphs were evaluated at fidelity {fidelity}, '
+                             f'{len(candidates)} of them are promoted')
+        return list(evaluation_results.values())
+
+    def _evaluate_scheduled(self, individuals: PopulationT, evaluate: Callable[..., EvalResultsList],
+                            fidelity: Optional[float] = None) -> EvalResultsList:
+        """Evaluates individuals in the order of decreasing predicted computation time
+        (if evaluation is parallel) and updates the cost model with the actual time."""
+        evaluation_kwargs = {'fidelity': fidelity} if fidelity is not None else {}
+        graphs = {ind.uid: ind.graph for ind in individuals}
+        self._cost_scheduler.predict(graphs, fidelity)
+        if self._n_jobs != 1:
+            individuals = self._cost_scheduler.order(individuals, graphs)
+        try:
+            evaluation_results = evaluate(individuals, **evaluation_kwargs)
+        except BaseException:
+            self._cost_scheduler.reset()
+            raise
+
+        self._cost_scheduler.update(graphs, evaluation_results, fidelity)
+        if self.cost_model.mean_absolute_error is not None:
+            self.logger.info(f'Mean absolute error of the predicted evaluation time: '
+                             f'{self.cost_model.mean_absolute_error:.3f} s')
+        return evaluation_results
+
+    def _is_full_fidelity(self, eval_res: GraphEvalResult) -> bool:
+        fidelity = eval_res.metadata.get('evaluation_fidelity')
+        return fidelity is None or fidelity == self._objective_eval.max_fidelity
+
+    @staticmethod
+    def _cached_eval_result(individual: Individual, cached: CachedEvalResult) -> GraphEvalResult:
+        fitness, metadata = cached
+        metadata['cached_evaluation'] = True
+        return GraphEvalResult(uid_of_individual=individual.uid, fitness=fitness,
+                               graph=individual.graph, metadata=metadata)
+
+    def _evaluate_graph(self, domain_graph: Graph, fidelity: Optional[float] = None) -> Tuple[Fitness, Graph]:
+        if fidelity is None:
+            fitness = self._objective_eval(domain_graph)
+        else:
+            fitness = self._objective_eval(domain_graph, fidelity=fidelity)
 
         if self._post_eval_callback:
             self._post_eval_callback(domain_graph)
         if self._cleanup:
             self._cleanup(domain_graph)
-        gc.collect()
+        if self._collect_garbage:
+            gc.collect()
 
         return fitness, domain_graph
 
+    def _evaluate_graph_batch(self, domain_graphs: Sequence[Graph]) -> Tuple[Sequence[Fitness], Sequence[Graph]]:
+        fitnesses = self._objective_eval.evaluate_batch(domain_graphs)
+
+        for domain_graph in domain_graphs:
+            if self._post_eval_callback:
+                self._post_eval_callback(domain_graph)
+            if self._cleanup:
+                self._cleanup(domain_graph)
+        if self._collect_garbage:
+            gc.collect()
+
+        return fitnesses, domain_graphs
+
     def evaluate_with_cache(self, population: PopulationT) -> PopulationT:
         reversed_population = list(reversed(population))
-        self._remote_compute_cache(reversed_population)
-        evaluated_population = self.evaluate_population(reversed_population)
+        self._reset_eval_cache()
+        if self._delegate_evaluator and self._delegate_evaluator.is_enabled:
+            evaluated_population = self._evaluate_with_delegate(reversed_population)
+        else:
+            evaluated_population = self.evaluate_population(reversed_population)
         self._reset_eval_cache()
         return evaluated_population
 
     def _reset_eval_cache(self):
         self.evaluation_cache: Dict[str, Graph] = {}
 
-    def _remote_compute_cache(self, population: PopulationT):
-        self._reset_eval_cache()
-        if self._delegate_evaluator and self._delegate_evaluator.is_enabled:
-            self.logger.info('Remote fit used')
-            restored_graphs = self._adapter.restore(population)
-            computed_graphs = self._delegate_evaluator.compute_graphs(restored_graphs)
-            self.evaluation_cache = {ind.uid: graph for ind, graph in zip(population, computed_graphs)}
+    def _evaluate_with_delegate(self, population: PopulationT) -> PopulationT:
+        """Evaluates individuals as soon as their graphs are computed by the delegate evaluator,
+        while it computes the rest of the graphs in the background thread."""
+        self.logger.info('Remote fit used')
+        individuals_to_compute, individuals_to_skip = self.split_individuals_to_evaluate(population)
+        computed_parts = queue.Queue()
+        computation = threading.Thread(target=self._compute_with_delegate,
+                                       args=(self._adapter.restore(individuals_to_compute), computed_parts),
+                                       name='delegate-evaluation', daemon=True)
+        computation.start()
+
+        evaluated_population = []
+        computed_individuals = set()
+        is_computed = False
+        while not is_computed:
+            # all the parts that are ready are evaluated at once
+            parts = [computed_parts.get()]
+            while not computed_parts.empty():
+                parts.append(computed_parts.get())
+            ready_individuals = []
+            for part in parts:
+                if part is None:
+                    is_computed = True
+                elif isinstance(part, BaseException):
+                    raise part
+                else:
+                    for idx, graph in part.items():
+                        individual = individuals_to_compute[idx]
+                        self.evaluation_cache[individual.uid] = graph
+                        if individual.uid not in computed_individuals:
+                            computed_individuals.add(individual.uid)
+                            ready_individuals.append(individual)
+            if ready_individuals:
+                evaluated_population.extend(self.evaluate_population(ready_individuals))
+        # the graphs that weren't computed are evaluated as is
+        not_computed_individuals = [ind for ind in individuals_to_compute if ind.uid not in computed_individuals]
+        if not_computed_individuals:
+            evaluated_population.extend(self.evaluate_population(not_computed_individuals))
+        return evaluated_population + individuals_to_skip
+
+    def _compute_with_delegate(self, graphs: Sequence[Graph], computed_parts: queue.Queue):
+        try:
+            for computed_part in self._delegate_evaluator.compute_graphs_streaming(graphs):
+                computed_parts.put(computed_part)
+        except BaseException as ex:
+            computed_parts.put(ex)
+        finally:
+            computed_parts.put(None)
+
+    def _graph_to_evaluate(self, individual: Individual) -> OptGraph:
+        """Returns the graph computed by the delegate evaluator for the individual if it's computed,
+        otherwise the graph of the individual."""
+        return self.evaluation_cache.get(individual.uid, individual.graph)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # delegate results are per-population, the caches, the cost model and the futures belong to the main process
+        state['evaluation_cache'] = {}
+        state['_fitness_cache'] = None
+        state['_pending_evaluations'] = set()
+        state['_cost_scheduler'] = EvaluationCostScheduler()
+        return state
 
 
 class MultiprocessingDispatcher(BaseGraphEvaluationDispatcher):
     """Evaluates objective function on population using multiprocessing pool
     and optionally model evaluation cache with RemoteEvaluator.
 
+    The pool of worker processes is owned by the dispatcher and is reused across generations.
+    It's started lazily on the first evaluation after `dispatch()`, the objective is shipped
+    to each worker only once at its start, and the workers are kept warm until `shutdown()`.
+    Graphs are sent to the workers and back in the compact form (see ``CompactGraph``) when it's possible.
+
     Usage: call `dispatch(objective_function)` to get evaluation function.
 
     Args:
@@ -223,30 +755,109 @@ class MultiprocessingDispatcher(BaseGraphEvaluationDispatcher):
         n_jobs: number of jobs for multiprocessing or 1 for no multiprocessing.
         graph_cleanup_fn: function to call after graph evaluation, primarily for memory cleanup.
         delegate_evaluator: delegate graph fitter (e.g. for remote graph fitting before evaluation)
+        fitness_cache: optional cache of fitness for structurally identical graphs
+        max_graph_fit_time: optional time limit for evaluation of each graph.
+            Evaluation is interrupted inside the worker when it exceeds the limit.
+            If the worker doesn't respond (e.g. it's stuck in native code), then it's killed
+            and the pool is restarted.
+        objective_batch_size: max number of graphs evaluated at once with ``BatchObjective``.
+            By default, population is evenly split between the jobs.
+        return_evaluated_graphs: whether to return the graphs after evaluation. Individuals keep
+            their own graphs otherwise, it's cheaper if the objective doesn't modify the graphs.
+        speculative_evaluation: whether to duplicate the slow evaluations on the idle workers
+            (see ``SpeculativeEvaluation``). The first result is taken, the other copy is cancelled
+            if it isn't started yet, otherwise its result is ignored. It isn't applied to ``BatchObjective``.
+        collect_garbage: whether to run garbage collection after each graph evaluation to contain the leaks.
+            It can be disabled if the workers are recycled.
+        evaluation_retries: how many times the evaluation is retried if the worker process crashes
+            (e.g. the objective segfaults), see ``CrashIsolation``.
+        max_tasks_per_worker: optional number of evaluations per worker after which the workers are recycled.
+        max_worker_memory: optional resident memory of the worker in MiB above which the workers are recycled.
+            Workers are recycled only between the generations, the pool is restarted as a whole.
+        shared_memory_population: whether the graphs of population are sent to the workers through
+            the shared memory (see ``GraphTransport``). Graphs are written there once per population
+            evaluation and only their small handles are sent with the tasks. It reduces the volume
+            of interprocess communication for the large graphs and the high number of jobs.
+        memory_budget: optional total memory in MiB the concurrent evaluations may use (see ``MemoryBudget``).
+            The large graphs are evaluated with fewer concurrent jobs, and the small ones with all jobs.
     """
 
     def __init__(self,
                  adapter: BaseOptimizationAdapter,
                  n_jobs: int = 1,
                  graph_cleanup_fn: Optional[GraphFunction] = None,
-                 delegate_evaluator: Optional[DelegateEvaluator] = None):
+                 delegate_evaluator: Optional[DelegateEvaluator] = None,
+                 fitness_cache: Optional[FitnessCache] = None,
+                 max_graph_fit_time: Optional[datetime.timedelta] = None,
+                 objective_batch_size: Optional[int] = None,
+                 return_evaluated_graphs: bool = True,
+                 speculative_evaluation: bool = False,
+                 collect_garbage: bool = True,
+                 evaluation_retries: int = 1,
+                 max_tasks_per_worker: Optional[int] = None,
+                 max_worker_memory: Optional[float] = None,
+                 shared_memory_population: bool = False,
+                 memory_budget: Optional[float] = None):
 
-        super().__init__(adapter, n_jobs, graph_cleanup_fn, delegate_evaluator)
+        super().__init__(adapter, n_jobs, graph_cleanup_fn, delegate_evaluator, fitness_cache,
+                         max_graph_fit_time, objective_batch_size, return_evaluated_graphs, collect_garbage)
+        self._speculative_evaluation = speculative_evaluation
+        self._crash_isolation = CrashIsolation(evaluation_retries,
+                                               key_func=fitness_cache.key if fitness_cache else structural_key)
+        self._max_tasks_per_worker = max_tasks_per_worker
+        self._max_worker_memory = max_worker_memory
+        self._graph_transport = GraphTransport(shared_memory=shared_memory_population)
+        self._memory_budget = MemoryBudget(memory_budget) if memory_budget is not None else None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_size = 0
+        self._pool_tasks_num = 0
+        self._is_pool_broken = False
+        self.speculative_evaluations_num = 0
 
     def dispatch(self, objective: ObjectiveFunction, timer: Optional[Timer] = None) -> EvaluationOperator:
         """Return handler to this object that hides all details
         and allows only to evaluate population with provided objective."""
+        # workers keep the objective and the timer they were started with
+        self.shutdown()
         super().dispatch(objective, timer)
         return self.evaluate_with_cache
 
+    def set_graph_evaluation_callback(self, callback: Optional[GraphFunction]):
+        self.shutdown()
+        super().set_graph_evaluation_callback(callback)
+
+    @property
+    def memory_model(self) -> Optional[EvaluationCostModel]:
+        """Model that predicts peak memory of the worker in MiB during the graph evaluation
+        or None if the memory budget isn't set."""
+        return self._memory_budget.model if self._memory_budget is not None else None
+
+    @property
+    def crashes_num(self) -> int:
+        """Number of the graphs which evaluation crashed the worker."""
+        return self._crash_isolation.crashes_num
+
+    @property
+    def is_memory_measured(self) -> bool:
+        return self._memory_budget is not None
+
+    def shutdown(self, kill_workers: bool = False):
+        self._cancel_pending_evaluations()
+        self._shutdown_pool(kill_workers)
+        super().shutdown(kill_workers)
+
     def evaluate_population(self, individuals: PopulationT) -> PopulationT:
         individuals_to_evaluate, individuals_to_skip = self.split_individuals_to_evaluate(individuals)
         # Evaluate individuals without valid fitness in parallel.
         n_jobs = determine_n_jobs(self._n_jobs, self.logger)
 
-        parallel = Parallel(n_jobs=n_jobs, verbose=0, pre_dispatch="2*n_jobs")
-        eval_func = partial(self.evaluate_single, logs_initializer=Log().get_parameters())
-        evaluation_results = parallel(delayed(eval_func)(ind.graph, ind.uid) for ind in individuals_to_evaluate)
+        try:
+            evaluation_results = self.evaluate_with_fitness_cache(
+                individuals_to_evaluate, partial(self._evaluate_in_pool, n_jobs=n_jobs))
+        except BaseException:
+            self.shutdown(kill_workers=True)
+            raise
+        self._update_evaluation_stats(evaluation_results)
         individuals_evaluated = self.apply_evaluation_results(individuals_to_evaluate, evaluation_results)
         # If there were no successful evals then try once again getting at least one,
         # even if time limit was reached
@@ -255,7 +866,7 @@ class MultiprocessingDispatcher(BaseGraphEvaluationDispatcher):
                                         pop_size=len(individuals))
         if not successful_evals:
             for single_ind in individuals:
-                evaluation_result = eval_func(single_ind.graph, single_ind.uid, with_time_limit=False)
+                evaluation_result = self.evaluate_single(single_ind.graph, single_ind.uid, with_time_limit=False)
                 successful_evals = self.apply_evaluation_results([single_ind], [evaluation_result])
                 if successful_evals:
                     break
@@ -264,6 +875,351 @@ class MultiprocessingDispatcher(BaseGraphEvaluationDispatcher):
                             logging_level=logging.INFO)
         return successful_evals
 
+    def _evaluate_in_pool(self, individuals: PopulationT, n_jobs: int,
+                          fidelity: Optional[float] = None) -> EvalResultsList:
+        individuals, evaluation_results = self._crash_isolation.split_quarantined(individuals)
+        if n_jobs == 1:
+            return evaluation_results + self._evaluate_in_process(individuals, fidelity)
+        with self._graph_transport.share({ind.uid: self._graph_to_evaluate(ind) for ind in individuals}):
+            return evaluation_results + self._evaluate_tasks_in_pool(individuals, n_jobs, fidelity)
+
+    def _evaluate_tasks_in_pool(self, individuals: PopulationT, n_jobs: int,
+                                fidelity: Optional[float] = None) -> EvalResultsList:
+        evaluation_results = []
+        pool = self._get_pool(n_jobs)
+        if self._is_batch_objective:
+            batches = self._split_into_batches(individuals, n_jobs)
+        else:
+            batches = [[ind] for ind in individuals]
+        throttled_tasks_num = self._memory_budget.throttled_tasks_num if self._memory_budget else 0
+        tasks = [(batch, self._submit_task(pool, batch, fidelity)) for batch in batches]
+        resubmit = partial(self._submit_task, pool, fidelity=fidelity) \
+            if self._speculative_evaluation and not self._is_batch_objective else None
+        finished_futures = self._wait_for_workers(dict((future, batch) for batch, future in tasks), n_jobs, resubmit)
+        if self._memory_budget and self._memory_budget.throttled_tasks_num > throttled_tasks_num:
+            self.logger.info(f'{self._memory_budget.throttled_tasks_num - throttled_tasks_num} evaluations '
+                             f'waited for the memory budget {self._memory_budget.memory_budget} MiB')
+        hung_futures_num = sum(1 for future in finished_futures.values() if future is None)
+        if hung_futures_num:
+            self.logger.warning(f'{hung_futures_num} evaluation workers did not respond after the timeout, '
+                                f'restarting the pool')
+            self._shutdown_pool(kill_workers=True)
+        crashed_batches = [batch for batch, future in tasks if is_worker_crashed(finished_futures[future])]
+        if crashed_batches:
+            self.logger.warning(f'Evaluation worker crashed, {sum(map(len, crashed_batches))} graphs '
+                                f'are retried up to {self._crash_isolation.retries} times')
+            self._shutdown_pool(kill_workers=True)
+
+        for batch, future in tasks:
+            finished_future = finished_futures[future]
+            if finished_future is None:
+                evaluation_results.extend(self._timeout_eval_result(ind) for ind in batch)
+            elif is_worker_crashed(finished_future):
+                for ind in batch:
+                    evaluation_results.extend(self._crash_isolation.retry(
+                        ind, partial(self._evaluate_isolated, n_jobs=n_jobs, fidelity=fidelity)))
+            else:
+                task_results = self._task_results(finished_future)
+                if finished_future is not future:
+                    for eval_res in task_results:
+                        if eval_res is not None:
+                            eval_res.metadata['speculative_evaluation'] = True
+                evaluation_results.extend(task_results)
+        self._update_memory_model(individuals, evaluation_results, fidelity)
+        return evaluation_results
+
+    def _submit_task(self, pool: ProcessPoolExecutor, individuals: PopulationT,
+                     fidelity: Optional[float] = None) -> Future:
+        self._pool_tasks_num += len(individuals)
+        if self._is_batch_objective:
+            task_args = ([self._task_graph(ind) for ind in individuals], [ind.uid for ind in individuals])
+            self._telemetry.add_ipc_bytes(task_args)
+            start = partial(pool.submit, _evaluate_batch_in_worker, *task_args)
+        else:
+            individual = individuals[0]
+            task_args = (self._task_graph(individual), individual.uid)
+            self._telemetry.add_ipc_bytes(task_args)
+            start = partial(pool.submit, _evaluate_in_worker, *task_args, fidelity=fidelity)
+        return self._start_task(start, individuals, fidelity)
+
+    def _start_task(self, start: Callable[[], Future], individuals: PopulationT,
+                    fidelity: Optional[float] = None) -> Future:
+        """Starts the task at once or when it fits the memory budget."""
+        if self._memory_budget is None:
+            return start()
+        return self._memory_budget.start(start, [self._graph_to_evaluate(ind) for ind in individuals], fidelity)
+
+    def _update_memory_model(self, individuals: PopulationT, evaluation_results: EvalResultsList,
+                             fidelity: Optional[float] = None):
+        if self._memory_budget is not None:
+            self._memory_budget.update({ind.uid: self._graph_to_evaluate(ind) for ind in individuals},
+                                       evaluation_results, fidelity)
+
+    def _task_graph(self, individual: Individual) -> Union[SharedGraphHandle, CompactGraph, OptGraph]:
+        """Returns the form of the individual graph that is sent to the worker."""
+        return self._graph_transport.pack(individual.uid, self._graph_to_evaluate(individual))
+
+    def _task_results(self, future: Future) -> EvalResultsList:
+        task_results = future.result() if self._is_batch_objective else [future.result()]
+        self._telemetry.add_ipc_bytes(task_results)
+        return task_results
+
+    def _evaluate_isolated(self, individual: Individual, n_jobs: int,
+                           fidelity: Optional[float] = None) -> Optional[EvalResultsList]:
+        """Evaluates the individual in the separate task after the crash of the worker.
+        Returns None if the worker crashed again."""
+        future = self._submit_task(self._get_pool(n_jobs), [individual], fidelity)
+        finished_future = self._wait_for_workers({future: [individual]}, n_jobs)[future]
+        if finished_future is None:
+            self._shutdown_pool(kill_workers=True)
+            return [self._timeout_eval_result(individual)]
+        if is_worker_crashed(finished_future):
+            self._shutdown_pool(kill_workers=True)
+            return None
+        return self._task_results(finished_future)
+
+    def _wait_for_workers(self, tasks: Dict[Future, PopulationT], n_jobs: int,
+                          resubmit: Optional[Callable[[PopulationT], Future]] = None) -> Dict[Future, Optional[Future]]:
+        """Waits for all evaluations.
+
+        Args:
+            tasks: futures of the evaluations with the evaluated individuals
+            n_jobs: number of the workers in the pool
+            resubmit: function that starts one more evaluation of the individuals,
+                it's used for speculative duplication of slow evaluations
+
+        Returns:
+            Dict[Future, Optional[Future]]: future with the result of each evaluation
+            or None if the evaluation hung in spite of the timeout.
+        """
+        if self._max_graph_fit_time is None and resubmit is None:
+            wait(tasks)
+            return {future: future for future in tasks}
+        speculation = SpeculativeEvaluation(tasks, n_jobs, resubmit, self._cost_scheduler.predicted_costs,
+                                            min_running_time=HUNG_WORKERS_POLL_SECONDS) \
+            if resubmit is not None else None
+        copies: Dict[Future, List[Future]] = {future: [future] for future in tasks}
+        start_times: Dict[Future, float] = {}
+        finished_futures: Dict[Future, Optional[Future]] = {}
+        while len(finished_futures) < len(tasks):
+            pending_copies = [copy for future, future_copies in copies.items() if future not in finished_futures
+                              for copy in future_copies]
+            wait(pending_copies, timeout=HUNG_WORKERS_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            now = timeit.default_timer()
+            for future, future_copies in copies.items():
+                if future in finished_futures:
+                    continue
+                done_copies = [copy for copy in future_copies if copy.done()]
+                if done_copies:
+                    # the first result wins, the other copies are cancelled if they aren't started yet
+                    finished_futures[future] = done_copies[0]
+                    for copy in future_copies:
+                        copy.cancel()
+                    if speculation is not None:
+                        speculation.add_finished(done_copies[0])
+                    continue
+                for copy in future_copies:
+                    if copy.running():
+                        start_times.setdefault(copy, now)
+                if self._max_graph_fit_time is not None:
+                    # the task can be already marked as running while it's in the queue of the worker
+                    # after the other task, which is interrupted by the timeout too
+                    hard_timeout = (2 * self._max_graph_fit_time.total_seconds() * len(tasks[future]) +
+                                    WORKER_KILL_GRACE_SECONDS)
+                    if all(copy in start_times and now - start_times[copy] > hard_timeout
+                           for copy in future_copies):
+                        finished_futures[future] = None
+                        if self._memory_budget is not None:
+                            for copy in future_copies:
+                                self._memory_budget.release(copy)
+            if speculation is not None:
+                speculation.speculate(copies, finished_futures, start_times)
+        if speculation is not None:
+            self.speculative_evaluations_num += speculation.duplicates_num
+        return finished_futures
+
+    def _submit_single(self, individual: Individual) -> Future:
+        n_jobs = determine_n_jobs(self._n_jobs)
+        _, quarantined_results = self._crash_isolation.split_quarantined([individual])
+        if quarantined_results:
+            return _resolved_future(quarantined_results[0])
+        if n_jobs == 1:
+            return super()._submit_single(individual)
+        self._pool_tasks_num += 1
+        pool = self._get_pool(n_jobs)
+        future = self._start_task(partial(pool.submit, _evaluate_in_worker, self._task_graph(individual),
+                                          individual.uid), [individual])
+        # crash of the worker is ambiguous here (all running evaluations fail), so it isn't retried
+        result_future = Future()
+        result_future.add_done_callback(lambda _: future.cancel() if result_future.cancelled() else None)
+        future.add_done_callback(partial(self._resolve_submitted, individual, result_future))
+        return result_future
+
+    def _resolve_submitted(self, individual: Individual, result_future: Future, future: Future):
+        if not result_future.set_running_or_notify_cancel():
+            return
+        if future.cancelled():
+            result_future.set_result(None)
+        elif is_worker_crashed(future):
+            self._is_pool_broken = True
+            result_future.set_result(self._crash_isolation.crashed_eval_result(individual))
+        elif future.exception() is not None:
+            result_future.set_exception(future.exception())
+        else:
+            self._update_memory_model([individual], [future.result()])
+            result_future.set_result(future.result())
+
+    def _get_pool(self, n_jobs: int) -> ProcessPoolExecutor:
+        if self._pool is not None and self._is_pool_broken:
+            self.logger.warning('Evaluation worker crashed, restarting the pool')
+            self._shutdown_pool(kill_workers=True)
+        elif self._pool is not None and self._are_workers_worn_out():
+            self.logger.info('Evaluation workers are recycled')
+            self._shutdown_pool()
+        if self._pool is None or self._pool_size != n_jobs:
+            self._shutdown_pool()
+            self._pool = ProcessPoolExecutor(max_workers=n_jobs,
+                                             initializer=_init_evaluation_worker,
+                                             initargs=(self, Log().get_parameters()))
+            self._pool_size = n_jobs
+        if self._memory_budget is not None:
+            self._memory_budget.open(slots_num=n_jobs)
+        return self._pool
+
+    def _are_workers_worn_out(self) -> bool:
+        if self._max_tasks_per_worker is not None and \
+                self._pool_tasks_num >= self._max_tasks_per_worker * self._pool_size:
+            return True
+        if self._max_worker_memory is not None:
+            return max(self._workers_memory(), default=0.) > self._max_worker_memory
+        return False
+
+    def _workers_memory(self) -> List[float]:
+        """Returns resident memory of the worker processes in MiB."""
+        workers_memory = []
+        for process in list(getattr(self._pool, '_processes', {}).values()):
+            try:
+                workers_memory.append(psutil.Process(process.pid).memory_info().rss / 1024 / 1024)
+            except psutil.Error:
+                continue
+        return workers_memory
+
+    def _shutdown_pool(self, kill_workers: bool = False):
+        if self._memory_budget is not None:
+            self._memory_budget.close()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, kill_workers=kill_workers)
+            self._pool = None
+            self._pool_size = 0
+        self._pool_tasks_num = 0
+        self._is_pool_broken = False
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        # the pool belongs to the main process
+        state['_pool'] = None
+        state['_pool_size'] = 0
+        return state
+
+
+class ThreadPoolDispatcher(BaseGraphEvaluationDispatcher):
+    """Evaluates objective function on population using the pool of threads.
+
+    It's suitable for the objectives that spend most of the time in the code that releases GIL
+    (e.g. NumPy/SciPy computations or native extensions): graphs and objective are not pickled
+    and the memory of the process is not duplicated. The pool is reused across generations until `shutdown()`.
+
+    Usage: call `dispatch(objective_function)` to get evaluation function.
+
+    Args:
+        adapter: adapter for graphs
+        n_jobs: number of threads or 1 for no parallel evaluation.
+        graph_cleanup_fn: function to call after graph evaluation, primarily for memory cleanup.
+        delegate_evaluator: delegate graph fitter (e.g. for remote graph fitting before evaluation)
+        fitness_cache: optional cache of fitness for structurally identical graphs
+        max_graph_fit_time: optional time limit for evaluation of each graph.
+        objective_batch_size: max number of graphs evaluated at once with ``BatchObjective``.
+            By default, population is evenly split between the threads.
+        return_evaluated_graphs: whether to return the graphs after evaluation.
+        collect_garbage: whether to run garbage collection after each graph evaluation to contain the leaks.
+    """
+
+    def __init__(self,
+                 adapter: BaseOptimizationAdapter,
+                 n_jobs: int = 1,
+                 graph_cleanup_fn: Optional[GraphFunction] = None,
+                 delegate_evaluator: Optional[DelegateEvaluator] = None,
+                 fitness_cache: Optional[FitnessCache] = None,
+                 max_graph_fit_time: Optional[datetime.timedelta] = None,
+                 objective_batch_size: Optional[int] = None,
+                 return_evaluated_graphs: bool = True,
+                 collect_garbage: bool = True):
+
+        super().__init__(adapter, n_jobs, graph_cleanup_fn, delegate_evaluator, fitness_cache,
+                         max_graph_fit_time, objective_batch_size, return_evaluated_graphs, collect_garbage)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pool_size = 0
+
+    def dispatch(self, objective: ObjectiveFunction, timer: Optional[Timer] = None) -> EvaluationOperator:
+        super().dispatch(objective, timer)
+        return self.evaluate_with_cache
+
+    def shutdown(self, kill_workers: bool = False):
+        self._cancel_pending_evaluations()
+        self._shutdown_pool(wait_evaluations=not kill_workers)
+        super().shutdown(kill_workers)
+
+    def evaluate_population(self, individuals: PopulationT) -> PopulationT:
+        individuals_to_evaluate, individuals_to_skip = self.split_individuals_to_evaluate(individuals)
+        n_jobs = determine_n_jobs(self._n_jobs, self.logger)
+        evaluation_results = self.evaluate_with_fitness_cache(
+            individuals_to_evaluate, partial(self._evaluate_in_threads, n_jobs=n_jobs))
+        self._update_evaluation_stats(evaluation_results)
+        individuals_evaluated = self.apply_evaluation_results(individuals_to_evaluate, evaluation_results)
+        evaluated_population = individuals_evaluated + individuals_to_skip
+        self.population_evaluation_info(evaluated_pop_size=len(evaluated_population),
+                                        pop_size=len(individuals))
+        return evaluated_population
+
+    def _evaluate_in_threads(self, individuals: PopulationT, n_jobs: int,
+                             fidelity: Optional[float] = None) -> EvalResultsList:
+        if n_jobs == 1:
+            return self._evaluate_in_process(individuals, fidelity)
+        pool = self._get_pool(n_jobs)
+        if self._is_batch_objective:
+            futures = [pool.submit(self.evaluate_batch, [self._graph_to_evaluate(ind) for ind in batch],
+                                   [ind.uid for ind in batch])
+                       for batch in self._split_into_batches(individuals, n_jobs)]
+            return list(chain.from_iterable(future.result() for future in futures))
+        futures = [pool.submit(self.evaluate_single, ind.graph, ind.uid, fidelity=fidelity) for ind in individuals]
+        return [future.result() for future in futures]
+
+    def _submit_single(self, individual: Individual) -> Future:
+        n_jobs = determine_n_jobs(self._n_jobs)
+        if n_jobs == 1:
+            return super()._submit_single(individual)
+        return self._get_pool(n_jobs).submit(self.evaluate_single, individual.graph, individual.uid)
+
+    def _get_pool(self, n_jobs: int) -> ThreadPoolExecutor:
+        if self._pool is None or self._pool_size != n_jobs:
+            self._shutdown_pool()
+            self._pool = ThreadPoolExecutor(max_workers=n_jobs, thread_name_prefix='evaluation')
+            self._pool_size = n_jobs
+        return self._pool
+
+    def _shutdown_pool(self, wait_evaluations: bool = True):
+        if self._pool is not None:
+            # running threads can't be killed, they are interrupted only by the evaluation timeout
+            self._pool.shutdown(wait=wait_evaluations)
+            self._pool = None
+            self._pool_size = 0
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state['_pool'] = None
+        state['_pool_size'] = 0
+        return state
+
 
 class SequentialDispatcher(BaseGraphEvaluationDispatcher):
     """Evaluates objective function on population in sequential way.
@@ -273,7 +1229,8 @@ class SequentialDispatcher(BaseGraphEvaluationDispatcher):
 
     def evaluate_population(self, individuals: PopulationT) -> PopulationT:
         individuals_to_evaluate, individuals_to_skip = self.split_individuals_to_evaluate(individuals)
-        evaluation_results = [self.evaluate_single(ind.graph, ind.uid) for ind in individuals_to_evaluate]
+        evaluation_results = self.evaluate_with_fitness_cache(individuals_to_evaluate, self._evaluate_in_process)
+        self._update_evaluation_stats(evaluation_results)
         individuals_evaluated = self.apply_evaluation_results(individuals_to_evaluate, evaluation_results)
         evaluated_population = individuals_evaluated + individuals_to_skip
         return evaluated_population
@@ -0,0 +1,172 @@
+from collections import Counter, deque
+from math import ceil
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from golem.core.dag.graph import Graph
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
+
+GraphFeatures = Dict[str, float]
+GraphFeaturesFunction = Callable[[Graph, Optional[float]], GraphFeatures]
+
+
+def graph_cost_features(graph: Graph, fidelity: Optional[float] = None) -> GraphFeatures:
+    """Returns features of the graph that define the cost of its evaluation:
+    size of the graph, its depth, the number of nodes of each operation and fidelity of evaluation."""
+    features = {'length': graph.length, 'depth': graph.depth, 'fidelity': 1. if fidelity is None else fidelity}
+    operations_num = Counter(str(node.name) for node in graph.nodes)
+    features.update((f'operation_{name}', num) for name, num in operations_num.items())
+    return features
+
+
+def graph_size_features(graph: Graph, fidelity: Optional[float] = None) -> GraphFeatures:
+    """Returns size of the graph and fidelity of evaluation, e.g. to predict memory usage of the evaluation."""
+    return {'length': graph.length, 'fidelity': 1. if fidelity is None else fidelity}
+
+
+class EvaluationCostModel:
+    """Model that predicts computation time of the graph evaluation.
+
+    It's the linear ridge regression on the graph features (see `graph_cost_features`)
+    that is fitted on the computation times of the recent evaluations.
+    Model is fitted lazily on the first prediction after the new observations.
+    The other costs of evaluation (e.g. peak memory) can be predicted with the other features.
+
+    Args:
+        max_observations: max number of the recent evaluations the model is fitted on.
+        regularization: L2 regularization of the regression.
+        features: function that returns the features of the graph the cost depends on.
+    """
+
+    def __init__(self, max_observations: int = 1000, regularization: float = 1e-3,
+                 features: GraphFeaturesFunction = graph_cost_features):
+        self.regularization = regularization
+        self._features = features
+        self._observations: Deque[Tuple[GraphFeatures, float]] = deque(maxlen=max_observations)
+        self._prediction_errors: Deque[float] = deque(maxlen=max_observations)
+        self._feature_names: List[str] = []
+        self._weights: Optional[np.ndarray] = None
+        self._is_fitted = False
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether there are observations to predict from."""
+        return bool(self._observations)
+
+    @property
+    def mean_absolute_error(self) -> Optional[float]:
+        """Mean absolute error of the recent predictions in seconds."""
+        return float(np.mean(self._prediction_errors)) if self._prediction_errors else None
+
+    def predict(self, graph: Graph, fidelity: Optional[float] = None) -> Optional[float]:
+        """Returns predicted computation time of the graph evaluation in seconds
+        or None if there are no observations yet."""
+        if not self.is_ready:
+            return None
+        if not self._is_fitted:
+            self._fit()
+        prediction = self._weights @ self._to_vector(self._features(graph, fidelity))
+        return max(0., float(prediction))
+
+    def update(self, graph: Graph, computation_time: float, fidelity: Optional[float] = None,
+               predicted_time: Optional[float] = None):
+        """Adds the observed computation time of the graph evaluation.
+
+        Args:
+            graph: evaluated graph
+            computation_time: observed computation time in seconds
+            fidelity: fidelity of evaluation if it's multi-fidelity
+            predicted_time: time that was predicted for this evaluation, it's used to estimate the model accuracy
+        """
+        self._observations.append((self._features(graph, fidelity), computation_time))
+        if predicted_time is not None:
+            self._prediction_errors.append(abs(predicted_time - computation_time))
+        self._is_fitted = False
+
+    def _fit(self):
+        self._feature_names = sorted({name for features, _ in self._observations for name in features})
+        features = np.array([self._to_vector(features) for features, _ in self._observations])
+        times = np.array([computation_time for _, computation_time in self._observations])
+        # intercept isn't regularized
+        penalty = self.regularization * np.eye(features.shape[1])
+        penalty[0, 0] = 0.
+        self._weights = np.linalg.lstsq(features.T @ features + penalty, features.T @ times, rcond=None)[0]
+        self._is_fitted = True
+
+    def _to_vector(self, features: GraphFeatures) -> np.ndarray:
+        return np.array([1.] + [features.get(name, 0.) for name in self._feature_names])
+
+
+class EvaluationCostScheduler:
+    """Schedules the evaluations of population by their computation time predicted with ``EvaluationCostModel``.
+
+    Graphs are evaluated in the order of decreasing predicted time (longest job first), so the large graphs
+    don't delay the end of the generation, and the batches of graphs are balanced by their predicted time.
+    Model is updated with the actual computation time after the evaluation.
+
+    Args:
+        cost_model: model that predicts computation time of the graph evaluation.
+    """
+
+    def __init__(self, cost_model: Optional[EvaluationCostModel] = None):
+        self.cost_model = cost_model or EvaluationCostModel()
+        self.predicted_costs: Dict[str, float] = {}
+
+    def predict(self, graphs: Dict[str, Graph], fidelity: Optional[float] = None):
+        """Predicts computation time of the graphs that are going to be evaluated.
+
+        Args:
+            graphs: graphs by the uids of their individuals
+            fidelity: fidelity of the evaluation
+        """
+        if self.cost_model.is_ready:
+            self.predicted_costs = {uid: self.cost_model.predict(graph, fidelity) for uid, graph in graphs.items()}
+        else:
+            self.predicted_costs = {}
+
+    def order(self, individuals: Sequence[Individual], graphs: Dict[str, Graph]) -> List[Individual]:
+        """Returns individuals in the order of decreasing predicted time,
+        graph size is used until there are no observations."""
+        return sorted(individuals, key=lambda ind: self.predicted_costs.get(ind.uid, graphs[ind.uid].length),
+                      reverse=True)
+
+    def split_into_batches(self, individuals: Sequence[Individual], batch_size: int) -> List[List[Individual]]:
+        """Splits individuals into the batches of ``batch_size`` with balanced predicted time."""
+        batches_num = ceil(len(individuals) / batch_size)
+        if batches_num <= 1 or not self.predicted_costs:
+            return [list(individuals[i:i + batch_size]) for i in range(0, len(individuals), batch_size)]
+        # each individual goes to the least loaded batch
+        batches = [[] for _ in range(batches_num)]
+        batch_costs = [0.] * batches_num
+        for ind in sorted(individuals, key=lambda ind: self.predicted_costs.get(ind.uid, 0.), reverse=True):
+            batch_idx = min((i for i in range(batches_num) if len(batches[i]) < batch_size),
+                            key=lambda i: batch_costs[i])
+            batches[batch_idx].append(ind)
+            batch_costs[batch_idx] += self.predicted_costs.get(ind.uid, 0.)
+        return batches
+
+    def update(self, graphs: Dict[str, Graph], evaluation_results: Sequence[Optional[GraphEvalResult]],
+               fidelity: Optional[float] = None):
+        """Updates the model with the actual computation time of the evaluations and
+        saves the predicted time in the ``predicted_computation_time_in_seconds`` field of their metadata.
+
+        Args:
+            graphs: evaluated graphs by the uids of their individuals
+            evaluation_results: results of the evaluations
+            fidelity: fidelity of the evaluations
+        """
+        predicted_costs, self.predicted_costs = self.predicted_costs, {}
+        for eval_res in evaluation_results:
+            if eval_res is None or eval_res.metadata.get('cached_evaluation') or \
+                    'computation_time_in_seconds' not in eval_res.metadata:
+                continue
+            predicted_time = predicted_costs.get(eval_res.uid_of_individual)
+            if predicted_time is not None:
+                eval_res.metadata['predicted_computation_time_in_seconds'] = predicted_time
+            self.cost_model.update(graphs[eval_res.uid_of_individual],
+                                   eval_res.metadata['computation_time_in_seconds'], fidelity, predicted_time)
+
+    def reset(self):
+        """Forgets the predictions of the interrupted evaluation."""
+        self.predicted_costs = {}
@@ -0,0 +1,89 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Set, Tuple
+
+from golem.core.dag.graph import Graph
+from golem.core.log import default_log
+from golem.core.optimisers.fitness import null_fitness
+from golem.core.optimisers.genetic.fitness_cache import structural_key
+from golem.core.optimisers.genetic.operators.operator import PopulationT
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
+
+
+def is_worker_crashed(future: Optional[Future]) -> bool:
+    """Checks if the evaluation failed because the worker process died (e.g. segfault in the objective)."""
+    return (future is not None and future.done() and not future.cancelled() and
+            isinstance(future.exception(), BrokenProcessPool))
+
+
+class CrashIsolation:
+    """Isolates the graphs that crash the evaluation worker process.
+
+    Evaluations that crashed the worker are retried one by one, so the crash is certainly caused
+    by the retried graph. Graphs that crash the worker on all retries are put on the quarantine list
+    and get invalid fitness at once after that.
+
+    Args:
+        retries: how many times the evaluation is retried after the crash.
+        key_func: function that computes structural key of the graph on the quarantine list.
+    """
+
+    def __init__(self, retries: int = 1, key_func: Callable[[Graph], str] = structural_key):
+        self.retries = retries
+        self.key_func = key_func
+        self.quarantine: Set[str] = set()
+        self.crashes_num = 0
+        self._log = default_log(self)
+
+    def split_quarantined(self, individuals: PopulationT) -> Tuple[PopulationT, List[GraphEvalResult]]:
+        """Splits individuals to the ones that should be evaluated and the results of the quarantined ones."""
+        if not self.quarantine:
+            return individuals, []
+        individuals_to_evaluate = []
+        quarantined_results = []
+        for ind in individuals:
+            if self.key_func(ind.graph) in self.quarantine:
+                quarantined_results.append(GraphEvalResult(uid_of_individual=ind.uid, fitness=null_fitness(),
+                                                           graph=ind.graph,
+                                                           metadata={'evaluation_quarantined': True}))
+            else:
+                individuals_to_evaluate.append(ind)
+        if quarantined_results:
+            self._log.info(f'{len(quarantined_results)} quarantined graphs are not evaluated')
+        return individuals_to_evaluate, quarantined_results
+
+    def retry(self, individual: Individual,
+              evaluate: Callable[[Individual], Optional[List[GraphEvalResult]]]) -> List[GraphEvalResult]:
+        """Evaluates the individual after the crash of the worker again.
+        Graph is quarantined if all retries crash.
+
+        Args:
+            individual: individual which evaluation crashed the worker
+            evaluate: function that evaluates the individual in the isolated task
+                and returns None if the worker crashed again
+
+        Returns:
+            List[GraphEvalResult]: results of the evaluation.
+        """
+        for _ in range(self.retries):
+            evaluation_results = evaluate(individual)
+            if evaluation_results is not None:
+                return evaluation_results
+        if self.retries > 0:
+            self._log.warning(f'Graph of individual {individual.uid} crashed the worker '
+                              f'{self.retries} times, it is quarantined')
+            self.quarantine.add(self.key_func(individual.graph))
+        return [self.crashed_eval_result(individual)]
+
+    def crashed_eval_result(self, individual: Individual) -> GraphEvalResult:
+        """Returns the result of the evaluation that crashed the worker and counts the crash."""
+        self.crashes_num += 1
+        return GraphEvalResult(uid_of_individual=individual.uid, fitness=null_fitness(),
+                               graph=individual.graph, metadata={'evaluation_crashed': True})
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the quarantine belongs to the main process, the key function can refer to its caches
+        state['quarantine'] = set()
+        state['key_func'] = structural_key
+        return state
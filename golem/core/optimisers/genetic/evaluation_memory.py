@@ -0,0 +1,254 @@
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Deque, Dict, Optional, Sequence, Tuple
+
+import psutil
+
+from golem.core.dag.graph import Graph
+from golem.core.optimisers.genetic.evaluation_cost import EvaluationCostModel, graph_size_features
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult
+
+# how often the resident memory of the worker is sampled during the evaluation to find its peak
+MEMORY_POLL_SECONDS = 0.01
+
+
+class PeakMemoryMonitor:
+    """Samples resident memory of the process in the background thread to find its peak during the evaluation."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self.peak_memory = 0.
+        self._process = psutil.Process() if enabled else None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self):
+        if self.enabled:
+            self._sample()
+            self._thread = threading.Thread(target=self._poll, name='peak-memory-monitor', daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.enabled:
+            self._stopped.set()
+            self._thread.join()
+            self._sample()
+
+    def save_to(self, evaluation_results: Sequence[Optional[GraphEvalResult]]):
+        """Saves peak memory in MiB to the metadata of the results, it's shared equally between them."""
+        if not self.enabled:
+            return
+        for eval_res in evaluation_results:
+            if eval_res is not None:
+                eval_res.metadata['peak_memory_in_mib'] = self.peak_memory / len(evaluation_results)
+
+    def _poll(self):
+        while not self._stopped.wait(MEMORY_POLL_SECONDS):
+            self._sample()
+
+    def _sample(self):
+        try:
+            self.peak_memory = max(self.peak_memory, self._process.memory_info().rss / 1024 / 1024)
+        except psutil.Error:
+            pass
+
+
+class MemoryThrottle:
+    """Starts evaluation tasks only while the predicted memory of the running evaluations fits the budget.
+
+    Tasks that don't fit wait in the queue, the smaller tasks behind them are started if they fit,
+    so all the slots are used for the small graphs. The task that exceeds the budget alone is started
+    when no other tasks are running. Task with unknown memory is started only when no other tasks are running.
+
+    Args:
+        memory_budget: max total predicted memory of the running evaluations in MiB.
+        slots_num: max number of the running evaluations.
+    """
+
+    def __init__(self, memory_budget: float, slots_num: int):
+        self.memory_budget = memory_budget
+        self.slots_num = slots_num
+        self.throttled_tasks_num = 0
+        self._lock = threading.Lock()
+        self._queue: Deque[Tuple[Callable[[], Future], Future, Optional[float]]] = deque()
+        self._reserved_memory: Dict[Future, float] = {}
+        # tasks are started from the separate thread, because pool callbacks mustn't submit to the pool
+        self._starter = ThreadPoolExecutor(max_workers=1, thread_name_prefix='memory-throttle')
+
+    def submit(self, start: Callable[[], Future], memory: Optional[float]) -> Future:
+        """Queues the task.
+
+        Args:
+            start: function that submits the task to the pool
+            memory: predicted memory of the task in MiB or None if it's unknown
+
+        Returns:
+            Future: future of the task result, it's running when the task is submitted to the pool.
+        """
+        future = Future()
+        with self._lock:
+            self._queue.append((start, future, memory))
+        future.add_done_callback(self._on_future_done)
+        self._start_ready_tasks()
+        if not future.running() and not future.done():
+            self.throttled_tasks_num += 1
+        return future
+
+    def release(self, future: Future):
+        """Releases memory of the running task, e.g. when it hung and is abandoned."""
+        self._unreserve(future)
+        self._start_ready_tasks()
+
+    def close(self):
+        """Cancels the queued tasks."""
+        with self._lock:
+            queued_tasks, self._queue = list(self._queue), deque()
+            self._reserved_memory.clear()
+        for _, future, _ in queued_tasks:
+            future.cancel()
+        self._starter.shutdown(wait=False)
+
+    def _start_ready_tasks(self):
+        while True:
+            with self._lock:
+                task = self._pop_ready_task()
+            if task is None:
+                return
+            start, future, memory = task
+            if not future.set_running_or_notify_cancel():
+                self._unreserve(future)
+                continue
+            try:
+                task_future = start()
+            except BaseException as ex:
+                self._unreserve(future)
+                future.set_exception(ex)
+                continue
+            task_future.add_done_callback(partial(self._on_task_done, future))
+
+    def _unreserve(self, future: Future):
+        with self._lock:
+            self._reserved_memory.pop(future, None)
+
+    def _pop_ready_task(self) -> Optional[Tuple[Callable[[], Future], Future, Optional[float]]]:
+        if len(self._reserved_memory) >= self.slots_num:
+            return None
+        reserved_memory = sum(self._reserved_memory.values())
+        for idx, (start, future, memory) in enumerate(self._queue):
+            if not self._reserved_memory or (memory is not None and reserved_memory + memory <= self.memory_budget):
+                del self._queue[idx]
+                self._reserved_memory[future] = memory or 0.
+                return start, future, memory
+        return None
+
+    def _on_future_done(self, future: Future):
+        if not future.cancelled():
+            return
+        # the task is cancelled while it's queued (e.g. evaluation timed out), so it is never started
+        with self._lock:
+            for idx, (_, queued_future, _) in enumerate(self._queue):
+                if queued_future is future:
+                    del self._queue[idx]
+                    break
+
+    def _on_task_done(self, future: Future, task_future: Future):
+        self._unreserve(future)
+        if task_future.cancelled():
+            future.set_exception(BrokenProcessPool('Evaluation task was cancelled by the pool'))
+        elif task_future.exception() is not None:
+            future.set_exception(task_future.exception())
+        else:
+            future.set_result(task_future.result())
+        try:
+            self._starter.submit(self._start_ready_tasks)
+        except RuntimeError:
+            # throttle is closed
+            pass
+
+
+class MemoryBudget:
+    """Keeps the total memory of the concurrent evaluations within the budget.
+
+    Peak resident memory of the worker is measured during each evaluation (see ``PeakMemoryMonitor``)
+    and the model of the peak memory by the graph size is learned on it (see ``graph_size_features``).
+    Evaluations are started with ``MemoryThrottle`` only while their total predicted memory fits the budget.
+    Until the first evaluation is measured, graphs are evaluated one by one.
+
+    Args:
+        memory_budget: total memory in MiB the concurrent evaluations may use.
+    """
+
+    def __init__(self, memory_budget: float):
+        self.memory_budget = memory_budget
+        self.model = EvaluationCostModel(features=graph_size_features)
+        self._throttle: Optional[MemoryThrottle] = None
+        self._throttled_tasks_num = 0
+
+    @property
+    def throttled_tasks_num(self) -> int:
+        """Total number of the evaluations that waited for the memory budget."""
+        return self._throttled_tasks_num + (self._throttle.throttled_tasks_num if self._throttle else 0)
+
+    def open(self, slots_num: int):
+        """Prepares to start the evaluations on the pool with ``slots_num`` workers."""
+        if self._throttle is None:
+            self._throttle = MemoryThrottle(self.memory_budget, slots_num)
+
+    def start(self, start: Callable[[], Future], graphs: Sequence[Graph],
+              fidelity: Optional[float] = None) -> Future:
+        """Starts the evaluation of the graphs at once or when it fits the memory budget.
+
+        Args:
+            start: function that submits the evaluation task to the pool
+            graphs: graphs evaluated by the task
+            fidelity: fidelity of the evaluation
+
+        Returns:
+            Future: future of the task result.
+        """
+        if self._throttle is None:
+            return start()
+        return self._throttle.submit(start, self.predict(graphs, fidelity))
+
+    def predict(self, graphs: Sequence[Graph], fidelity: Optional[float] = None) -> Optional[float]:
+        """Returns predicted peak memory of the evaluation of the graphs in MiB or None if it's unknown."""
+        if not self.model.is_ready:
+            return None
+        return sum(self.model.predict(graph, fidelity) for graph in graphs)
+
+    def update(self, graphs: Dict[str, Graph], evaluation_results: Sequence[Optional[GraphEvalResult]],
+               fidelity: Optional[float] = None):
+        """Updates the memory model with the measured peak memory of the evaluations.
+
+        Args:
+            graphs: evaluated graphs by the uids of their individuals
+            evaluation_results: results of the evaluations
+            fidelity: fidelity of the evaluations
+        """
+        for eval_res in evaluation_results:
+            if eval_res is not None and 'peak_memory_in_mib' in eval_res.metadata \
+                    and eval_res.uid_of_individual in graphs:
+                self.model.update(graphs[eval_res.uid_of_individual], eval_res.metadata['peak_memory_in_mib'], fidelity)
+
+    def release(self, future: Future):
+        """Releases memory of the running evaluation, e.g. when it hung and is abandoned."""
+        if self._throttle is not None:
+            self._throttle.release(future)
+
+    def close(self):
+        """Cancels the evaluations that wait for the memory budget."""
+        if self._throttle is not None:
+            self._throttled_tasks_num += self._throttle.throttled_tasks_num
+            self._throttle.close()
+            self._throttle = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # the model and the running evaluations belong to the main process
+        state['model'] = EvaluationCostModel(features=graph_size_features)
+        state['_throttle'] = None
+        return state
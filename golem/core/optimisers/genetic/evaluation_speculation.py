@@ -0,0 +1,78 @@
+import timeit
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from golem.core.log import default_log
+from golem.core.optimisers.genetic.operators.operator import PopulationT
+
+# how many times longer than expected the evaluation runs before it's speculatively duplicated
+SPECULATION_SLOWDOWN_FACTOR = 3.
+
+
+class SpeculativeEvaluation:
+    """Duplicates the slow evaluation tasks on the idle workers while the tasks are awaited.
+
+    Task is duplicated when it runs `SPECULATION_SLOWDOWN_FACTOR` times longer than its expected time:
+    the predicted computation time of its individual or the median time of the finished tasks.
+    Each task is duplicated only once, the slowest tasks are duplicated first.
+
+    Args:
+        tasks: futures of the evaluation tasks with the evaluated individuals
+        n_jobs: number of the workers
+        resubmit: function that starts one more evaluation of the individuals
+        predicted_times: predicted computation times of the evaluations by the uids of individuals
+        min_running_time: min running time of the task before it's duplicated
+    """
+
+    def __init__(self, tasks: Dict[Future, PopulationT], n_jobs: int,
+                 resubmit: Callable[[PopulationT], Future],
+                 predicted_times: Optional[Dict[str, float]] = None,
+                 min_running_time: float = 0.):
+        self.tasks = tasks
+        self.n_jobs = n_jobs
+        self.resubmit = resubmit
+        self.predicted_times = predicted_times or {}
+        self.min_running_time = min_running_time
+        self.duplicates_num = 0
+        self._computation_times: List[float] = []
+        self._log = default_log(self)
+
+    def add_finished(self, future: Future):
+        """Takes into account computation time of the finished task."""
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            return
+        self._computation_times.append(future.result().metadata['computation_time_in_seconds'])
+
+    def speculate(self, copies: Dict[Future, List[Future]], finished_futures: Dict[Future, Optional[Future]],
+                  start_times: Dict[Future, float]):
+        """Duplicates the slowest tasks on the idle workers.
+
+        Args:
+            copies: running copies of each task, the new copies are appended to them
+            finished_futures: tasks that are already finished
+            start_times: times when the copies of the tasks were started
+        """
+        pending_futures = [future for future in copies if future not in finished_futures]
+        idle_workers_num = self.n_jobs - sum(len(copies[future]) for future in pending_futures)
+        if idle_workers_num <= 0:
+            return
+        now = timeit.default_timer()
+        median_time = float(np.median(self._computation_times)) if self._computation_times else None
+        slow_futures = []
+        for future in pending_futures:
+            if len(copies[future]) > 1 or future not in start_times:
+                continue
+            individual = self.tasks[future][0]
+            expected_time = self.predicted_times.get(individual.uid, median_time)
+            running_time = now - start_times[future]
+            if expected_time is not None and \
+                    running_time > max(SPECULATION_SLOWDOWN_FACTOR * expected_time, self.min_running_time):
+                slow_futures.append((running_time, future))
+        for _, future in sorted(slow_futures, key=lambda item: item[0], reverse=True)[:idle_workers_num]:
+            individual = self.tasks[future][0]
+            self._log.info(f'Evaluation of the graph of individual {individual.uid} is slow, '
+                           f'it is duplicated on the idle worker')
+            copies[future].append(self.resubmit(self.tasks[future]))
+            self.duplicates_num += 1
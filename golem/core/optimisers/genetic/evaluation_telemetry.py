@@ -0,0 +1,285 @@
+import datetime
+import json
+import math
+import os
+import pickle
+import timeit
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
+
+# upper bounds of the buckets of the computation time histogram in seconds
+COMPUTATION_TIME_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1., 5., 10., 30., 60., 300., math.inf)
+PROMETHEUS_PREFIX = 'golem_evaluation'
+
+
+@dataclass
+class EvaluationTelemetry:
+    """Telemetry of one population evaluation by the dispatcher.
+
+    :param generation_num: number of the generation the population is evaluated for,
+        it's set by the optimizer. Generation can have several population evaluations.
+    :param started_at: ISO time of the start of the evaluation.
+    :param wall_time: duration of the population evaluation in seconds.
+    :param n_jobs: number of the parallel jobs.
+    :param evaluations_num: number of individuals requested for evaluation.
+    :param successful_num: number of individuals with valid fitness.
+    :param failures_num: number of individuals that weren't evaluated or got invalid fitness.
+    :param timeouts_num: number of evaluations interrupted by the timeout.
+    :param crashes_num: number of evaluations that crashed the worker or were quarantined.
+    :param cached_num: number of individuals which fitness was taken from the fitness cache.
+    :param computation_time: total computation time of the evaluations in seconds.
+    :param computation_time_histogram: number of the evaluations with computation time
+        not greater than the bucket bound in seconds (see ``COMPUTATION_TIME_BUCKETS``), cumulative.
+    :param queue_wait_time: total time in seconds the evaluations waited to start after the evaluation
+        of population started.
+    :param ipc_bytes: volume of the graphs and results pickled between the processes in bytes.
+        It's counted only if it's enabled in ``EvaluationTelemetryRecorder``, otherwise it's 0.
+    :param operator_computation_time: total computation time of the offspring of each evolutionary operator
+        with the number of the offspring, keys are ``'<operator type>:<operator>'``.
+    """
+    generation_num: Optional[int] = None
+    started_at: str = ''
+    wall_time: float = 0.
+    n_jobs: int = 1
+    evaluations_num: int = 0
+    successful_num: int = 0
+    failures_num: int = 0
+    timeouts_num: int = 0
+    crashes_num: int = 0
+    cached_num: int = 0
+    computation_time: float = 0.
+    computation_time_histogram: Dict[str, int] = field(default_factory=dict)
+    queue_wait_time: float = 0.
+    ipc_bytes: int = 0
+    operator_computation_time: Dict[str, Tuple[float, int]] = field(default_factory=dict)
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return self.cached_num / self.evaluations_num if self.evaluations_num else 0.
+
+    @property
+    def worker_utilisation(self) -> float:
+        """Fraction of the time the workers were busy with the evaluations."""
+        capacity = self.wall_time * self.n_jobs
+        return min(1., self.computation_time / capacity) if capacity > 0 else 0.
+
+    @staticmethod
+    def collect(individuals: Sequence[Individual], evaluation_results: Sequence[Optional[GraphEvalResult]],
+                started_at: datetime.datetime, wall_time: float, n_jobs: int,
+                ipc_bytes: int = 0) -> 'EvaluationTelemetry':
+        """Builds telemetry from the results of the population evaluation.
+
+        Args:
+            individuals: individuals requested for evaluation
+            evaluation_results: results of their evaluation
+            started_at: time of the start of the population evaluation
+            wall_time: duration of the population evaluation in seconds
+            n_jobs: number of the parallel jobs
+            ipc_bytes: volume of the data sent between the processes in bytes
+        """
+        telemetry = EvaluationTelemetry(started_at=started_at.isoformat(), wall_time=wall_time, n_jobs=n_jobs,
+                                        evaluations_num=len(individuals), ipc_bytes=ipc_bytes)
+        results = {res.uid_of_individual: res for res in evaluation_results if res is not None}
+        computation_times = []
+        for ind in individuals:
+            eval_res = results.get(ind.uid)
+            if eval_res is None:
+                telemetry.failures_num += 1
+                continue
+            metadata = eval_res.metadata
+            if eval_res:
+                telemetry.successful_num += 1
+            else:
+                telemetry.failures_num += 1
+            telemetry.timeouts_num += int(bool(metadata.get('evaluation_timeout')))
+            telemetry.crashes_num += int(bool(metadata.get('evaluation_crashed') or
+                                              metadata.get('evaluation_quarantined')))
+            if metadata.get('cached_evaluation'):
+                telemetry.cached_num += 1
+                continue
+            computation_time = metadata.get('computation_time_in_seconds')
+            if computation_time is None:
+                continue
+            computation_times.append(computation_time)
+            evaluation_start = _parse_time(metadata.get('evaluation_time_iso'))
+            if evaluation_start is not None:
+                evaluation_start -= datetime.timedelta(seconds=computation_time)
+                telemetry.queue_wait_time += max(0., (evaluation_start - started_at).total_seconds())
+            if ind.parent_operator is not None:
+                operator = f'{ind.parent_operator.type_}:{",".join(map(str, ind.parent_operator.operators))}'
+                operator_time, offspring_num = telemetry.operator_computation_time.get(operator, (0., 0))
+                telemetry.operator_computation_time[operator] = (operator_time + computation_time, offspring_num + 1)
+        telemetry.computation_time = sum(computation_times)
+        telemetry.computation_time_histogram = {
+            _format_bound(bound): sum(1 for time in computation_times if time <= bound)
+            for bound in COMPUTATION_TIME_BUCKETS}
+        return telemetry
+
+    def to_dict(self) -> dict:
+        telemetry = asdict(self)
+        telemetry.update(cache_hit_rate=self.cache_hit_rate, worker_utilisation=self.worker_utilisation)
+        return telemetry
+
+    def to_json(self) -> str:
+        """Returns telemetry as the single line of JSON."""
+        return json.dumps(self.to_dict())
+
+    def to_prometheus(self) -> str:
+        """Returns telemetry in Prometheus text exposition format.
+        Generation is exported as the gauge value, so the number of the series doesn't grow with generations."""
+        lines = []
+        gauges = (('generation', self.generation_num, 'Number of the generation of the evaluated population'),
+                  ('wall_time_seconds', self.wall_time, 'Duration of the population evaluation'),
+                  ('jobs', self.n_jobs, 'Number of the parallel jobs'),
+                  ('worker_utilisation', self.worker_utilisation, 'Fraction of the time the workers were busy'),
+                  ('individuals', self.evaluations_num, 'Number of individuals requested for evaluation'),
+                  ('successful', self.successful_num, 'Number of individuals with valid fitness'),
+                  ('failures', self.failures_num, 'Number of failed evaluations'),
+                  ('timeouts', self.timeouts_num, 'Number of evaluations interrupted by the timeout'),
+                  ('crashes', self.crashes_num, 'Number of evaluations that crashed the worker'),
+                  ('cache_hit_rate', self.cache_hit_rate, 'Fraction of fitness taken from the cache'),
+                  ('queue_wait_seconds', self.queue_wait_time, 'Total time the evaluations waited to start'),
+                  ('ipc_bytes', self.ipc_bytes, 'Volume of the data sent between the processes'))
+        for name, value, description in gauges:
+            if value is None:
+                continue
+            lines.extend(_prometheus_metric(name, 'gauge', description, [({}, value)]))
+
+        histogram_samples = [({'le': bound}, count)
+                             for bound, count in self.computation_time_histogram.items()]
+        lines.extend(_prometheus_metric('computation_seconds', 'histogram', 'Computation time of the evaluations',
+                                        histogram_samples, sample_suffix='_bucket'))
+        lines.append(_prometheus_sample('computation_seconds_sum', {}, self.computation_time))
+        lines.append(_prometheus_sample('computation_seconds_count', {},
+                                        self.computation_time_histogram.get(_format_bound(math.inf), 0)))
+
+        operator_samples = [({'operator': operator}, operator_time)
+                            for operator, (operator_time, _) in self.operator_computation_time.items()]
+        lines.extend(_prometheus_metric('operator_computation_seconds', 'gauge',
+                                        'Total computation time of the offspring of the operator', operator_samples))
+        return '\n'.join(lines) + '\n'
+
+
+TelemetryCallback = Callable[[EvaluationTelemetry], Any]
+
+
+class EvaluationTelemetryRecorder:
+    """Collects telemetry of the population evaluations (see ``EvaluationTelemetry``)
+    and reports it to the callback. Nothing is collected while the callback isn't set.
+
+    Args:
+        callback: callback that receives telemetry of each population evaluation
+        count_ipc_bytes: whether to count the volume of the data sent between the processes.
+            Data is pickled once more to count it, so it's disabled by default.
+    """
+
+    def __init__(self, callback: Optional[TelemetryCallback] = None, count_ipc_bytes: bool = False):
+        self.callback = callback
+        self.count_ipc_bytes = count_ipc_bytes
+        self.ipc_bytes = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.callback is not None
+
+    def add_ipc_bytes(self, data: Any):
+        """Counts the size of the data sent between the processes if it's enabled."""
+        if self.is_enabled and self.count_ipc_bytes:
+            self.ipc_bytes += len(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def record(self, individuals: Sequence[Individual],
+               evaluate: Callable[[Sequence[Individual]], Sequence[Optional[GraphEvalResult]]],
+               n_jobs: int) -> Sequence[Optional[GraphEvalResult]]:
+        """Evaluates individuals with ``evaluate`` function and reports telemetry of the evaluation.
+
+        Args:
+            individuals: individuals to evaluate
+            evaluate: function that evaluates individuals
+            n_jobs: number of the parallel jobs
+
+        Returns:
+            Sequence[Optional[GraphEvalResult]]: results of the evaluation.
+        """
+        if not self.is_enabled or not individuals:
+            return evaluate(individuals)
+        started_at = datetime.datetime.now()
+        start_time = timeit.default_timer()
+        self.ipc_bytes = 0
+        evaluation_results = evaluate(individuals)
+        telemetry = EvaluationTelemetry.collect(individuals, evaluation_results, started_at,
+                                                wall_time=timeit.default_timer() - start_time,
+                                                n_jobs=n_jobs, ipc_bytes=self.ipc_bytes)
+        self.callback(telemetry)
+        return evaluation_results
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # telemetry is reported in the main process
+        state['callback'] = None
+        state['ipc_bytes'] = 0
+        return state
+
+
+class JsonLinesTelemetryWriter:
+    """Telemetry callback that appends each telemetry record as the line of JSON to the file.
+
+    Args:
+        path: path to the file
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = Path(path)
+
+    def __call__(self, telemetry: EvaluationTelemetry):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a') as file:
+            file.write(telemetry.to_json() + '\n')
+
+
+class PrometheusTelemetryWriter:
+    """Telemetry callback that writes the last telemetry record in Prometheus text format to the file,
+    e.g. for the textfile collector of the node exporter. File is replaced atomically.
+
+    Args:
+        path: path to the file
+    """
+
+    def __init__(self, path: Union[str, os.PathLike]):
+        self.path = Path(path)
+
+    def __call__(self, telemetry: EvaluationTelemetry):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        tmp_path.write_text(telemetry.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+
+def _parse_time(time_iso: Optional[str]) -> Optional[datetime.datetime]:
+    try:
+        return datetime.datetime.fromisoformat(time_iso)
+    except (TypeError, ValueError):
+        return None
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if math.isinf(bound) else f'{bound:g}'
+
+
+def _prometheus_metric(name: str, metric_type: str, description: str,
+                       samples: List[Tuple[dict, float]], sample_suffix: str = '') -> List[str]:
+    return [f'# HELP {PROMETHEUS_PREFIX}_{name} {description}',
+            f'# TYPE {PROMETHEUS_PREFIX}_{name} {metric_type}'] + \
+        [_prometheus_sample(name + sample_suffix, labels, value) for labels, value in samples]
+
+
+def _prometheus_sample(name: str, labels: dict, value: float) -> str:
+    labels_text = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+    return f'{PROMETHEUS_PREFIX}_{name}{{{labels_text}}} {value}' if labels_text \
+        else f'{PROMETHEUS_PREFIX}_{name} {value}'
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,246 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import shelve
+import threading
+from collections import OrderedDict
+from copy import deepcopy
+from pathlib import Path
+from types import CodeType
+from typing import Any, Callable, Dict, Optional, Set, Tuple, Union
+from uuid import uuid4
+
+from golem.core.dag.graph import Graph
+from golem.core.log import default_log
+from golem.core.optimisers.fitness import Fitness
+from golem.core.paths import default_data_dir
+
+CachedEvalResult = Tuple[Fitness, Dict[str, Any]]
+# length of the fingerprint of the objective in the keys of the cache
+FINGERPRINT_LENGTH = 16
+
+
+def structural_key(graph: Graph) -> str:
+    """Returns fixed-size key that is the same for structurally identical graphs."""
+    return hashlib.sha256(graph.descriptive_id.encode()).hexdigest()
+
+
+def objective_fingerprint(objective: Callable) -> Optional[str]:
+    """Returns fingerprint of the objective that is the same for the objectives
+    with the same type, metrics and parameters across the runs.
+
+    Functions are identified by their code together with the values of their defaults and closures,
+    other parameters (e.g. data the metrics are computed on) by the hash of their pickled state.
+    Returns None if the objective can't be described deterministically (e.g. it keeps unpicklable objects)."""
+    try:
+        description = _describe(objective)
+    except _NotDescribableError:
+        return None
+    return hashlib.sha256(description.encode()).hexdigest()[:FINGERPRINT_LENGTH]
+
+
+class _NotDescribableError(ValueError):
+    pass
+
+
+def _describe(value: Any, _seen: Optional[Set[int]] = None) -> str:
+    """Returns the description of the value that doesn't depend on the memory addresses."""
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    _seen = _seen if _seen is not None else set()
+    if id(value) in _seen:
+        # recursive reference, e.g. nested function that is in its own closure
+        return '<cycle>'
+    _seen.add(id(value))
+    try:
+        return _describe_container(value, _seen)
+    finally:
+        _seen.discard(id(value))
+
+
+def _describe_container(value: Any, seen: Set[int]) -> str:
+    def describe(item: Any) -> str:
+        return _describe(item, seen)
+
+    if isinstance(value, (list, tuple)):
+        return f'({",".join(map(describe, value))})'
+    if isinstance(value, (set, frozenset)):
+        return f'{{{",".join(sorted(map(describe, value)))}}}'
+    if isinstance(value, dict):
+        items = sorted((str(key), describe(item)) for key, item in value.items())
+        return f'{{{",".join(f"{key}:{item}" for key, item in items)}}}'
+    if isinstance(value, functools.partial):
+        return f'partial({describe(value.func)},{describe(value.args)},{describe(value.keywords)})'
+    if inspect.ismethod(value):
+        return f'{describe(value.__self__)}.{value.__name__}'
+    if inspect.isfunction(value):
+        closure = tuple(cell.cell_contents for cell in value.__closure__ or ())
+        return (f'{value.__module__}.{value.__qualname__}'
+                f'({describe(value.__code__)},{describe(value.__defaults__)},'
+                f'{describe(value.__kwdefaults__)},{describe(closure)})')
+    if isinstance(value, CodeType):
+        return f'code({value.co_code.hex()},{describe(value.co_consts)},{describe(value.co_names)})'
+    if inspect.ismodule(value):
+        return value.__name__
+    if inspect.isbuiltin(value) or inspect.isclass(value):
+        return f'{value.__module__}.{value.__qualname__}'
+    value_type = type(value)
+    description = f'{value_type.__module__}.{value_type.__qualname__}'
+    # objectives are described by their metrics and settings
+    if hasattr(value, 'metrics') or hasattr(value, '_objective'):
+        # default __getstate__ is available only since Python 3.11
+        get_state = getattr(value, '__getstate__', None)
+        state = get_state() if get_state is not None else getattr(value, '__dict__', None)
+        if isinstance(state, dict):
+            state = {name: attribute for name, attribute in state.items() if name != '_log'}
+        return description + describe(state)
+    try:
+        state = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as ex:
+        raise _NotDescribableError(f'{description} is not picklable') from ex
+    return f'{description}({hashlib.sha256(state).hexdigest()})'
+
+
+class FitnessCache:
+    """Cache of evaluation results for structurally identical graphs.
+
+    Results are kept in memory with LRU eviction and optionally in the on-disk store,
+    so the repeated topologies are not evaluated again across generations and across runs.
+    Only valid fitness values are cached. Cache is thread-safe, so it can be filled
+    from the callbacks of the asynchronous evaluations.
+
+    Results are keyed by the graph structure together with the fingerprint of the objective
+    (see `set_objective`), so the runs with the different objectives can share the on-disk store.
+
+    Notes:
+        Cache assumes that the objective is deterministic and doesn't depend on anything
+        except graph structure. The graph is not passed to the objective on cache hit,
+        so it should not be used if the evaluation modifies the graph (e.g. fits it).
+        Objective fingerprint reflects the data the objective keeps (e.g. in its attributes or closures),
+        but not the global state it reads, so such runs must use the different ``fingerprint``.
+        If the objective can't be fingerprinted, then its results are kept only in memory.
+
+    Args:
+        maxsize: max number of results kept in memory.
+        path: optional path to the on-disk store of results (is created if it doesn't exist).
+            If the path is relative, then it's treated as relative to `default_data_dir`.
+        key_func: function that computes structural key of the graph.
+        fingerprint: optional fingerprint of the evaluation setup (e.g. hash of the data)
+            that is added to the keys together with the fingerprint of the objective.
+    """
+
+    def __init__(self,
+                 maxsize: int = 10000,
+                 path: Optional[Union[str, os.PathLike]] = None,
+                 key_func: Callable[[Graph], str] = structural_key,
+                 fingerprint: Optional[str] = None):
+        if path is not None and not Path(path).is_absolute():
+            path = Path(default_data_dir(), path)
+        self.maxsize = maxsize
+        self.path = path
+        self.key_func = key_func
+        self.fingerprint = fingerprint
+        self._objective_fingerprint: Optional[str] = None
+        self._is_persistent = True
+        self.hits = 0
+        self.misses = 0
+        self._items: 'OrderedDict[str, CachedEvalResult]' = OrderedDict()
+        self._storage: Optional[shelve.Shelf] = None
+        self._lock = threading.RLock()
+        self._log = default_log(self)
+
+    def set_objective(self, objective: Callable):
+        """Sets the objective the cached results are computed with.
+        Results of the other objectives aren't returned after that."""
+        fingerprint = objective_fingerprint(objective)
+        self._is_persistent = fingerprint is not None
+        if fingerprint is None:
+            # results of the objective are valid only in this run
+            fingerprint = uuid4().hex[:FINGERPRINT_LENGTH]
+            if self.path is not None:
+                self._log.warning(f'Objective {objective} can\'t be fingerprinted, '
+                                  f'so the on-disk store {self.path} is not used')
+        self._objective_fingerprint = fingerprint
+
+    def key(self, graph: Graph) -> str:
+        prefix = self._key_prefix
+        return f'{prefix}:{self.key_func(graph)}' if prefix else self.key_func(graph)
+
+    @property
+    def _key_prefix(self) -> str:
+        fingerprints = [fingerprint for fingerprint in (self._objective_fingerprint, self.fingerprint) if fingerprint]
+        if len(fingerprints) <= 1:
+            return ''.join(fingerprints)
+        return hashlib.sha256(':'.join(fingerprints).encode()).hexdigest()[:FINGERPRINT_LENGTH]
+
+    def get(self, key: str) -> Optional[CachedEvalResult]:
+        """Returns copy of the cached fitness and evaluation metadata for the key or None."""
+        with self._lock:
+            cached = self._items.get(key)
+            if cached is not None:
+                self._items.move_to_end(key)
+            elif self._uses_storage:
+                cached = self._get_storage().get(key)
+                if cached is not None:
+                    self._put_in_memory(key, cached)
+            if cached is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return deepcopy(cached)
+
+    def put(self, key: str, fitness: Fitness, metadata: Optional[Dict[str, Any]] = None):
+        if not fitness.valid:
+            return
+        cached = (deepcopy(fitness), dict(metadata or {}))
+        with self._lock:
+            self._put_in_memory(key, cached)
+            if self._uses_storage:
+                self._get_storage()[key] = cached
+
+    @property
+    def _uses_storage(self) -> bool:
+        return self.path is not None and self._is_persistent
+
+    @property
+    def hit_rate(self) -> float:
+        requests_num = self.hits + self.misses
+        return self.hits / requests_num if requests_num else 0.
+
+    def close(self):
+        """Closes the on-disk store. It's opened again on the next access."""
+        with self._lock:
+            if self._storage is not None:
+                self._storage.close()
+                self._storage = None
+
+    def _put_in_memory(self, key: str, cached: CachedEvalResult):
+        self._items[key] = cached
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def _get_storage(self) -> shelve.Shelf:
+        if self._storage is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._storage = shelve.open(str(self.path))
+            self._log.info(f'Fitness cache is backed by the on-disk store {self.path}')
+        return self._storage
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __str__(self):
+        return f'{self.__class__.__name__}(size={len(self)}, hits={self.hits}, misses={self.misses})'
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_storage'] = None
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
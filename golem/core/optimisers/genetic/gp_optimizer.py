@@ -1,9 +1,14 @@
+import timeit
+from concurrent.futures import FIRST_COMPLETED, Future, wait
 from copy import deepcopy
 from random import choice
-from typing import Sequence, Union, Any
+from typing import Sequence, Union, Any, Dict, List, Set, Tuple
 
-from golem.core.constants import MAX_GRAPH_GEN_ATTEMPTS
+from golem.core.constants import EVALUATION_ATTEMPTS_NUMBER, MAX_GRAPH_GEN_ATTEMPTS, MIN_POP_SIZE
 from golem.core.dag.graph import Graph
+from golem.core.dag.graph_utils import GraphDict
+from golem.core.optimisers.adaptive.experience_buffer import ExperienceBuffer
+from golem.core.optimisers.fitness import sort_by_fitness
 from golem.core.optimisers.genetic.gp_params import GPAlgorithmParameters
 from golem.core.optimisers.genetic.operators.crossover import Crossover
 from golem.core.optimisers.genetic.operators.elitism import Elitism
@@ -15,12 +20,14 @@ from golem.core.optimisers.genetic.operators.reproduction import ReproductionCon
 from golem.core.optimisers.genetic.operators.selection import Selection
 from golem.core.optimisers.genetic.parameters.graph_depth import AdaptiveGraphDepth
 from golem.core.optimisers.genetic.parameters.operators_prob import init_adaptive_operators_prob
-from golem.core.optimisers.genetic.parameters.population_size import init_adaptive_pop_size, PopulationSize
+from golem.core.optimisers.genetic.parameters.population_size import init_adaptive_pop_size, PopulationSize, \
+    WorkersAlignedPopulationSize
 from golem.core.optimisers.objective.objective import Objective
 from golem.core.optimisers.opt_history_objects.individual import Individual
 from golem.core.optimisers.optimization_parameters import GraphRequirements
 from golem.core.optimisers.optimizer import GraphGenerationParams
-from golem.core.optimisers.populational_optimizer import PopulationalOptimizer
+from golem.core.optimisers.populational_optimizer import EvaluationAttemptsError, PopulationalOptimizer
+from golem.utilities.utilities import determine_n_jobs
 
 
 class EvoGraphOptimizer(PopulationalOptimizer):
@@ -50,7 +57,10 @@ class EvoGraphOptimizer(PopulationalOptimizer):
         self.reproducer = ReproductionController(graph_optimizer_params, self.selection, self.mutation, self.crossover)
 
         # Define adaptive parameters
-        self._pop_size: PopulationSize = init_adaptive_pop_size(graph_optimizer_params, self.generations)
+        self._pop_size: PopulationSize = init_adaptive_pop_size(graph_optimizer_params, self.generations,
+                                                                workers_num=determine_n_jobs(requirements.n_jobs))
+        if isinstance(self._pop_size, WorkersAlignedPopulationSize):
+            self.reproducer.workers_num = self._pop_size.workers_num
         self._operators_prob = init_adaptive_operators_prob(graph_optimizer_params)
         self._graph_depth = AdaptiveGraphDepth(self.generations,
                                                start_depth=requirements.start_depth,
@@ -64,6 +74,16 @@ class EvoGraphOptimizer(PopulationalOptimizer):
         self.initial_individuals = [Individual(graph, metadata=requirements.static_individual_metadata)
                                     for graph in self.initial_graphs]
 
+        # State of asynchronous evolution that is kept between logical generations
+        self._evaluations_in_flight: Dict[Future, Individual] = {}
+        self._offspring_queue: List[Individual] = []
+        # Offspring that are speculatively produced for the next generation in pipelined mode
+        # with the uids of their parents
+        self._speculative_offspring: Dict[Future, Tuple[Individual, Set[str]]] = {}
+        # Experience of the mutation agent collected during the speculative reproduction with the uids
+        # of the ancestors of the mutated individuals, it's accepted only if they're in the next population
+        self._speculative_experience: List[Tuple[Individual, Any, float, Set[str]]] = []
+
     def _initial_population(self, evaluator: EvaluationOperator):
         """ Initializes the initial population """
         # Adding of initial assumptions to history as zero generation
@@ -78,7 +98,7 @@ class EvoGraphOptimizer(PopulationalOptimizer):
     def _extend_population(self, pop: PopulationT, target_pop_size: int) -> PopulationT:
         verifier = self.graph_generation_params.verifier
         extended_pop = list(pop)
-        pop_graphs = [ind.graph for ind in extended_pop]
+        pop_graphs = GraphDict((ind.graph, ind) for ind in extended_pop)
 
         # Set mutation probabilities to 1.0
         initial_req = deepcopy(self.requirements)
@@ -93,7 +113,7 @@ class EvoGraphOptimizer(PopulationalOptimizer):
                 new_graph = new_ind.graph
                 if new_graph not in pop_graphs and verifier(new_graph):
                     extended_pop.append(new_ind)
-                    pop_graphs.append(new_graph)
+                    pop_graphs[new_graph] = new_ind
         else:
             self.log.warning(f'Exceeded max number of attempts for extending initial graphs, stopping.'
                              f'Current size {len(pop)}, required {target_pop_size} graphs.')
@@ -104,6 +124,10 @@ class EvoGraphOptimizer(PopulationalOptimizer):
 
     def _evolve_population(self, evaluator: EvaluationOperator) -> PopulationT:
         """ Method realizing full evolution cycle """
+        if self.graph_optimizer_params.asynchronous_evaluation:
+            return self._evolve_population_asynchronously()
+        if self.graph_optimizer_params.pipelined_evaluation:
+            return self._evolve_population_pipelined(evaluator)
 
         # Defines adaptive changes to algorithm parameters
         #  like pop_size and operator probabilities
@@ -126,6 +150,167 @@ class EvoGraphOptimizer(PopulationalOptimizer):
 
         return new_population
 
+    def _evolve_population_pipelined(self, evaluator: EvaluationOperator) -> PopulationT:
+        """ Method realizing full evolution cycle that overlaps the tail of generation evaluation
+        with production of the next offspring. Free evaluation slots are filled with speculative offspring
+        of the already evaluated individuals, they're reconciled with the next generation.
+        Number of the offspring is controlled by the reproducer as in the generational mode. """
+        self._update_requirements()
+
+        # Regularize previous population
+        individuals_to_select = self.regularization(self.population, evaluator)
+
+        generation_size = self.graph_optimizer_params.pop_size
+        start_time = timeit.default_timer()
+        self.reproducer.evaluation_throughput = None
+        generation_in_flight = self._reconcile_speculative_offspring(individuals_to_select)
+        collected_next_population: Dict[str, Individual] = {}
+        for _ in range(EVALUATION_ATTEMPTS_NUMBER):
+            residual_size = generation_size - len(collected_next_population) - len(generation_in_flight)
+            if residual_size > 0:
+                offspring_size = self.reproducer.offspring_size(residual_size, len(individuals_to_select))
+                generation_in_flight.update(self._submit_offspring(individuals_to_select, offspring_size))
+            offspring_num = len(generation_in_flight)
+            collected_num = len(collected_next_population)
+            while generation_in_flight:
+                done, _ = wait(list(generation_in_flight), return_when=FIRST_COMPLETED)
+                for future in done:
+                    individual = generation_in_flight.pop(future)
+                    evaluated = self.eval_dispatcher.apply_evaluation_results([individual], [future.result()])
+                    collected_next_population.update((ind.uid, ind) for ind in evaluated)
+                # Fill evaluation slots that are left free by the finishing generation
+                self._speculate_offspring(list(collected_next_population.values()), len(generation_in_flight))
+            self.reproducer.update_success_rate(len(collected_next_population) - collected_num, offspring_num)
+            if len(collected_next_population) >= generation_size * self.graph_optimizer_params.required_valid_ratio \
+                    or self.timer.is_time_limit_reached():
+                break
+        if not collected_next_population:
+            raise EvaluationAttemptsError('Could not collect valid individuals for next population. '
+                                          'Check objective, constraints and evo operators.')
+        new_population = list(collected_next_population.values())[:generation_size]
+        self.reproducer.update_throughput(new_population, timeit.default_timer() - start_time)
+
+        # Adaptive agent experience collection & learning
+        experience = self.mutation.agent_experience
+        experience.collect_results(new_population)
+        self.mutation.agent.partial_fit(experience)
+
+        # Use some part of previous pop in the next pop
+        new_population = self.inheritance(self.population, new_population)
+        new_population = self.elitism(self.generations.best_individuals, new_population)
+
+        return new_population
+
+    def _submit_offspring(self, population: PopulationT, offspring_num: int) -> Dict[Future, Individual]:
+        """ Produces offspring of the population and submits it for evaluation. """
+        offspring = self.reproducer.produce_offspring(population, offspring_num)
+        # individuals can come unchanged from population
+        return {self.eval_dispatcher.submit(ind): ind for ind in offspring if not ind.fitness.valid}
+
+    def _speculate_offspring(self, evaluated_individuals: PopulationT, generation_in_flight_num: int):
+        """ Submits speculative offspring of the evaluated individuals until all evaluation slots are busy. """
+        slots_num = determine_n_jobs(self.requirements.n_jobs)
+        free_slots_num = min(slots_num - generation_in_flight_num - len(self._speculative_offspring),
+                             self.graph_optimizer_params.pop_size - len(self._speculative_offspring))
+        if free_slots_num <= 0 or len(evaluated_individuals) < MIN_POP_SIZE or self.timer.is_time_limit_reached():
+            return
+        parent_uids = {ind.uid for ind in evaluated_individuals}
+        offspring_num = min(max(free_slots_num, 2), len(evaluated_individuals))
+        # experience of the speculative mutations is kept aside until their offspring are accepted
+        experience = self.mutation.agent_experience
+        self.mutation.agent_experience = ExperienceBuffer()
+        try:
+            submitted_offspring = self._submit_offspring(evaluated_individuals, offspring_num)
+        finally:
+            speculative_experience, self.mutation.agent_experience = self.mutation.agent_experience, experience
+        for future, individual in submitted_offspring.items():
+            self._speculative_offspring[future] = (individual, _ancestors_in(individual, parent_uids))
+        for observation, action, reward in zip(*speculative_experience.retrieve_experience(as_graphs=False)):
+            ancestor_uids = {observation.uid} if observation.uid in parent_uids \
+                else _ancestors_in(observation, parent_uids)
+            self._speculative_experience.append((observation, action, reward, ancestor_uids))
+
+    def _reconcile_speculative_offspring(self, population: PopulationT) -> Dict[Future, Individual]:
+        """ Returns speculative offspring whose parents are all in the population,
+        evaluations of the other speculative offspring are cancelled. """
+        population_uids = {ind.uid for ind in population}
+        reconciled = {}
+        for future, (individual, parent_uids) in self._speculative_offspring.items():
+            if parent_uids and parent_uids <= population_uids:
+                reconciled[future] = individual
+            else:
+                future.cancel()
+        if self._speculative_offspring:
+            self.log.info(f'Reconciled {len(reconciled)} of {len(self._speculative_offspring)} '
+                          f'speculative offspring with the population')
+        for observation, action, reward, ancestor_uids in self._speculative_experience:
+            if ancestor_uids and ancestor_uids <= population_uids:
+                self.mutation.agent_experience.collect_experience(observation, action, reward)
+        self._speculative_offspring = {}
+        self._speculative_experience = []
+        return reconciled
+
+    def _evolve_population_asynchronously(self) -> PopulationT:
+        """ Method realizing steady-state evolution cycle without waiting for the whole generation.
+        Evaluated individuals replace the worst ones as soon as they're ready and free evaluation slots
+        are immediately filled with the new offspring. Returns population after ``pop_size`` evaluations.
+        Offspring aren't reproduced in batches here: the number of evaluations in flight is fixed
+        and the failed ones are replaced at once, so the success rate of the reproducer doesn't change
+        the number of the offspring. It's still updated with the results, as well as the evaluation throughput. """
+        self._update_requirements()
+
+        generation_size = self.graph_optimizer_params.pop_size
+        start_time = timeit.default_timer()
+        self.reproducer.evaluation_throughput = None
+        population = list(self.population)
+        evaluated_individuals = []
+        completed_num = 0
+        while completed_num < generation_size and not self.timer.is_time_limit_reached():
+            self._fill_evaluation_slots(population)
+            done, _ = wait(list(self._evaluations_in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                individual = self._evaluations_in_flight.pop(future)
+                completed_num += 1
+                evaluated = self.eval_dispatcher.apply_evaluation_results([individual], [future.result()])
+                if evaluated:
+                    evaluated_individuals.extend(evaluated)
+                    population = self._replace_worst(population, evaluated)
+                    self.generations.update_archive(evaluated)
+        self.reproducer.update_success_rate(len(evaluated_individuals), completed_num)
+        self.reproducer.update_throughput(evaluated_individuals, timeit.default_timer() - start_time)
+
+        # Adaptive agent experience collection & learning
+        experience = self.mutation.agent_experience
+        experience.collect_results(evaluated_individuals)
+        self.mutation.agent.partial_fit(experience)
+
+        return population
+
+    def _fill_evaluation_slots(self, population: PopulationT):
+        """ Submits new offspring for evaluation until all evaluation slots are busy. """
+        slots_num = self.graph_optimizer_params.evaluations_in_flight or determine_n_jobs(self.requirements.n_jobs)
+        for _ in range(EVALUATION_ATTEMPTS_NUMBER):
+            free_slots_num = slots_num - len(self._evaluations_in_flight)
+            if free_slots_num <= 0:
+                return
+            if not self._offspring_queue:
+                offspring = self.reproducer.produce_offspring(population, max(free_slots_num, 2))
+                # individuals can come unchanged from population
+                self._offspring_queue = [ind for ind in offspring if not ind.fitness.valid]
+            while self._offspring_queue and len(self._evaluations_in_flight) < slots_num:
+                individual = self._offspring_queue.pop()
+                self._evaluations_in_flight[self.eval_dispatcher.submit(individual)] = individual
+        if not self._evaluations_in_flight:
+            raise EvaluationAttemptsError('Could not produce new individuals for evaluation. '
+                                          'Check constraints and evo operators.')
+
+    def _replace_worst(self, population: PopulationT, new_individuals: PopulationT) -> PopulationT:
+        population = population + list(new_individuals)
+        if len(population) > self.graph_optimizer_params.pop_size:
+            population = sort_by_fitness(population, key=lambda ind: ind.fitness)
+            population = population[:self.graph_optimizer_params.pop_size]
+        return population
+
     def _update_requirements(self):
         if not self.generations.is_any_improved:
             self.graph_optimizer_params.mutation_prob, self.graph_optimizer_params.crossover_prob = \
@@ -133,6 +318,9 @@ class EvoGraphOptimizer(PopulationalOptimizer):
             self.log.info(
                 f'Next mutation proba: {self.graph_optimizer_params.mutation_prob}; '
                 f'Next crossover proba: {self.graph_optimizer_params.crossover_prob}')
+        if isinstance(self._pop_size, WorkersAlignedPopulationSize) and self.reproducer.evaluation_throughput:
+            self._pop_size.update_throughput(self.reproducer.evaluation_throughput)
+            self.reproducer.workers_num = self._pop_size.workers_num
         self.graph_optimizer_params.pop_size = self._pop_size.next(self.population)
         self.requirements.max_depth = self._graph_depth.next()
         self.log.info(
@@ -142,3 +330,16 @@ class EvoGraphOptimizer(PopulationalOptimizer):
         # update requirements in operators
         for operator in self.operators:
             operator.update_requirements(self.graph_optimizer_params, self.requirements)
+
+
+def _ancestors_in(individual: Individual, population_uids: Set[str]) -> Set[str]:
+    """ Returns uids of the nearest ancestors of the individual that belong to the population. """
+    ancestors = set()
+    parents = individual.parents
+    while parents:
+        parent = parents.pop()
+        if parent.uid in population_uids:
+            ancestors.add(parent.uid)
+        else:
+            parents.extend(parent.parents)
+    return ancestors
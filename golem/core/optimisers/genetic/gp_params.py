@@ -70,6 +70,30 @@ class GPAlgorithmParameters(AlgorithmParameters):
         The smaller the value of decaying_factor, the larger the influence for the best operator.
     :param window_size: the size of sliding window for Multi-Armed Bandits to decrease variance.
         The window size is measured by the number of individuals to consider.
+
+    :param asynchronous_evaluation: enables asynchronous steady-state evolution without generational barriers.
+
+    Each evaluated individual immediately replaces the worst one in the population and
+    its evaluation slot is immediately filled with new offspring, so the workers don't wait
+    for the slowest evaluation of the generation. Logical generation is finished after
+    ``pop_size`` completed evaluations. Regularization, inheritance and elitism are not applied
+    in this mode (population keeps the best individuals anyway), delegate evaluator isn't used.
+
+    :param evaluations_in_flight: max number of concurrent evaluations in asynchronous mode.
+        By default, it equals to the number of jobs.
+
+    :param pipelined_evaluation: overlaps production of the next offspring with the tail of generation evaluation.
+
+    Offspring of the generation are submitted for evaluation one by one. When evaluation slots become free
+    while the last evaluations of the generation are finishing, the next offspring are produced (selected,
+    recombined, mutated and verified) from the already evaluated part of the generation and submitted
+    for evaluation speculatively. When the next generation starts, speculative offspring whose parents
+    survived into it are reconciled with it, the others are discarded. Delegate evaluator isn't used
+    in this mode. It's ignored if ``asynchronous_evaluation`` is enabled.
+
+    :param workers_aligned_pop_size: rounds population sizes and the sizes of reproduced batches
+        to multiples of the number of evaluation workers (limited by the measured concurrency of evaluations),
+        so the workers aren't idle at the end of the generation. See ``WorkersAlignedPopulationSize``.
     """
 
     crossover_prob: float = 0.8
@@ -94,6 +118,11 @@ class GPAlgorithmParameters(AlgorithmParameters):
     decaying_factor: float = 1.0
     window_size: Optional[int] = None
 
+    asynchronous_evaluation: bool = False
+    evaluations_in_flight: Optional[int] = None
+    pipelined_evaluation: bool = False
+    workers_aligned_pop_size: bool = False
+
     def __post_init__(self):
         if not self.selection_types:
             self.selection_types = (SelectionTypesEnum.spea2,) if self.multi_objective \
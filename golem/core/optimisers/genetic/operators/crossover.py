@@ -59,8 +59,8 @@ class Crossover(Operator):
         if self._will_crossover_be_applied(ind_first.graph, ind_second.graph, crossover_type):
             crossover_func = self._get_crossover_function(crossover_type)
             for _ in range(self.parameters.max_num_of_operator_attempts):
-                first_object = deepcopy(ind_first.graph)
-                second_object = deepcopy(ind_second.graph)
+                first_object = ind_first.graph.clone()
+                second_object = ind_second.graph.clone()
                 new_graphs = crossover_func(first_object, second_object, max_depth=self.requirements.max_depth)
                 are_correct = all(self.graph_generation_params.verifier(new_graph) for new_graph in new_graphs)
                 if are_correct:
@@ -1,3 +1,4 @@
+import timeit
 from typing import Optional
 
 import numpy as np
@@ -9,6 +10,7 @@ from golem.core.optimisers.genetic.operators.crossover import Crossover
 from golem.core.optimisers.genetic.operators.mutation import Mutation
 from golem.core.optimisers.genetic.operators.operator import PopulationT, EvaluationOperator
 from golem.core.optimisers.genetic.operators.selection import Selection
+from golem.core.optimisers.genetic.parameters.population_size import EvaluationThroughput, align_to_workers
 from golem.core.optimisers.populational_optimizer import EvaluationAttemptsError
 from golem.utilities.data_structures import ensure_wrapped_in_sequence
 
@@ -38,6 +40,8 @@ class ReproductionController:
         mutation: operator used in reproduction.
         crossover: operator used in reproduction.
         window_size: size in iterations of the moving window to compute reproduction success rate.
+        workers_num: number of evaluation workers. If it's greater than 1, the sizes of the reproduced
+            batches are rounded to its multiples where population allows it (see ``align_to_workers``).
     """
 
     def __init__(self,
@@ -46,6 +50,7 @@ class ReproductionController:
                  mutation: Mutation,
                  crossover: Crossover,
                  window_size: int = 10,
+                 workers_num: int = 1,
                  ):
         self.parameters = parameters
         self.selection = selection
@@ -55,6 +60,9 @@ class ReproductionController:
         self._minimum_valid_ratio = parameters.required_valid_ratio * 0.5
         self._window_size = window_size
         self._success_rate_window = np.full(self._window_size, 1.0)
+        self.workers_num = workers_num
+        # throughput of the evaluations of the last reproduction
+        self.evaluation_throughput: Optional[EvaluationThroughput] = None
 
         self._log = default_log(self)
 
@@ -65,6 +73,25 @@ class ReproductionController:
         Computed as average fraction for the last N iterations (N = window size param)"""
         return float(np.mean(self._success_rate_window))
 
+    def offspring_size(self, target_size: int, population_size: int) -> int:
+        """Returns number of offspring to produce from the population of ``population_size``
+        to get ``target_size`` valid individuals. It's compensated by the mean success rate
+        and is aligned to the number of evaluation workers."""
+        offspring_size = max(MIN_POP_SIZE, int(target_size / self.mean_success_rate))
+        offspring_size = min(population_size, offspring_size)
+        return align_to_workers(offspring_size, self.workers_num, max_size=population_size)
+
+    def update_success_rate(self, valid_num: int, offspring_num: int):
+        """Keeps running average of transform success rate (if sample is big enough).
+
+        Args:
+            valid_num: number of the valid individuals out of the produced offspring
+            offspring_num: number of the produced offspring
+        """
+        if valid_num >= MIN_POP_SIZE and offspring_num > 0:
+            self._success_rate_window = np.roll(self._success_rate_window, shift=1)
+            self._success_rate_window[0] = valid_num / offspring_num
+
     def reproduce_uncontrolled(self,
                                population: PopulationT,
                                evaluator: EvaluationOperator,
@@ -77,12 +104,32 @@ class ReproductionController:
         # (e.g. both Mutation & Crossover are not applied with some probability)
         # then there's a probability that duplicate individuals can appear
 
+        new_population = self.produce_offspring(population, pop_size)
+        start_time = timeit.default_timer()
+        new_population = evaluator(new_population)
+        self.update_throughput(new_population, timeit.default_timer() - start_time)
+        return new_population
+
+    def update_throughput(self, evaluated_population: PopulationT, wall_time: float):
+        """Accumulates throughput of the evaluations since the start of the last reproduction."""
+        computation_times = [ind.metadata.get('computation_time_in_seconds') for ind in evaluated_population
+                             if not ind.metadata.get('cached_evaluation')]
+        computation_times = [time for time in computation_times if time is not None]
+        throughput = EvaluationThroughput(len(computation_times), sum(computation_times), wall_time)
+        if self.evaluation_throughput is not None:
+            throughput = EvaluationThroughput(*map(sum, zip(self.evaluation_throughput, throughput)))
+        self.evaluation_throughput = throughput
+
+    def produce_offspring(self,
+                          population: PopulationT,
+                          pop_size: Optional[int] = None,
+                          ) -> PopulationT:
+        """Produces offspring of population (select, crossover, mutate) without evaluating it."""
         # TODO: it can't choose more than len(population)!
         #  It can be faster if it could.
         selected_individuals = self.selection(population, pop_size)
         new_population = self.crossover(selected_individuals)
         new_population = ensure_wrapped_in_sequence(self.mutation(new_population))
-        new_population = evaluator(new_population)
         return new_population
 
     def reproduce(self,
@@ -95,24 +142,18 @@ class ReproductionController:
         """
         total_target_size = self.parameters.pop_size  # next population size
         collected_next_population = {}
+        self.evaluation_throughput = None
         for i in range(EVALUATION_ATTEMPTS_NUMBER):
             # Estimate how many individuals we need to complete new population
             # based on average success rate of valid results
-            residual_size = total_target_size - len(collected_next_population)
-            residual_size = max(MIN_POP_SIZE,
-                                int(residual_size / self.mean_success_rate))
-            residual_size = min(len(population), residual_size)
+            residual_size = self.offspring_size(total_target_size - len(collected_next_population), len(population))
 
             # Reproduce the required number of individuals that equals residual size
             partial_next_population = self.reproduce_uncontrolled(population, evaluator, residual_size)
             # Avoid duplicate individuals that can come unchanged from previous population
             collected_next_population.update({ind.uid: ind for ind in partial_next_population})
 
-            # Keep running average of transform success rate (if sample is big enough)
-            if len(partial_next_population) >= MIN_POP_SIZE:
-                valid_ratio = len(partial_next_population) / residual_size
-                self._success_rate_window = np.roll(self._success_rate_window, shift=1)
-                self._success_rate_window[0] = valid_ratio
+            self.update_success_rate(len(partial_next_population), residual_size)
 
             # Successful return: got enough individuals
             if len(collected_next_population) >= total_target_size * self.parameters.required_valid_ratio:
@@ -1,7 +1,8 @@
 import math
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from golem.core.constants import MIN_POP_SIZE
+from golem.core.log import default_log
 from golem.core.optimisers.archive.generation_keeper import ImprovementWatcher
 from golem.core.optimisers.genetic.gp_params import GPAlgorithmParameters
 from golem.core.optimisers.genetic.operators.inheritance import GeneticSchemeTypesEnum
@@ -65,8 +66,93 @@ class AdaptivePopulationSize(PopulationSize):
         return pop_size
 
 
+class EvaluationThroughput(NamedTuple):
+    """Measured throughput of the population evaluation.
+
+    :param evaluations_num: number of the evaluated individuals.
+    :param computation_time: total computation time of the evaluations in seconds.
+    :param wall_time: duration of the population evaluation in seconds.
+    """
+    evaluations_num: int
+    computation_time: float
+    wall_time: float
+
+    @property
+    def concurrency(self) -> float:
+        """Mean number of the evaluations that were computed at once."""
+        return self.computation_time / self.wall_time if self.wall_time > 0 else 0.
+
+
+class WorkersAlignedPopulationSize(PopulationSize):
+    """Population size policy that rounds population sizes of the base policy to multiples
+    of the number of evaluation workers, so the last wave of evaluations of the generation
+    doesn't leave the workers idle. Size is rounded up while it doesn't exceed ``max_pop_size``,
+    otherwise it's rounded down.
+
+    Number of workers is limited by the measured concurrency of the evaluations (see `update_throughput`),
+    e.g. when the dispatcher can't run evaluations on all workers at once.
+
+    Args:
+        base_pop_size: policy that defines unaligned population sizes.
+        workers_num: number of evaluation workers.
+        max_pop_size: max population size.
+    """
+
+    def __init__(self, base_pop_size: PopulationSize, workers_num: int, max_pop_size: Optional[int] = None):
+        self._base_pop_size = base_pop_size
+        self._max_workers_num = max(1, workers_num)
+        self._max_pop_size = max_pop_size
+        self.workers_num = self._max_workers_num
+        self.utilisation_gain = 0.
+        self._log = default_log(self)
+
+    @property
+    def initial(self) -> int:
+        return self._align(self._base_pop_size.initial)
+
+    def next(self, population: PopulationT) -> int:
+        return self._align(self._base_pop_size.next(population))
+
+    def update_throughput(self, throughput: EvaluationThroughput):
+        """Updates number of workers with the measured concurrency of the evaluations.
+        Evaluations that can't load all the workers don't limit it."""
+        if throughput.evaluations_num >= self._max_workers_num and throughput.wall_time > 0:
+            self.workers_num = max(1, min(self._max_workers_num, round(throughput.concurrency)))
+
+    def _align(self, pop_size: int) -> int:
+        aligned_pop_size = align_to_workers(pop_size, self.workers_num, self._max_pop_size)
+        self.utilisation_gain = (workers_utilisation(aligned_pop_size, self.workers_num) -
+                                 workers_utilisation(pop_size, self.workers_num))
+        if aligned_pop_size != pop_size:
+            self._log.info(f'Population size {pop_size} is aligned to {aligned_pop_size} '
+                           f'for {self.workers_num} workers, utilisation gain {self.utilisation_gain:.1%}')
+        return aligned_pop_size
+
+
+def align_to_workers(size: int, workers_num: int, max_size: Optional[int] = None, min_size: int = MIN_POP_SIZE) -> int:
+    """Rounds size to the multiple of the number of workers. Size is rounded up if it doesn't exceed
+    ``max_size``, otherwise it's rounded down if it isn't less than ``min_size``.
+    Size that can't be aligned is returned unchanged."""
+    if workers_num <= 1:
+        return size
+    aligned_size = math.ceil(size / workers_num) * workers_num
+    if max_size is not None and aligned_size > max_size:
+        aligned_size = max_size // workers_num * workers_num
+        if aligned_size < max(min_size, 1):
+            return size
+    return aligned_size
+
+
+def workers_utilisation(size: int, workers_num: int) -> float:
+    """Fraction of the worker slots that are busy while ``size`` equal evaluations are computed."""
+    if size <= 0:
+        return 0.
+    return size / (math.ceil(size / workers_num) * workers_num)
+
+
 def init_adaptive_pop_size(requirements: GPAlgorithmParameters,
-                           improvement_watcher: ImprovementWatcher) -> PopulationSize:
+                           improvement_watcher: ImprovementWatcher,
+                           workers_num: int = 1) -> PopulationSize:
     genetic_scheme_type = requirements.genetic_scheme_type
     if genetic_scheme_type == GeneticSchemeTypesEnum.steady_state:
         pop_size = ConstRatePopulationSize(
@@ -90,4 +176,6 @@ def init_adaptive_pop_size(requirements: GPAlgorithmParameters,
                                           max_pop_size=requirements.max_pop_size)
     else:
         raise ValueError(f"Unknown genetic type scheme {genetic_scheme_type}")
+    if requirements.workers_aligned_pop_size and workers_num > 1:
+        pop_size = WorkersAlignedPopulationSize(pop_size, workers_num, requirements.max_pop_size)
     return pop_size
@@ -30,8 +30,9 @@ class SurrogateDispatcher(SequentialDispatcher):
 
     def evaluate_single(self, graph: OptGraph, uid_of_individual: str, with_time_limit: bool = True,
                         cache_key: Optional[str] = None,
-                        logs_initializer: Optional[Tuple[int, pathlib.Path]] = None) -> GraphEvalResult:
-        graph = self.evaluation_cache.get(cache_key, graph)
+                        logs_initializer: Optional[Tuple[int, pathlib.Path]] = None,
+                        fidelity: Optional[float] = None) -> GraphEvalResult:
+        graph = self.evaluation_cache.get(cache_key or uid_of_individual, graph)
         if logs_initializer is not None:
             # in case of multiprocessing run
             Log.setup_in_mp(*logs_initializer)
@@ -1,2 +1,2 @@
-from .objective import Objective, GraphFunction, ObjectiveFunction
+from .objective import BatchObjective, MultiFidelityObjective, Objective, GraphFunction, ObjectiveFunction
 from .objective_eval import ObjectiveEvaluate
@@ -1,7 +1,11 @@
+import inspect
 import itertools
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from numbers import Real
-from typing import Any, Optional, Callable, Sequence, TypeVar, Dict, Tuple, Union, Protocol
+from typing import Any, Optional, Callable, List, Sequence, TypeVar, Dict, Tuple, Union, Protocol
 
 from golem.core.dag.graph import Graph
 from golem.core.log import default_log
@@ -11,6 +15,9 @@ G = TypeVar('G', bound=Graph, contravariant=True)
 R = TypeVar('R', covariant=True)
 
 
+_metrics_executor_lock = threading.Lock()
+
+
 class GraphFunction(Protocol[G, R]):
     def __call__(self, graph: G) -> R:
         ...
@@ -41,31 +48,123 @@ class ObjectiveInfo:
 
 class Objective(ObjectiveInfo, ObjectiveFunction):
     """Represents objective function for computing metric values
-    on Graphs and keeps information about metrics used."""
+    on Graphs and keeps information about metrics used.
+
+    Metrics are evaluated in the order of increasing estimated cost, so the cheap metrics
+    (e.g. graph size) are evaluated before the expensive ones. After each evaluated metric
+    the optional rejection predicate is checked on the metrics evaluated so far:
+    if the graph is rejected, then the rest of the metrics aren't evaluated.
+
+    Args:
+        quality_metrics: quality metrics or the single metric
+        complexity_metrics: complexity metrics
+        is_multi_objective: whether the optimization is multi-objective
+        metric_costs: estimated relative costs of the metrics by their ids.
+            Metrics without the cost are considered the most expensive ones.
+        rejection_predicate: function that accepts the dict of the metrics evaluated so far
+            and returns True if the graph must be rejected without evaluation of the other metrics.
+        rejection_penalty: value of the metrics that aren't evaluated for the rejected graph.
+            If None, then the rejected graph gets invalid fitness.
+        metrics_n_jobs: number of threads for evaluation of the metrics with equal cost
+            (e.g. independent expensive metrics) or -1 for evaluation of all of them at once.
+            The threads are created on the first parallel evaluation and are shared by the calls of the objective.
+
+    Metrics must be synchronous, ``async def`` objective is passed to ``AsyncDispatcher`` as the whole function.
+    """
 
     def __init__(self,
                  quality_metrics: Union[Callable, Dict[Any, Callable]],
                  complexity_metrics: Optional[Dict[Any, Callable]] = None,
                  is_multi_objective: bool = False,
+                 metric_costs: Optional[Dict[Any, float]] = None,
+                 rejection_predicate: Optional[Callable[[Dict[Any, Real]], bool]] = None,
+                 rejection_penalty: Optional[Real] = None,
+                 metrics_n_jobs: int = 1,
                  ):
         self._log = default_log(self)
         if isinstance(quality_metrics, Callable):
             quality_metrics = {'metric': quality_metrics}
         self.quality_metrics = quality_metrics
         self.complexity_metrics = complexity_metrics or {}
+        self.metric_costs = metric_costs or {}
+        self.rejection_predicate = rejection_predicate
+        self.rejection_penalty = rejection_penalty
+        self.metrics_n_jobs = metrics_n_jobs
+        self._metrics_executor: Optional[ThreadPoolExecutor] = None
+        async_metrics = [str(metric_id) for metric_id, metric in self.metrics if _is_async_function(metric)]
+        if async_metrics:
+            raise ValueError(f'Metrics {async_metrics} are async functions, they are not supported by '
+                             f'{self.__class__.__name__}. Pass async objective directly to AsyncDispatcher.')
         metric_names = [str(metric_id) for metric_id, _ in self.metrics]
         ObjectiveInfo.__init__(self, is_multi_objective, metric_names)
 
     def __call__(self, graph: Graph, **metrics_kwargs: Any) -> Fitness:
-        evaluated_metrics = []
-        for metric_id, metric_func in self.metrics:
+        metrics = self.metrics
+        evaluated_metrics: Dict[int, Any] = {}
+        for metric_indices in self._metric_groups():
             try:
-                metric_value = metric_func(graph, **metrics_kwargs)
-                evaluated_metrics.append(metric_value)
-            except Exception as ex:
-                self._log.error(f'Objective evaluation error for graph {graph} on metric {metric_id}: {ex}')
+                evaluated_metrics.update(self._evaluate_metrics(graph, metric_indices, metrics_kwargs))
+            except _MetricEvaluationError as ex:
+                self._log.error(f'Objective evaluation error for graph {graph} on metric {ex.metric_id}: {ex.error}')
                 return null_fitness()  # fail right away
-        return to_fitness(evaluated_metrics, self.is_multi_objective)
+            if self.rejection_predicate is not None and len(evaluated_metrics) < len(metrics) and \
+                    self.rejection_predicate({metrics[i][0]: value for i, value in evaluated_metrics.items()}):
+                return self._rejected_fitness(evaluated_metrics)
+        return to_fitness([evaluated_metrics[i] for i in range(len(metrics))], self.is_multi_objective)
+
+    def _metric_groups(self) -> Sequence[Sequence[int]]:
+        """Returns indices of the metrics grouped for evaluation in the order of increasing cost.
+        Metrics of the equal cost are grouped together if they are evaluated in parallel."""
+        costs = [self.metric_costs.get(metric_id, math.inf) for metric_id, _ in self.metrics]
+        ordered_indices = sorted(range(len(costs)), key=lambda i: costs[i])
+        if self.metrics_n_jobs == 1:
+            return [[i] for i in ordered_indices]
+        return [list(group) for _, group in itertools.groupby(ordered_indices, key=lambda i: costs[i])]
+
+    def _evaluate_metrics(self, graph: Graph, metric_indices: Sequence[int],
+                          metrics_kwargs: Dict[str, Any]) -> Dict[int, Any]:
+        metrics = self.metrics
+        if len(metric_indices) == 1:
+            return {i: self._evaluate_metric(*metrics[i], graph, metrics_kwargs) for i in metric_indices}
+        pool = self._get_metrics_executor()
+        futures = {i: pool.submit(self._evaluate_metric, *metrics[i], graph, metrics_kwargs)
+                   for i in metric_indices}
+        return {i: future.result() for i, future in futures.items()}
+
+    def _get_metrics_executor(self) -> ThreadPoolExecutor:
+        """Returns the thread pool for parallel evaluation of the metrics creating it on the first use."""
+        executor = getattr(self, '_metrics_executor', None)
+        if executor is None:
+            with _metrics_executor_lock:
+                executor = getattr(self, '_metrics_executor', None)
+                if executor is None:
+                    max_workers = len(self.metrics) if self.metrics_n_jobs == -1 else self.metrics_n_jobs
+                    executor = self._metrics_executor = ThreadPoolExecutor(max_workers=max_workers)
+        return executor
+
+    def __getstate__(self):
+        # thread pool isn't copied, the copy of the objective creates its own one
+        state = self.__dict__.copy()
+        state['_metrics_executor'] = None
+        return state
+
+    @staticmethod
+    def _evaluate_metric(metric_id: Any, metric_func: Callable, graph: Graph, metrics_kwargs: Dict[str, Any]) -> Any:
+        try:
+            value = metric_func(graph, **metrics_kwargs)
+            if inspect.isawaitable(value):
+                if inspect.iscoroutine(value):
+                    value.close()
+                raise TypeError('metric returned awaitable, async metrics are not supported')
+            return value
+        except Exception as ex:
+            raise _MetricEvaluationError(metric_id, ex) from ex
+
+    def _rejected_fitness(self, evaluated_metrics: Dict[int, Any]) -> Fitness:
+        if self.rejection_penalty is None:
+            return null_fitness()
+        return to_fitness([evaluated_metrics.get(i, self.rejection_penalty) for i in range(len(self.metrics))],
+                          self.is_multi_objective)
 
     @property
     def metrics(self) -> Sequence[Tuple[Any, Callable]]:
@@ -75,6 +174,120 @@ class Objective(ObjectiveInfo, ObjectiveFunction):
         return ObjectiveInfo(self.is_multi_objective, self.metric_names)
 
 
+class BatchObjective(Objective):
+    """Objective with the metrics that are computed on the whole batch of graphs at once
+    (e.g. with vectorized NumPy operations), that is much cheaper for some metrics.
+
+    Each metric accepts the sequence of graphs and returns the sequence of metric values
+    of the same length. Evaluation dispatchers use `evaluate_batch` on chunks of population.
+    Call on the single graph is supported as well.
+
+    Metric costs and rejection predicate are applied as in ``Objective``: metrics are evaluated
+    in the order of increasing cost, and the graphs rejected after the cheap metrics
+    aren't passed to the more expensive ones."""
+
+    def __call__(self, graph: Graph, **metrics_kwargs: Any) -> Fitness:
+        return self.evaluate_batch([graph], **metrics_kwargs)[0]
+
+    def evaluate_batch(self, graphs: Sequence[Graph], **metrics_kwargs: Any) -> Sequence[Fitness]:
+        metrics = self.metrics
+        evaluated_metrics: List[Dict[int, Any]] = [{} for _ in graphs]
+        rejected = [False] * len(graphs)
+        for metric_indices in self._metric_groups():
+            graph_indices = [j for j in range(len(graphs)) if not rejected[j]]
+            if not graph_indices:
+                break
+            try:
+                metric_values = self._evaluate_metrics([graphs[j] for j in graph_indices], metric_indices,
+                                                       metrics_kwargs)
+            except _MetricEvaluationError as ex:
+                self._log.error(f'Objective evaluation error for batch of {len(graphs)} graphs '
+                                f'on metric {ex.metric_id}: {ex.error}')
+                return [null_fitness() for _ in graphs]  # fail right away
+            for i, values in metric_values.items():
+                for j, value in zip(graph_indices, values):
+                    evaluated_metrics[j][i] = value
+            if self.rejection_predicate is None:
+                continue
+            for j in graph_indices:
+                if len(evaluated_metrics[j]) < len(metrics) and \
+                        self.rejection_predicate({metrics[i][0]: value for i, value in evaluated_metrics[j].items()}):
+                    rejected[j] = True
+        return [self._rejected_fitness(graph_metrics) if is_rejected else
+                to_fitness([graph_metrics[i] for i in range(len(metrics))], self.is_multi_objective)
+                for graph_metrics, is_rejected in zip(evaluated_metrics, rejected)]
+
+    @staticmethod
+    def _evaluate_metric(metric_id: Any, metric_func: Callable, graphs: Sequence[Graph],
+                         metrics_kwargs: Dict[str, Any]) -> List[Any]:
+        try:
+            metric_values = list(metric_func(graphs, **metrics_kwargs))
+            if len(metric_values) != len(graphs):
+                raise ValueError(f'Expected {len(graphs)} metric values, got {len(metric_values)}')
+            return metric_values
+        except Exception as ex:
+            raise _MetricEvaluationError(metric_id, ex) from ex
+
+
+class MultiFidelityObjective(Objective):
+    """Objective with the metrics that can be computed at several fidelities
+    (e.g. on subsampled data or with fewer simulation steps), where lower fidelity is cheaper.
+
+    Each metric accepts ``fidelity`` keyword argument. Evaluation dispatchers evaluate
+    population with successive halving: all graphs are evaluated at the lowest fidelity,
+    then only the best part of them is promoted to the next fidelity and so on.
+    Fidelity of evaluation is saved in the ``evaluation_fidelity`` field of the individual metadata.
+    Call without fidelity evaluates the graph at the highest one.
+
+    Args:
+        quality_metrics: quality metrics that accept the graph and ``fidelity`` keyword argument
+        complexity_metrics: complexity metrics that accept the graph and ``fidelity`` keyword argument
+        is_multi_objective: whether the optimization is multi-objective
+        fidelities: increasing fidelities at which graphs are evaluated, the last one is the full fidelity
+        promotion_fraction: fraction of the best graphs that are promoted to the next fidelity
+        metric_costs: estimated relative costs of the metrics by their ids (see ``Objective``)
+        rejection_predicate: function that accepts the dict of the metrics evaluated so far
+            and returns True if the graph must be rejected without evaluation of the other metrics.
+        rejection_penalty: value of the metrics that aren't evaluated for the rejected graph.
+        metrics_n_jobs: number of threads for evaluation of the metrics with equal cost.
+    """
+
+    def __init__(self,
+                 quality_metrics: Union[Callable, Dict[Any, Callable]],
+                 complexity_metrics: Optional[Dict[Any, Callable]] = None,
+                 is_multi_objective: bool = False,
+                 fidelities: Sequence[float] = (1.,),
+                 promotion_fraction: float = 0.5,
+                 metric_costs: Optional[Dict[Any, float]] = None,
+                 rejection_predicate: Optional[Callable[[Dict[Any, Real]], bool]] = None,
+                 rejection_penalty: Optional[Real] = None,
+                 metrics_n_jobs: int = 1,
+                 ):
+        if not fidelities:
+            raise ValueError('At least one fidelity must be specified')
+        if not 0 < promotion_fraction <= 1:
+            raise ValueError(f'Promotion fraction must be in (0, 1], got {promotion_fraction}')
+        super().__init__(quality_metrics, complexity_metrics, is_multi_objective, metric_costs,
+                         rejection_predicate, rejection_penalty, metrics_n_jobs)
+        self.fidelities = sorted(fidelities)
+        self.promotion_fraction = promotion_fraction
+
+    @property
+    def max_fidelity(self) -> float:
+        return self.fidelities[-1]
+
+    def __call__(self, graph: Graph, **metrics_kwargs: Any) -> Fitness:
+        metrics_kwargs.setdefault('fidelity', self.max_fidelity)
+        return super().__call__(graph, **metrics_kwargs)
+
+
+class _MetricEvaluationError(Exception):
+    def __init__(self, metric_id: Any, error: Exception):
+        super().__init__(metric_id, error)
+        self.metric_id = metric_id
+        self.error = error
+
+
 def to_fitness(metric_values: Optional[Sequence[Real]], multi_objective: bool = False) -> Fitness:
     if metric_values is None:
         return null_fitness()
@@ -88,3 +301,7 @@ def get_metric_position(metrics, metric_type):
     for num, metric in enumerate(metrics):
         if isinstance(metric, metric_type):
             return num
+
+
+def _is_async_function(func: Callable) -> bool:
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, '__call__', None))
@@ -8,6 +8,7 @@ import shutil
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Sequence, Union, TYPE_CHECKING
 
+from golem.core.dag.array_graph import pack_at_rest
 from golem.core.log import default_log
 from golem.core.optimisers.objective.objective import ObjectiveInfo
 from golem.core.optimisers.opt_history_objects.generation import Generation
@@ -60,9 +61,17 @@ class OptHistory:
                        generation_metadata: Optional[Dict[str, Any]] = None):
         generation = Generation(individuals, self.generations_count, generation_label, generation_metadata)
         self.generations.append(generation)
+        self._pack_graphs(individuals)
 
     def add_to_archive_history(self, individuals: Sequence[Individual]):
         self.archive_history.append(list(individuals))
+        self._pack_graphs(individuals)
+
+    @staticmethod
+    def _pack_graphs(individuals: Sequence[Individual]):
+        """Packs the graphs of the stored individuals if they are kept in the arrays (see `pack_at_rest`)."""
+        for individual in individuals:
+            pack_at_rest(individual.graph)
 
     def to_csv(self, save_dir: Optional[os.PathLike] = None, file: os.PathLike = 'history.csv'):
         save_dir = save_dir or self._default_save_dir
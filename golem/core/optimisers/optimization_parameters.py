@@ -2,7 +2,7 @@ import dataclasses
 import datetime
 from dataclasses import dataclass, field
 from numbers import Number
-from typing import Optional
+from typing import Optional, Tuple
 
 from golem.core.paths import default_data_dir
 from golem.utilities.utilities import determine_n_jobs
@@ -32,11 +32,54 @@ class OptimizationParameters:
     Infrastructure options (logging, performance)
 
     :param keep_n_best: number of the best individuals of previous generation to keep in next generation
-    :param max_graph_fit_time: time constraint for evaluation of each graph (datetime.timedelta)
+    :param max_graph_fit_time: time constraint for evaluation of each graph (datetime.timedelta).
+
+        Evaluation that exceeds it is interrupted and the graph gets invalid fitness.
+        Hung evaluation workers are killed and restarted.
+
     :param n_jobs: num of n_jobs
     :param show_progress: bool indicating whether to show progress using tqdm or not
     :param collect_intermediate_metric: save metrics for intermediate (non-root) nodes in graph
-    :param parallelization_mode: identifies the way to parallelize population evaluation
+    :param parallelization_mode: identifies the way to parallelize population evaluation:
+        'populational' uses the pool of processes, 'threads' uses the pool of threads
+        (suitable for the objectives that release GIL), 'async' evaluates ``async def`` objectives
+        concurrently on the event loop (then `n_jobs` is the max number of concurrent evaluations),
+        'distributed' evaluates graphs on the worker agents connected over TCP (see ``DistributedDispatcher``),
+        other values mean sequential evaluation.
+    :param fitness_cache_size: max number of fitness values of evaluated graph structures kept in memory.
+
+        Structurally identical graphs get the cached fitness without calling the objective.
+        If None, then fitness caching is disabled. Use it only for deterministic objectives.
+
+    :param fitness_cache_path: optional path to the on-disk store of cached fitness values,
+        allows reusing them across runs. If the path is relative, then it's relative to `default_data_dir`.
+        Cached values are keyed by the fingerprint of the objective, so the store can be shared by different objectives.
+    :param fitness_cache_fingerprint: optional fingerprint of the evaluation setup (e.g. of the data),
+        the runs with different fingerprints don't reuse the cached fitness values of each other.
+    :param objective_batch_size: max number of graphs evaluated at once if objective is ``BatchObjective``.
+        If None, then population is evenly split between the jobs.
+    :param return_evaluated_graphs: whether evaluated graphs are sent back from the evaluation workers.
+        Can be disabled if the objective doesn't modify graphs, then only fitness and metadata are returned.
+    :param speculative_evaluation: whether the slow evaluations are duplicated on the idle workers
+        at the end of the generation, the first result is taken. Used only in 'populational' parallelization mode.
+    :param collect_garbage: whether garbage collection is run after each graph evaluation to contain memory leaks.
+        Can be disabled if the evaluation workers are recycled. It isn't applied in the 'async' parallelization mode.
+    :param evaluation_retries: how many times the evaluation is retried if it crashes the worker process.
+        Graphs that crash the worker on all retries are quarantined and get invalid fitness at once.
+        Used only in 'populational' parallelization mode.
+    :param max_tasks_per_worker: number of graph evaluations per worker process after which the workers
+        are restarted between the generations. Used only in 'populational' parallelization mode.
+    :param max_worker_memory: resident memory of the worker process in MiB above which the workers
+        are restarted between the generations. Used only in 'populational' parallelization mode.
+    :param shared_memory_population: whether graphs are sent to the evaluation workers through the shared memory,
+        so only their small handles are sent with the tasks. Used only in 'populational' parallelization mode.
+    :param evaluation_memory_budget: total memory in MiB the concurrent evaluations may use, the number
+        of concurrent evaluations is limited by their peak memory predicted by the graph size.
+        Used only in 'populational' parallelization mode.
+    :param coordinator_address: host and port the coordinator of the evaluation workers listens on,
+        port 0 means any free port. Used only in 'distributed' parallelization mode.
+    :param coordinator_authkey: key that authenticates the evaluation workers, random key is generated if None.
+        Used only in 'distributed' parallelization mode.
 
     History options:
 
@@ -59,6 +102,20 @@ class OptimizationParameters:
     show_progress: bool = True
     collect_intermediate_metric: bool = False
     parallelization_mode: str = 'populational'
+    fitness_cache_size: Optional[int] = None
+    fitness_cache_path: Optional[str] = None
+    fitness_cache_fingerprint: Optional[str] = None
+    objective_batch_size: Optional[int] = None
+    return_evaluated_graphs: bool = True
+    speculative_evaluation: bool = False
+    collect_garbage: bool = True
+    evaluation_retries: int = 1
+    max_tasks_per_worker: Optional[int] = None
+    max_worker_memory: Optional[float] = None
+    shared_memory_population: bool = False
+    evaluation_memory_budget: Optional[float] = None
+    coordinator_address: Tuple[str, int] = ('localhost', 0)
+    coordinator_authkey: Optional[bytes] = None
     static_individual_metadata: dict = field(default_factory=lambda: {
         'use_input_preprocessing': True
     })
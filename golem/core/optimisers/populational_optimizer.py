@@ -4,8 +4,13 @@ from typing import Any, Optional, Sequence, Dict
 
 from golem.core.constants import MIN_POP_SIZE
 from golem.core.dag.graph import Graph
+from golem.core.dag.graph_utils import GraphDict
 from golem.core.optimisers.archive import GenerationKeeper
-from golem.core.optimisers.genetic.evaluation import MultiprocessingDispatcher, SequentialDispatcher
+from golem.core.optimisers.genetic.async_evaluation import AsyncDispatcher
+from golem.core.optimisers.genetic.distributed_evaluation import DistributedDispatcher
+from golem.core.optimisers.genetic.evaluation import MultiprocessingDispatcher, SequentialDispatcher, \
+    TelemetryCallback, ThreadPoolDispatcher
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache
 from golem.core.optimisers.genetic.operators.operator import PopulationT, EvaluationOperator
 from golem.core.optimisers.objective import GraphFunction, ObjectiveFunction
 from golem.core.optimisers.objective.objective import Objective
@@ -15,6 +20,14 @@ from golem.core.optimisers.optimizer import GraphGenerationParams, GraphOptimize
 from golem.core.optimisers.timer import OptimisationTimer
 from golem.utilities.grouped_condition import GroupedCondition
 
+# evaluation dispatchers for the parallelization modes, the others use sequential evaluation
+_DISPATCHER_TYPES = {
+    'populational': MultiprocessingDispatcher,
+    'threads': ThreadPoolDispatcher,
+    'async': AsyncDispatcher,
+    'distributed': DistributedDispatcher,
+}
+
 
 class PopulationalOptimizer(GraphOptimizer):
     """
@@ -48,13 +61,36 @@ class PopulationalOptimizer(GraphOptimizer):
         self.generations = GenerationKeeper(self.objective, keep_n_best=requirements.keep_n_best)
         self.timer = OptimisationTimer(timeout=self.requirements.timeout)
 
-        dispatcher_type = MultiprocessingDispatcher if self.requirements.parallelization_mode == 'populational' else \
-            SequentialDispatcher
-
-        self.eval_dispatcher = dispatcher_type(adapter=graph_generation_params.adapter,
-                                               n_jobs=requirements.n_jobs,
-                                               graph_cleanup_fn=_try_unfit_graph,
-                                               delegate_evaluator=graph_generation_params.remote_evaluator)
+        dispatcher_type = _DISPATCHER_TYPES.get(self.requirements.parallelization_mode, SequentialDispatcher)
+
+        fitness_cache = FitnessCache(maxsize=requirements.fitness_cache_size,
+                                     path=requirements.fitness_cache_path,
+                                     fingerprint=requirements.fitness_cache_fingerprint) \
+            if requirements.fitness_cache_size else None
+
+        dispatcher_params = dict(adapter=graph_generation_params.adapter,
+                                 n_jobs=requirements.n_jobs,
+                                 graph_cleanup_fn=_try_unfit_graph,
+                                 delegate_evaluator=graph_generation_params.remote_evaluator,
+                                 fitness_cache=fitness_cache,
+                                 max_graph_fit_time=requirements.max_graph_fit_time,
+                                 objective_batch_size=requirements.objective_batch_size,
+                                 return_evaluated_graphs=requirements.return_evaluated_graphs,
+                                 collect_garbage=requirements.collect_garbage)
+        if dispatcher_type is MultiprocessingDispatcher:
+            dispatcher_params.update(speculative_evaluation=requirements.speculative_evaluation,
+                                     evaluation_retries=requirements.evaluation_retries,
+                                     max_tasks_per_worker=requirements.max_tasks_per_worker,
+                                     max_worker_memory=requirements.max_worker_memory,
+                                     shared_memory_population=requirements.shared_memory_population,
+                                     memory_budget=requirements.evaluation_memory_budget)
+        elif dispatcher_type is AsyncDispatcher:
+            # garbage isn't collected after each evaluation not to block the event loop
+            del dispatcher_params['collect_garbage']
+        elif dispatcher_type is DistributedDispatcher:
+            dispatcher_params.update(address=requirements.coordinator_address,
+                                     authkey=requirements.coordinator_authkey)
+        self.eval_dispatcher = dispatcher_type(**dispatcher_params)
 
         # early_stopping_iterations and early_stopping_timeout may be None, so use some obvious max number
         max_stagnation_length = requirements.early_stopping_iterations or requirements.num_of_generations
@@ -86,28 +122,49 @@ class PopulationalOptimizer(GraphOptimizer):
         # Redirect callback to evaluation dispatcher
         self.eval_dispatcher.set_graph_evaluation_callback(callback)
 
+    def set_evaluation_telemetry_callback(self, callback: Optional[TelemetryCallback],
+                                          count_ipc_bytes: bool = False):
+        """Set or reset (with None) callback that receives ``EvaluationTelemetry`` of each population
+        evaluation with the number of the generation it belongs to. Telemetry can be exported with
+        ``JsonLinesTelemetryWriter`` or ``PrometheusTelemetryWriter`` callbacks.
+        Volume of the data sent to the worker processes is counted only if ``count_ipc_bytes`` is set,
+        because the data is pickled once more to count it."""
+        if callback is None:
+            self.eval_dispatcher.set_telemetry_callback(None)
+            return
+
+        def report_telemetry(telemetry):
+            telemetry.generation_num = self.current_generation_num
+            callback(telemetry)
+
+        self.eval_dispatcher.set_telemetry_callback(report_telemetry, count_ipc_bytes)
+
     def optimise(self, objective: ObjectiveFunction) -> Sequence[Graph]:
 
         # eval_dispatcher defines how to evaluate objective on the whole population
         evaluator = self.eval_dispatcher.dispatch(objective, self.timer)
 
-        with self.timer, self._progressbar as pbar:
-
-            self._initial_population(evaluator)
-
-            while not self.stop_optimization():
-                try:
-                    new_population = self._evolve_population(evaluator)
-                    if self.gen_structural_diversity_check != -1 \
-                            and self.generations.generation_num % self.gen_structural_diversity_check == 0 \
-                            and self.generations.generation_num != 0:
-                        new_population = self.get_structure_unique_population(new_population, evaluator)
-                    pbar.update()
-                except EvaluationAttemptsError as ex:
-                    self.log.warning(f'Composition process was stopped due to: {ex}')
-                    break
-                # Adding of new population to history
-                self._update_population(new_population)
+        try:
+            with self.timer, self._progressbar as pbar:
+
+                self._initial_population(evaluator)
+
+                while not self.stop_optimization():
+                    try:
+                        new_population = self._evolve_population(evaluator)
+                        if self.gen_structural_diversity_check != -1 \
+                                and self.generations.generation_num % self.gen_structural_diversity_check == 0 \
+                                and self.generations.generation_num != 0:
+                            new_population = self.get_structure_unique_population(new_population, evaluator)
+                        pbar.update()
+                    except EvaluationAttemptsError as ex:
+                        self.log.warning(f'Composition process was stopped due to: {ex}')
+                        break
+                    # Adding of new population to history
+                    self._update_population(new_population)
+        finally:
+            # release evaluation workers that are kept between generations
+            self.eval_dispatcher.shutdown()
         pbar.close()
         self._update_population(self.best_individuals, 'final_choices')
         return [ind.graph for ind in self.best_individuals]
@@ -157,8 +214,8 @@ class PopulationalOptimizer(GraphOptimizer):
     def get_structure_unique_population(self, population: PopulationT, evaluator: EvaluationOperator) -> PopulationT:
         """ Increases structurally uniqueness of population to prevent stagnation in optimization process.
         Returned population may be not entirely unique, if the size of unique population is lower than MIN_POP_SIZE. """
-        unique_population_with_ids = {ind.graph.descriptive_id: ind for ind in population}
-        unique_population = list(unique_population_with_ids.values())
+        unique_population_with_graphs = GraphDict((ind.graph, ind) for ind in population)
+        unique_population = unique_population_with_graphs.values()
 
         # if size of unique population is too small, then extend it to MIN_POP_SIZE by repeating individuals
         if len(unique_population) < MIN_POP_SIZE:
@@ -1,7 +1,7 @@
 # flake8: noqa
 from .enum_serialization import enum_from_json, enum_to_json
 from .graph_node_serialization import graph_node_to_json
-from .graph_serialization import graph_from_json
+from .graph_serialization import graph_from_json, graph_to_json
 from .opt_history_serialization import opt_history_from_json, opt_history_to_json
 from .parent_operator_serialization import parent_operator_from_json, parent_operator_to_json
 from .uuid_serialization import uuid_from_json, uuid_to_json
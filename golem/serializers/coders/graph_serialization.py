@@ -1,8 +1,18 @@
 from typing import Any, Dict, Type, Sequence, Union
 
+from golem.core.dag.array_graph import ArrayGraph
 from golem.core.dag.graph import Graph
 from golem.core.dag.graph_delegate import GraphDelegate
 from golem.core.dag.linked_graph_node import LinkedGraphNode
+from .. import any_to_json
+
+
+def graph_to_json(obj: Graph) -> Dict[str, Any]:
+    if isinstance(obj, ArrayGraph):
+        # nodes are stored instead of the arrays, packed graph isn't unpacked for that
+        nodes = obj.to_linked_graph().nodes if obj.is_packed else obj.nodes
+        return {'_nodes': nodes, '_postprocess_nodes': obj._postprocess_nodes}
+    return any_to_json(obj)
 
 
 def graph_from_json(cls: Type[Graph], json_obj: Dict[str, Any]) -> Graph:
@@ -96,6 +96,7 @@ class Serializer(JSONEncoder, JSONDecoder):
             enum_from_json,
             enum_to_json,
             graph_from_json,
+            graph_to_json,
             graph_node_to_json,
             opt_history_from_json,
             opt_history_to_json,
@@ -115,7 +116,7 @@ class Serializer(JSONEncoder, JSONDecoder):
             Individual: basic_serialization,
             Generation: basic_serialization,
             LinkedGraphNode: {_to_json: graph_node_to_json, _from_json: any_from_json},
-            Graph: {_to_json: any_to_json, _from_json: graph_from_json},
+            Graph: {_to_json: graph_to_json, _from_json: graph_from_json},
             OptHistory: {_to_json: opt_history_to_json, _from_json: opt_history_from_json},
             ParentOperator: {_to_json: parent_operator_to_json, _from_json: parent_operator_from_json},
             UUID: {_to_json: uuid_to_json, _from_json: uuid_from_json},
@@ -2,6 +2,7 @@ import collections.abc
 import dataclasses
 
 from abc import ABC, abstractmethod
+from collections import Counter
 from copy import deepcopy
 from enum import Enum
 from typing import Callable, Container, Generic, Iterable, Iterator, List, Optional, Sequence, Sized, TypeVar, Union, \
@@ -79,6 +80,111 @@ class UniqueList(list, Generic[T]):
         return self
 
 
+class ObservableListMixin:
+    """
+    Mixin for list classes that reports the elements added to the list and removed from it
+    to ``_on_change`` after each modification. It must precede the list class in the bases.
+    Reordering of the elements (e.g. ``sort``) isn't reported.
+    """
+
+    __slots__ = ()
+
+    def _on_change(self, removed: Sequence[T], added: Sequence[T]):
+        """
+        Handles modification of the list
+
+        :param removed: elements removed from the list
+        :param added: elements added to the list
+        """
+        raise NotImplementedError()
+
+    def append(self, value: T):
+        length = len(self)
+        super().append(value)
+        if len(self) > length:
+            self._on_change((), (value,))
+
+    def insert(self, index: int, value: T):
+        length = len(self)
+        super().insert(index, value)
+        if len(self) > length:
+            self._on_change((), (value,))
+
+    def extend(self, iterable: Iterable[T]):
+        length = len(self)
+        super().extend(iterable)
+        if len(self) > length:
+            self._on_change((), self[length:])
+
+    def __iadd__(self, other: Iterable[T]):
+        self.extend(other)
+        return self
+
+    def remove(self, value: T):
+        idx = self.index(value)
+        removed = self[idx]
+        super().__delitem__(idx)
+        self._on_change((removed,), ())
+
+    def pop(self, index: int = -1) -> T:
+        value = super().pop(index)
+        self._on_change((value,), ())
+        return value
+
+    def clear(self):
+        removed = list(self)
+        super().clear()
+        self._on_change(removed, ())
+
+    def __setitem__(self, key: Union[int, slice], value: Union[T, Iterable[T]]):
+        if isinstance(key, slice):
+            before = list(self)
+            super().__setitem__(key, value)
+            self._on_change(*list_difference(before, self))
+        else:
+            old_value = self[key]
+            super().__setitem__(key, value)
+            if self[key] is not old_value:
+                self._on_change((old_value,), (self[key],))
+
+    def __delitem__(self, key: Union[int, slice]):
+        removed = self[key] if isinstance(key, slice) else (self[key],)
+        super().__delitem__(key)
+        self._on_change(removed, ())
+
+    def __imul__(self, n: int):
+        before = list(self)
+        super().__imul__(n)
+        self._on_change(*list_difference(before, self))
+        return self
+
+
+def list_difference(before: Sequence[T], after: Sequence[T]) -> Tuple[List[T], List[T]]:
+    """
+    Compares the elements of the sequences by identity, including the repeated ones
+
+    :param before: elements before the modification
+    :param after: elements after the modification
+
+    :return: elements that are removed and elements that are added
+    """
+    after_counts = Counter(map(id, after))
+    removed = []
+    for item in before:
+        if after_counts[id(item)] > 0:
+            after_counts[id(item)] -= 1
+        else:
+            removed.append(item)
+    before_counts = Counter(map(id, before))
+    added = []
+    for item in after:
+        if before_counts[id(item)] > 0:
+            before_counts[id(item)] -= 1
+        else:
+            added.append(item)
+    return removed, added
+
+
 def remove_items(collection: List[T], items_to_remove: Container[T]):
     """
     Removes all specified items from the list. Modifies original collection
@@ -0,0 +1,178 @@
+import gc
+import json
+import pickle
+import random
+import tracemalloc
+from copy import deepcopy
+from typing import List
+
+import pytest
+
+from golem.core.adapter import DirectAdapter
+from golem.core.dag.array_graph import ArrayGraph
+from golem.core.dag.graph_delegate import GraphDelegate
+from golem.core.dag.graph_verifier import GraphVerifier
+from golem.core.dag.linked_graph import LinkedGraph
+from golem.core.dag.linked_graph_node import LinkedGraphNode
+from golem.core.dag.verification_rules import DEFAULT_DAG_RULES
+from golem.core.optimisers.fitness import SingleObjFitness
+from golem.core.optimisers.genetic.evaluation import SequentialDispatcher
+from golem.core.optimisers.genetic.operators.base_mutations import single_drop_mutation, single_edge_mutation
+from golem.core.optimisers.opt_history_objects.individual import Individual
+from golem.core.optimisers.opt_history_objects.opt_history import OptHistory
+from golem.serializers import Serializer
+from test.unit.optimizers.gp_operators.test_mutation import get_mutation_params
+from test.unit.utils import graph_first, graph_fifth, simple_cycled_graph, graph_with_multi_roots_first
+
+
+def assert_same_nodes(graph, other_graph):
+    assert [node.uid for node in graph.nodes] == [node.uid for node in other_graph.nodes]
+    assert [node.content for node in graph.nodes] == [node.content for node in other_graph.nodes]
+    assert [[parent.uid for parent in node.nodes_from] for node in graph.nodes] == \
+           [[parent.uid for parent in node.nodes_from] for node in other_graph.nodes]
+
+
+def array_graph_first() -> GraphDelegate:
+    return GraphDelegate(deepcopy(graph_first().nodes), delegate_cls=ArrayGraph)
+
+
+@pytest.mark.parametrize('graph', [graph_first(), graph_fifth(), simple_cycled_graph(),
+                                   graph_with_multi_roots_first()])
+def test_array_graph_restores_graph(graph):
+    array_graph = ArrayGraph.from_graph(graph)
+    assert array_graph.is_packed
+    assert array_graph.length == graph.length
+
+    linked_graph = array_graph.to_linked_graph()
+    assert isinstance(linked_graph, LinkedGraph)
+    assert array_graph.is_packed
+    assert_same_nodes(linked_graph, graph)
+
+    assert array_graph == graph
+    assert_same_nodes(array_graph, graph)
+    assert array_graph.descriptive_id == graph.descriptive_id
+
+
+def test_array_graph_interns_labels():
+    graph = graph_first()
+    arrays = ArrayGraph.from_graph(graph).arrays
+    assert len(arrays) == graph.length
+    assert len(arrays.labels) == len({node.name for node in graph.nodes})
+    assert len(arrays.edges()) == len(graph.get_edges())
+
+
+def test_array_graph_packs_and_unpacks():
+    graph = ArrayGraph(deepcopy(graph_first().nodes))
+    assert not graph.is_packed
+    root = graph.root_nodes()[0]
+    graph.delete_node(root.nodes_from[0])
+    expected_graph = deepcopy(graph)
+
+    graph.pack()
+    assert graph.is_packed
+    assert graph == expected_graph
+    assert graph.is_packed
+    assert_same_nodes(graph, expected_graph)
+    assert not graph.is_packed
+    # nodes are new objects after the unpacking
+    assert root not in graph.nodes
+
+
+def test_array_graph_copies_are_packed():
+    graph = ArrayGraph(deepcopy(graph_first().nodes))
+    for copied_graph in (deepcopy(graph), pickle.loads(pickle.dumps(graph))):
+        assert copied_graph.is_packed
+        assert copied_graph == graph
+    assert len(pickle.dumps(graph)) < len(pickle.dumps(graph_first()))
+
+
+def test_array_graph_keeps_unsupported_nodes():
+    nodes = deepcopy(graph_first().nodes)
+    nodes[0].extra_state = 'state'
+    graph = ArrayGraph(nodes)
+    with pytest.raises(ValueError):
+        graph.pack()
+    with pytest.raises(ValueError):
+        ArrayGraph.from_graph(graph)
+
+    copied_graph = pickle.loads(pickle.dumps(graph))
+    assert not copied_graph.is_packed
+    assert copied_graph.nodes[0].extra_state == 'state'
+    assert copied_graph == graph
+
+
+def test_array_graph_mutations_and_verification():
+    graph = array_graph_first()
+    verifier = GraphVerifier(DEFAULT_DAG_RULES)
+    assert verifier(graph)
+
+    params = get_mutation_params()
+    new_graph = deepcopy(graph)
+    assert new_graph.operator.is_packed
+    new_graph = single_drop_mutation(new_graph, **params)
+    new_graph = single_edge_mutation(new_graph, **params)
+    assert verifier(new_graph)
+    assert new_graph != graph
+    assert graph == graph_first()
+
+    new_graph.add_node(LinkedGraphNode('a'))
+    assert not verifier(new_graph)
+
+
+def test_array_graph_serialization():
+    graph = array_graph_first()
+    graph.operator.pack()
+    json_graph = json.dumps(graph, cls=Serializer)
+    restored_graph = json.loads(json_graph, cls=Serializer)
+    assert restored_graph == graph
+    assert_same_nodes(restored_graph, graph)
+
+
+@pytest.mark.parametrize('graph', [graph_first(), graph_fifth(), simple_cycled_graph(),
+                                   graph_with_multi_roots_first()])
+def test_packed_array_graph_answers_queries_from_arrays(graph):
+    array_graph = ArrayGraph.from_graph(graph)
+    assert array_graph.length == graph.length
+    assert array_graph.depth == graph.depth
+    assert array_graph.descriptive_id == graph.descriptive_id
+    assert array_graph.structural_hash == graph.structural_hash
+    assert array_graph == graph
+    assert array_graph == ArrayGraph.from_graph(graph)
+    assert array_graph.is_packed
+
+
+def random_population(size: int, graph_size: int, graph_cls) -> List[Individual]:
+    random.seed(1)
+    population = []
+    for _ in range(size):
+        nodes = []
+        for _ in range(graph_size):
+            parents = random.sample(nodes, min(len(nodes), random.randint(0, 2)))
+            nodes.append(LinkedGraphNode({'name': random.choice('abcdef'),
+                                          'params': {'alpha': random.random()}}, nodes_from=parents))
+        population.append(Individual(GraphDelegate(nodes, delegate_cls=graph_cls)))
+    return population
+
+
+def evaluated_population_memory(graph_cls) -> int:
+    def objective(graph):
+        return SingleObjFitness(sum(len(node.nodes_from) for node in graph.nodes))
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        population = random_population(100, 30, graph_cls)
+        population = SequentialDispatcher(DirectAdapter(), collect_garbage=False).dispatch(objective)(population)
+        OptHistory().add_to_history(population)
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    assert len(population) == 100
+    if graph_cls is ArrayGraph:
+        assert all(ind.graph.operator.is_packed for ind in population)
+    return memory
+
+
+def test_evaluated_array_graphs_are_packed_at_rest():
+    assert evaluated_population_memory(ArrayGraph) < 0.5 * evaluated_population_memory(LinkedGraph)
@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from golem.core.dag.compact_graph import CompactGraph, decode_graph, encode_graph
+from golem.core.dag.linked_graph_node import LinkedGraphNode
+from test.unit.utils import graph_first, graph_fifth, simple_cycled_graph, graph_with_multi_roots_first
+
+
+class ExtendedNode(LinkedGraphNode):
+    pass
+
+
+@pytest.mark.parametrize('graph', [graph_first(), graph_fifth(), simple_cycled_graph(),
+                                   graph_with_multi_roots_first()])
+def test_compact_graph_restores_graph(graph):
+    encoded = encode_graph(graph)
+    assert isinstance(encoded, CompactGraph)
+
+    restored = decode_graph(pickle.loads(pickle.dumps(encoded)))
+    assert restored == graph
+    assert [node.uid for node in restored.nodes] == [node.uid for node in graph.nodes]
+    assert [node.content for node in restored.nodes] == [node.content for node in graph.nodes]
+    assert [[parent.uid for parent in node.nodes_from] for node in restored.nodes] == \
+           [[parent.uid for parent in node.nodes_from] for node in graph.nodes]
+
+
+def test_compact_graph_interns_contents():
+    graph = graph_first()
+    encoded = encode_graph(graph)
+    assert len(encoded.contents) == len({node.name for node in graph.nodes})
+    assert len(pickle.dumps(encoded)) < len(pickle.dumps(graph))
+
+    restored = decode_graph(encoded)
+    # restored nodes don't share content
+    restored.nodes[0].content['params'] = {'changed': True}
+    assert all('params' not in node.content for node in restored.nodes[1:])
+
+
+def test_compact_graph_is_not_used_for_unsupported_graphs():
+    graph = graph_first()
+    graph.nodes[0].__class__ = ExtendedNode
+    assert encode_graph(graph) is graph
+    assert decode_graph(graph) is graph
+
+    graph = graph_first()
+    graph.nodes[0].content['params'] = {'unhashable': [{1, 2}]}
+    restored = decode_graph(encode_graph(graph))
+    assert restored.nodes[0].content == graph.nodes[0].content
+
+
+@pytest.mark.parametrize('graph', [graph_first(), graph_fifth(), simple_cycled_graph(),
+                                   graph_with_multi_roots_first()])
+def test_compact_graph_restores_graph_from_buffer(graph):
+    encoded = encode_graph(graph)
+    buffers = encoded.to_buffers()
+    payload = b''.join(buffers)
+    assert len(payload) % encoded.content_ids.itemsize == 0
+
+    read_graph = CompactGraph.from_buffer(memoryview(payload))
+    try:
+        restored = read_graph.decode()
+    finally:
+        read_graph.release()
+    assert restored == graph
+    assert [node.uid for node in restored.nodes] == [node.uid for node in graph.nodes]
+    assert [node.content for node in restored.nodes] == [node.content for node in graph.nodes]
@@ -1,3 +1,4 @@
+import pickle
 from copy import copy, deepcopy
 from random import seed
 
@@ -323,5 +324,163 @@ def test_graph_deepcopy(graph: Graph):
     assert graph.root_node.descriptive_id != graph_copy.root_node.descriptive_id
 
 
+@pytest.mark.parametrize('graph', [GraphImpl(GraphNode(content='n1')),
+                                   GraphDelegate(GraphNode(content='n1'), delegate_cls=GraphImpl)])
+def test_graph_clone(graph: Graph):
+    graph.root_node.parameters = {'param': 1}
+    graph_copy = graph.clone()
+
+    assert type(graph_copy) is type(graph)
+    assert graph_copy == graph
+    assert graph_copy.root_node is not graph.root_node
+    assert graph_copy.root_node.uid == graph.root_node.uid
+
+    _modify_graph_copy(graph_copy)
+    graph_copy.root_node.parameters = {'param': 2}
+
+    assert graph.root_node.descriptive_id != graph_copy.root_node.descriptive_id
+    assert graph.root_node.parameters == {'param': 1}
+
+
+def test_graph_clone_copies_subtree():
+    first = GraphNode(content='n1')
+    second = GraphNode(content='n2', nodes_from=[first])
+    final = GraphNode(content='n3', nodes_from=[first, second])
+    graph = GraphImpl(final)
+    graph_copy = graph.clone()
+
+    assert not set(graph_copy.nodes) & set(graph.nodes)
+    copied_final = graph_copy.root_node
+    assert copied_final.nodes_from[0] is copied_final.nodes_from[1].nodes_from[0]
+    # descriptive ids are computed for the copy of the graph with the original nodes
+    assert copied_final.descriptive_id == final.descriptive_id
+    _assert_children_index_is_actual(graph_copy)
+
+
+def test_graph_clone_deep_copies_nodes_with_additional_state():
+    node = GraphNode(content='n1')
+    node.state = ['state']
+    graph = GraphImpl(GraphNode(content='n2', nodes_from=[node]))
+    graph_copy = graph.clone()
+
+    copied_node = graph_copy.root_node.nodes_from[0]
+    assert copied_node is not node
+    assert copied_node.state == node.state
+    assert copied_node.state is not node.state
+
+
 def _modify_graph_copy(graph: Graph):
     graph.root_node.content['name'] = 'n2'
+
+
+def _scanned_children(graph: LinkedGraph, node: GraphNode):
+    return {child for child in graph.nodes if node in child.nodes_from}
+
+
+def _assert_children_index_is_actual(graph: LinkedGraph):
+    nodes = set(graph.nodes) | {parent for node in graph.nodes for parent in node.nodes_from}
+    for node in nodes:
+        assert set(graph.node_children(node)) == _scanned_children(graph, node)
+    assert set(graph.root_nodes()) == {node for node in graph.nodes if not _scanned_children(graph, node)}
+
+
+def test_children_index_follows_graph_modifications():
+    first = GraphNode(content='n1')
+    second = GraphNode(content='n2', nodes_from=[first])
+    third = GraphNode(content='n3', nodes_from=[first])
+    final = GraphNode(content='n4', nodes_from=[second, third])
+    graph = GraphImpl(final)
+    _assert_children_index_is_actual(graph)
+
+    new_node = GraphNode(content='n5')
+    graph.add_node(new_node)
+    graph.connect_nodes(new_node, final)
+    _assert_children_index_is_actual(graph)
+    graph.disconnect_nodes(first, third)
+    _assert_children_index_is_actual(graph)
+    graph.update_node(second, GraphNode(content='n6'))
+    _assert_children_index_is_actual(graph)
+    graph.update_subtree(third, GraphNode(content='n7', nodes_from=[GraphNode(content='n8')]))
+    _assert_children_index_is_actual(graph)
+    graph.delete_node(new_node)
+    _assert_children_index_is_actual(graph)
+    graph.delete_subtree(graph.root_node.nodes_from[0])
+    _assert_children_index_is_actual(graph)
+
+
+def test_children_index_follows_direct_edges_modifications():
+    first = GraphNode(content='n1')
+    second = GraphNode(content='n2', nodes_from=[first])
+    third = GraphNode(content='n3', nodes_from=[first])
+    final = GraphNode(content='n4', nodes_from=[second, third])
+    graph = GraphImpl(final)
+    _assert_children_index_is_actual(graph)
+
+    final.nodes_from.remove(third)
+    _assert_children_index_is_actual(graph)
+    third.nodes_from = []
+    _assert_children_index_is_actual(graph)
+    final.nodes_from[0] = third
+    _assert_children_index_is_actual(graph)
+    second.nodes_from.append(third)
+    final.nodes_from.extend([first, second])
+    _assert_children_index_is_actual(graph)
+    del final.nodes_from[:2]
+    _assert_children_index_is_actual(graph)
+    graph.nodes.remove(final)
+    _assert_children_index_is_actual(graph)
+    graph.nodes = [second, third, first]
+    _assert_children_index_is_actual(graph)
+
+
+@pytest.mark.parametrize('copy_graph', [deepcopy, lambda graph: pickle.loads(pickle.dumps(graph)),
+                                        lambda graph: graph.clone()])
+def test_children_index_of_graph_copy(copy_graph):
+    first = GraphNode(content='n1')
+    second = GraphNode(content='n2', nodes_from=[first])
+    final = GraphNode(content='n3', nodes_from=[first, second])
+    graph = GraphImpl(final)
+    graph_copy = copy_graph(graph)
+    _assert_children_index_is_actual(graph_copy)
+
+    copied_first = graph_copy.nodes[-1]
+    graph_copy.root_node.nodes_from.remove(copied_first)
+    _assert_children_index_is_actual(graph_copy)
+    # original graph isn't affected by the modification of the copy
+    assert set(graph.node_children(first)) == {second, final}
+
+
+def test_children_index_doesnt_depend_on_node_attributes():
+    first = GraphNode(content='n1')
+    second = GraphNode(content='n2', nodes_from=[first])
+    graph = GraphImpl(GraphNode(content='n3', nodes_from=[first, second]))
+    _assert_children_index_is_actual(graph)
+
+    # hash of the node depends on its uid
+    first.uid = 'changed uid'
+    _assert_children_index_is_actual(graph)
+    parents = second.nodes_from
+    assert second.nodes_from is parents
+
+
+def test_children_index_is_updated_incrementally():
+    first = GraphNode(content='n1')
+    second = GraphNode(content='n2', nodes_from=[first])
+    final = GraphNode(content='n3', nodes_from=[second])
+    graph = GraphImpl(final)
+    other_graph = GraphImpl(GraphNode(content='n4', nodes_from=[GraphNode(content='n5')]))
+    index = graph._children_index()
+    other_index = other_graph._children_index()
+
+    new_node = GraphNode(content='n6')
+    graph.add_node(new_node)
+    graph.connect_nodes(new_node, final)
+    graph.disconnect_nodes(first, second)
+    graph.update_node(second, GraphNode(content='n7', nodes_from=[first]))
+    final.nodes_from = [new_node]
+    other_graph.delete_node(other_graph.root_node)
+    _assert_children_index_is_actual(graph)
+    _assert_children_index_is_actual(other_graph)
+    # edits don't rebuild the indices of the graph and the other graphs
+    assert graph._children_index() is index
+    assert other_graph._children_index() is other_index
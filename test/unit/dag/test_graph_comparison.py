@@ -3,7 +3,8 @@ from copy import deepcopy
 
 import pytest
 
-from test.unit.utils import graph_second, graph_first, graph_third, graph_fourth
+from golem.core.dag.graph_utils import GraphDict
+from test.unit.utils import graph_second, graph_first, graph_third, graph_fourth, simple_cycled_graph
 
 
 @pytest.fixture()
@@ -39,3 +40,41 @@ def test_non_equality_cases(graph_fixture, request):
     for pair in list_graph_pairs:
         assert not pair[0] == pair[1]
         assert not pair[1] == pair[0]
+
+
+@pytest.mark.parametrize('graph_fixture', ['equality_cases'])
+def test_equal_graphs_have_equal_structural_hashes(graph_fixture, request):
+    list_graph_pairs = request.getfixturevalue(graph_fixture)
+    for first, second in list_graph_pairs + [[simple_cycled_graph(), simple_cycled_graph()]]:
+        assert first.structural_hash == second.structural_hash
+
+
+@pytest.mark.parametrize('graph_fixture', ['non_equality_cases'])
+def test_non_equal_graphs_have_different_structural_hashes(graph_fixture, request):
+    list_graph_pairs = request.getfixturevalue(graph_fixture)
+    for first, second in list_graph_pairs:
+        assert first.structural_hash != second.structural_hash
+
+
+def test_structural_hash_follows_graph_modifications():
+    graph = graph_first()
+    graph_hash = graph.structural_hash
+    graph.root_node.content['name'] = 'changed'
+    assert graph.structural_hash != graph_hash
+    graph.root_node.content['name'] = graph_first().root_node.name
+    assert graph.structural_hash == graph_hash
+    graph.disconnect_nodes(graph.root_node.nodes_from[0], graph.root_node)
+    assert graph.structural_hash != graph_hash
+
+
+def test_graph_dict_deduplicates_equal_graphs():
+    graphs = GraphDict()
+    graphs[graph_first()] = 1
+    graphs[graph_second()] = 2
+    graphs[graph_first()] = 3
+
+    assert len(graphs) == 2
+    assert graphs.values() == [3, 2]
+    assert graphs[graph_first()] == 3
+    assert graph_third() not in graphs
+    assert graphs.get(graph_third()) is None
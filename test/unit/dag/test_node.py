@@ -1,4 +1,10 @@
+import pytest
+
+from golem.core.dag.graph_node import descriptive_id_recursive
+from golem.core.dag.linked_graph import LinkedGraph
 from golem.core.dag.linked_graph_node import LinkedGraphNode
+from test.unit.utils import branched_cycled_graph, graph_fifth, graph_first, joined_branches_graph, \
+    simple_cycled_graph
 
 
 def test_node_description():
@@ -26,3 +32,32 @@ def test_node_description_with_params():
 
     # then
     assert actual_node_description == expected_node_description
+
+
+@pytest.mark.parametrize('graph', [graph_first(), graph_fifth(), simple_cycled_graph(), branched_cycled_graph(),
+                                   joined_branches_graph()])
+def test_node_descriptive_id_is_the_same_as_recursive(graph):
+    for node in graph.nodes:
+        assert node.descriptive_id == descriptive_id_recursive(node)
+        # cached id
+        assert node.descriptive_id == descriptive_id_recursive(node)
+
+
+@pytest.mark.parametrize('in_graph', [True, False])
+def test_node_descriptive_id_cache_is_invalidated(in_graph):
+    first = LinkedGraphNode('n1')
+    second = LinkedGraphNode('n2', nodes_from=[first])
+    final = LinkedGraphNode('n3', nodes_from=[second])
+    if in_graph:
+        LinkedGraph(final)
+    assert final.descriptive_id == '((/n_n1;)/n_n2;)/n_n3'
+
+    first.content['name'] = 'n4'
+    assert second.descriptive_id == '(/n_n4;)/n_n2'
+    assert final.descriptive_id == '((/n_n4;)/n_n2;)/n_n3'
+
+    second.nodes_from.remove(first)
+    assert final.descriptive_id == '(/n_n2;)/n_n3'
+
+    final.nodes_from = [first, second]
+    assert final.descriptive_id == '(/n_n2;;/n_n4;)/n_n3'
@@ -0,0 +1,56 @@
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from golem.core.dag.linked_graph_node import LinkedGraphNode
+from golem.core.dag.shared_graph_store import SharedGraphHandle, SharedGraphStore, load_graph
+from test.unit.utils import graph_first, graph_fifth, graph_with_multi_roots_first, simple_cycled_graph
+
+
+class ExtendedNode(LinkedGraphNode):
+    pass
+
+
+def _load_node_uids(handle: SharedGraphHandle):
+    return [node.uid for node in load_graph(handle).nodes]
+
+
+def test_shared_graph_store_restores_graphs():
+    graphs = [graph_first(), graph_fifth(), simple_cycled_graph(), graph_with_multi_roots_first()]
+    with SharedGraphStore(graphs) as store:
+        assert len(store.handles) == len(graphs)
+        for graph, handle in zip(graphs, store.handles):
+            # only the handle is sent to the other processes
+            assert len(pickle.dumps(handle)) < len(pickle.dumps(graph))
+            restored = load_graph(pickle.loads(pickle.dumps(handle)))
+            assert restored == graph
+            assert [node.uid for node in restored.nodes] == [node.uid for node in graph.nodes]
+
+
+def test_shared_graph_store_pickles_unsupported_graphs():
+    graph = graph_first()
+    graph.nodes[0].__class__ = ExtendedNode
+    with SharedGraphStore([graph_fifth(), graph]) as store:
+        assert [handle.is_compact for handle in store.handles] == [True, False]
+        restored = load_graph(store.handles[1])
+        assert restored == graph
+        assert isinstance(restored.nodes[0], ExtendedNode)
+
+
+def test_shared_graph_store_is_read_in_other_process():
+    graphs = [graph_first(), graph_fifth()]
+    with SharedGraphStore(graphs) as store, ProcessPoolExecutor(max_workers=1) as pool:
+        node_uids = list(pool.map(_load_node_uids, store.handles))
+    assert node_uids == [[node.uid for node in graph.nodes] for graph in graphs]
+
+
+def test_shared_graph_store_is_released():
+    store = SharedGraphStore([graph_first()])
+    handle = store.handles[0]
+    store.close()
+    with pytest.raises(FileNotFoundError):
+        load_graph(handle)
+    # not shared graphs are returned as is
+    graph = graph_first()
+    assert load_graph(graph) is graph
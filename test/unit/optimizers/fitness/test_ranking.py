@@ -0,0 +1,34 @@
+from itertools import permutations
+
+from golem.core.optimisers.fitness import MultiObjFitness, SingleObjFitness, null_fitness, sort_by_fitness
+
+
+def identity(fitness):
+    return fitness
+
+
+def test_sort_by_fitness_single_objective():
+    fitnesses = [SingleObjFitness(2.), null_fitness(), SingleObjFitness(3.), SingleObjFitness(1.)]
+    # metrics are minimised
+    assert sort_by_fitness(fitnesses, key=identity)[:3] == \
+           [SingleObjFitness(1.), SingleObjFitness(2.), SingleObjFitness(3.)]
+    assert not sort_by_fitness(fitnesses, key=identity)[-1].valid
+
+
+def test_sort_by_fitness_multi_objective_is_total_order():
+    first_front = [MultiObjFitness([4., 1.]), MultiObjFitness([3., 2.]), MultiObjFitness([2., 2.5]),
+                   MultiObjFitness([1., 4.])]
+    second_front = [MultiObjFitness([4., 3.]), MultiObjFitness([3., 4.])]
+    third_front = [MultiObjFitness([5., 5.])]
+    fitnesses = first_front + second_front + third_front + [MultiObjFitness()]
+
+    orders = {tuple(map(tuple, (fitness.values for fitness in sort_by_fitness(list(ordered), key=identity))))
+              for ordered in permutations(fitnesses)}
+    assert len(orders) == 1
+    sorted_fitnesses = sort_by_fitness(fitnesses, key=identity)
+    assert set(sorted_fitnesses[:4]) == set(first_front)
+    # boundary points of the front go first
+    assert set(sorted_fitnesses[:2]) == {first_front[0], first_front[-1]}
+    assert set(sorted_fitnesses[4:6]) == set(second_front)
+    assert sorted_fitnesses[6] == third_front[0]
+    assert not sorted_fitnesses[-1].valid
@@ -4,7 +4,8 @@ from golem.core.optimisers.genetic.operators.crossover import CrossoverTypesEnum
 from golem.core.optimisers.opt_history_objects.individual import Individual
 from golem.core.optimisers.optimization_parameters import GraphRequirements
 from golem.core.optimisers.optimizer import GraphGenerationParams
-from test.unit.utils import graph_first, graph_second, graph_sixth, graph_seventh, graph_eighth, graph_ninth, graph_with_single_node
+from test.unit.utils import graph_first, graph_second, graph_sixth, graph_seventh, graph_eighth, graph_ninth, graph_with_single_node, \
+    graph_state, with_nested_params, modify_nested_params
 import pytest
 
 
@@ -80,4 +81,26 @@ def test_crossover_with_single_node(crossover_type):
     crossover.parameters.crossover_types = [crossover_type]
     new_graphs = crossover([Individual(graph_example_first), Individual(graph_example_second)])
     assert new_graphs[0].graph == graph_example_first
-    assert new_graphs[1].graph == graph_example_second    
\ No newline at end of file
+    assert new_graphs[1].graph == graph_example_second    
+
+
+@pytest.mark.parametrize('crossover_type', CrossoverTypesEnum)
+def test_crossover_keeps_parent_graphs(crossover_type):
+    requirements = GraphRequirements()
+    graph_generation_params = GraphGenerationParams(available_node_types=['a', 'b', 'c', 'd'])
+    parameters = GPAlgorithmParameters(crossover_types=[crossover_type], crossover_prob=1)
+    crossover = Crossover(parameters, requirements, graph_generation_params)
+
+    parents = [Individual(with_nested_params(graph_first())), Individual(with_nested_params(graph_second()))]
+    parent_states = [graph_state(ind.graph) for ind in parents]
+    parent_descriptive_ids = [ind.graph.descriptive_id for ind in parents]
+    for _ in range(5):
+        new_individuals = crossover(parents)
+        assert [graph_state(ind.graph) for ind in parents] == parent_states
+        assert [ind.graph.descriptive_id for ind in parents] == parent_descriptive_ids
+        parent_nodes = {node for ind in parents for node in ind.graph.nodes}
+        for new_ind in new_individuals:
+            if new_ind not in parents:
+                assert not set(new_ind.graph.nodes) & parent_nodes
+                modify_nested_params(new_ind.graph)
+        assert [graph_state(ind.graph) for ind in parents] == parent_states
@@ -23,7 +23,8 @@ from golem.core.optimisers.opt_history_objects.individual import Individual
 from golem.core.optimisers.optimization_parameters import GraphRequirements
 from golem.core.optimisers.optimizer import GraphGenerationParams
 from test.unit.utils import simple_linear_graph, tree_graph, graph_with_single_node, graph_first, \
-    graph_fifth, simple_cycled_graph
+    graph_fifth, simple_cycled_graph, graph_state, \
+    with_nested_params, modify_nested_params
 
 available_node_types = ['a', 'b', 'c', 'd', 'e', 'f']
 
@@ -197,3 +198,23 @@ def test_mutation_with_max_prob():
     population = [ind, ind]
     new_population = mutation(population)
     assert new_population == []
+
+
+@pytest.mark.parametrize('mutation_type', MutationTypesEnum)
+@pytest.mark.parametrize('graph', [graph_first(), tree_graph(), simple_cycled_graph()])
+def test_mutation_keeps_parent_graph(mutation_type, graph):
+    adapter = DirectAdapter()
+    params = get_mutation_params([mutation_type], mutation_prob=1)
+    mutation = Mutation(**params)
+
+    ind = Individual(adapter.adapt(with_nested_params(deepcopy(graph))))
+    parent_state = graph_state(ind.graph)
+    parent_descriptive_id = ind.graph.descriptive_id
+    for _ in range(5):
+        new_ind = mutation(ind)
+        assert graph_state(ind.graph) == parent_state
+        assert ind.graph.descriptive_id == parent_descriptive_id
+        if new_ind and new_ind is not ind:
+            assert not set(new_ind.graph.nodes) & set(ind.graph.nodes)
+            modify_nested_params(new_ind.graph)
+            assert graph_state(ind.graph) == parent_state
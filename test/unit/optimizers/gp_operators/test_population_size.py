@@ -1,7 +1,8 @@
 from golem.core.optimisers.archive import GenerationKeeper
 from golem.core.optimisers.fitness import SingleObjFitness
 from golem.core.optimisers.genetic.parameters.population_size import AdaptivePopulationSize, \
-    ConstRatePopulationSize
+    ConstRatePopulationSize, EvaluationThroughput, WorkersAlignedPopulationSize, align_to_workers, \
+    workers_utilisation
 from golem.core.optimisers.graph import OptGraph, OptNode
 from golem.core.optimisers.objective import Objective
 from golem.core.optimisers.opt_history_objects.individual import Individual
@@ -71,3 +72,31 @@ def test_adaptive_max_pop_size():
         cur_pop_size = pop_size.next(population)
         print(cur_pop_size)
         assert cur_pop_size <= max_pop_size
+
+
+def test_align_to_workers():
+    assert align_to_workers(21, 32) == 32
+    assert align_to_workers(21, 32, max_size=55) == 32
+    assert align_to_workers(40, 32, max_size=55) == 32
+    # can't be aligned within max size
+    assert align_to_workers(21, 32, max_size=30) == 21
+    assert align_to_workers(21, 1) == 21
+    assert workers_utilisation(21, 32) < workers_utilisation(32, 32) == 1.
+
+
+def test_workers_aligned_pop_size():
+    pop_size = WorkersAlignedPopulationSize(ConstRatePopulationSize(pop_size=21, offspring_rate=0.2),
+                                            workers_num=8, max_pop_size=40)
+    assert pop_size.initial == 24
+    assert pop_size.utilisation_gain > 0
+
+    population = [Individual(OptGraph(OptNode('rf'))) for _ in range(24)]
+    assert pop_size.next(population) == 32
+
+    # measured throughput shows that only 4 evaluations are computed at once
+    pop_size.update_throughput(EvaluationThroughput(evaluations_num=24, computation_time=24., wall_time=6.))
+    assert pop_size.workers_num == 4
+    assert pop_size.next(population) == 32
+    # small evaluations can't load all workers, so they don't limit them
+    pop_size.update_throughput(EvaluationThroughput(evaluations_num=2, computation_time=2., wall_time=2.))
+    assert pop_size.workers_num == 4
@@ -39,9 +39,9 @@ class MockEvaluator(EvaluationOperator):
         return graph if is_valid else None
 
 
-def get_rand_population(pop_size: int = 10) -> PopulationT:
+def get_rand_population(pop_size: int = 10, kind: str = 'tree') -> PopulationT:
     graph_sizes = list(range(5, 15))
-    random_pop = [generate_labeled_graph('tree', size=random.choice(graph_sizes),
+    random_pop = [generate_labeled_graph(kind, size=random.choice(graph_sizes),
                                          directed=True)
                   for _ in range(pop_size)]
     graph_pop = BaseNetworkxAdapter().adapt(random_pop)
@@ -129,3 +129,35 @@ def test_pop_size_progression(reproducer: ReproductionController, success_rate:
 
         # update pop size
         parameters.pop_size = pop_size_progress.next(pop)
+
+
+def test_reproduction_aligns_batches_to_workers(reproducer: ReproductionController):
+    batch_sizes = []
+
+    def evaluator(population):
+        batch_sizes.append(len(population))
+        return population
+
+    reproducer.workers_num = 8
+    reproducer.parameters.pop_size = 20
+    # failed mutations would drop the offspring, so every produced offspring is a new individual
+    reproducer.mutation = lambda population: [Individual(ind.graph) for ind in population]
+    # line graphs don't depend on the random tree generator of the networkx version
+    pop = get_rand_population(30, kind='line')
+    new_pop = reproducer.reproduce(pop, evaluator)
+
+    assert len(new_pop) == 20
+    assert all(size % 8 == 0 for size in batch_sizes)
+
+
+def test_offspring_size_is_compensated_and_aligned(reproducer: ReproductionController):
+    reproducer.workers_num = 8
+    assert reproducer.offspring_size(10, population_size=30) == 16
+
+    for _ in range(10):
+        reproducer.update_success_rate(valid_num=10, offspring_num=20)
+    assert np.isclose(reproducer.mean_success_rate, 0.5)
+    assert reproducer.offspring_size(10, population_size=30) == 24
+    # small samples don't change the success rate
+    reproducer.update_success_rate(valid_num=1, offspring_num=20)
+    assert np.isclose(reproducer.mean_success_rate, 0.5)
@@ -0,0 +1,122 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+import pytest
+
+from golem.core.adapter import DirectAdapter
+from golem.core.optimisers.fitness import SingleObjFitness
+from golem.core.optimisers.genetic.async_evaluation import AsyncDispatcher
+from golem.core.optimisers.genetic.evaluation import ChunkedDelegateEvaluator, DelegateEvaluator, \
+    MultiprocessingDispatcher, ThreadPoolDispatcher
+from golem.core.optimisers.objective import BatchObjective
+from golem.core.optimisers.opt_history_objects.individual import Individual
+from test.unit.utils import graph_first, graph_fourth, graph_second, graph_third
+
+
+def drop_root(graph):
+    graph = deepcopy(graph)
+    graph.delete_node(graph.root_nodes()[0])
+    return graph
+
+
+def length_objective(graph):
+    return SingleObjFitness(graph.length)
+
+
+class RootDroppingEvaluator(DelegateEvaluator):
+    @property
+    def is_enabled(self) -> bool:
+        return True
+
+    def compute_graphs(self, graphs):
+        return [drop_root(graph) for graph in graphs]
+
+
+class SlowChunkedEvaluator(ChunkedDelegateEvaluator):
+    def __init__(self, chunk_delay: float = 0.3, **kwargs):
+        super().__init__(**kwargs)
+        self.chunk_delay = chunk_delay
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.pending_chunks = 0
+        self.max_pending_chunks_seen = 0
+        self.chunks_finished_at = []
+        self._lock = threading.Lock()
+
+    @property
+    def is_enabled(self) -> bool:
+        return True
+
+    def submit_chunk(self, graphs):
+        with self._lock:
+            self.pending_chunks += 1
+            self.max_pending_chunks_seen = max(self.max_pending_chunks_seen, self.pending_chunks)
+        return self.executor.submit(self._compute_chunk, graphs)
+
+    def _compute_chunk(self, graphs):
+        time.sleep(self.chunk_delay)
+        with self._lock:
+            self.pending_chunks -= 1
+            self.chunks_finished_at.append(time.monotonic())
+        return [drop_root(graph) for graph in graphs]
+
+
+def get_population():
+    adapter = DirectAdapter()
+    graphs = [graph_first(), graph_second(), graph_third(), graph_fourth()]
+    return [Individual(adapter.adapt(graph)) for graph in graphs]
+
+
+@pytest.mark.parametrize('dispatcher_type', [ThreadPoolDispatcher, MultiprocessingDispatcher, AsyncDispatcher])
+def test_dispatcher_evaluates_graphs_computed_by_delegate(dispatcher_type):
+    population = get_population()
+    original_lengths = {ind.uid: ind.graph.length for ind in population}
+    dispatcher = dispatcher_type(DirectAdapter(), n_jobs=2, delegate_evaluator=RootDroppingEvaluator())
+    evaluated_population = dispatcher.dispatch(length_objective)(population)
+    dispatcher.shutdown()
+
+    assert len(evaluated_population) == len(population)
+    for ind in evaluated_population:
+        assert ind.fitness.value == original_lengths[ind.uid] - 1
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_batch_objective_evaluates_graphs_computed_by_delegate(n_jobs):
+    population = get_population()
+    original_lengths = {ind.uid: ind.graph.length for ind in population}
+    objective = BatchObjective({'length': lambda graphs: [graph.length for graph in graphs]})
+    dispatcher = ThreadPoolDispatcher(DirectAdapter(), n_jobs=n_jobs, delegate_evaluator=RootDroppingEvaluator())
+    evaluated_population = dispatcher.dispatch(objective)(population)
+    dispatcher.shutdown()
+
+    assert len(evaluated_population) == len(population)
+    for ind in evaluated_population:
+        assert ind.fitness.value == original_lengths[ind.uid] - 1
+
+
+def test_chunked_delegate_evaluator_streams_chunks_with_backpressure():
+    population = get_population()
+    delegate_evaluator = SlowChunkedEvaluator(chunk_size=1, max_pending_chunks=2)
+    evaluated_at = []
+
+    def objective(graph):
+        evaluated_at.append(time.monotonic())
+        return length_objective(graph)
+
+    dispatcher = ThreadPoolDispatcher(DirectAdapter(), n_jobs=1, delegate_evaluator=delegate_evaluator)
+    evaluated_population = dispatcher.dispatch(objective)(population)
+
+    assert len(evaluated_population) == len(population)
+    assert all(ind.fitness.valid for ind in evaluated_population)
+    assert delegate_evaluator.max_pending_chunks_seen == 2
+    # evaluation of the first computed graphs starts before the last chunk is computed
+    assert min(evaluated_at) < max(delegate_evaluator.chunks_finished_at)
+
+
+def test_chunked_delegate_evaluator_keeps_order():
+    graphs = [graph_first(), graph_second(), graph_third(), graph_fourth()]
+    delegate_evaluator = SlowChunkedEvaluator(chunk_delay=0., chunk_size=3, max_pending_chunks=1)
+    computed_graphs = delegate_evaluator.compute_graphs(graphs)
+    assert [graph.length for graph in computed_graphs] == [graph.length - 1 for graph in graphs]
+    assert delegate_evaluator.max_pending_chunks_seen == 1
@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+import time
+from copy import deepcopy
+
+from golem.core.adapter import DirectAdapter
+from golem.core.optimisers.fitness import Fitness, SingleObjFitness
+from golem.core.optimisers.genetic.distributed_evaluation import DistributedDispatcher, run_evaluation_worker
+from golem.core.optimisers.genetic.evaluation import DelegateEvaluator
+from golem.core.optimisers.opt_history_objects.individual import Individual
+from test.unit.utils import graph_first, graph_second, graph_third, graph_fourth
+
+CRASH_ENV_VARIABLE = 'GOLEM_TEST_CRASH_WORKER'
+
+
+def get_population():
+    adapter = DirectAdapter()
+    return [Individual(adapter.adapt(graph)) for graph in (graph_first(), graph_second(), graph_third(),
+                                                           graph_fourth())]
+
+
+def length_objective(graph) -> Fitness:
+    if os.environ.get(CRASH_ENV_VARIABLE):
+        os._exit(1)
+    time.sleep(0.1)
+    return SingleObjFitness(-graph.length)
+
+
+def pid_objective(graph) -> Fitness:
+    time.sleep(0.1)
+    return SingleObjFitness(os.getpid())
+
+
+def run_crashing_worker(address, authkey):
+    os.environ[CRASH_ENV_VARIABLE] = '1'
+    run_evaluation_worker(address, authkey)
+
+
+class RootDroppingEvaluator(DelegateEvaluator):
+    @property
+    def is_enabled(self) -> bool:
+        return True
+
+    def compute_graphs(self, graphs):
+        computed_graphs = []
+        for graph in graphs:
+            graph = deepcopy(graph)
+            graph.delete_node(graph.root_nodes()[0])
+            computed_graphs.append(graph)
+        return computed_graphs
+
+
+def start_workers(dispatcher: DistributedDispatcher, num: int, target=run_evaluation_worker):
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=target, args=(dispatcher.address, dispatcher.authkey), daemon=True)
+               for _ in range(num)]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def wait_for_workers(dispatcher: DistributedDispatcher, num: int, timeout: float = 60.):
+    start_time = time.time()
+    while len(dispatcher.workers) < num and time.time() - start_time < timeout:
+        time.sleep(0.1)
+
+
+def test_distributed_dispatcher_evaluates_on_workers():
+    dispatcher = DistributedDispatcher(DirectAdapter(), n_jobs=2)
+    evaluator = dispatcher.dispatch(pid_objective)
+    workers = start_workers(dispatcher, 2)
+    try:
+        population = get_population()
+        evaluated_population = evaluator(population)
+
+        assert len(evaluated_population) == len(population)
+        worker_pids = {worker.pid for worker in workers}
+        assert {ind.fitness.value for ind in evaluated_population} <= worker_pids
+        assert len(dispatcher.workers) == 2
+    finally:
+        dispatcher.shutdown()
+    for worker in workers:
+        worker.join(timeout=10)
+        assert not worker.is_alive(), 'Workers must stop with the coordinator'
+
+
+def test_distributed_dispatcher_requeues_tasks_of_lost_worker():
+    dispatcher = DistributedDispatcher(DirectAdapter())
+    evaluator = dispatcher.dispatch(length_objective)
+    workers = start_workers(dispatcher, 1, target=run_crashing_worker)
+    try:
+        # crashing worker is the first one that is ready to get the task
+        wait_for_workers(dispatcher, 1)
+        workers += start_workers(dispatcher, 1)
+        population = get_population()
+        evaluated_population = evaluator(population)
+
+        assert len(evaluated_population) == len(population)
+        assert all(ind.fitness.valid for ind in evaluated_population)
+        assert dispatcher._coordinator.lost_workers_num == 1
+    finally:
+        dispatcher.shutdown()
+
+
+def test_distributed_dispatcher_without_workers():
+    dispatcher = DistributedDispatcher(DirectAdapter(), no_workers_timeout=0.5,
+                                       delegate_evaluator=RootDroppingEvaluator())
+    evaluator = dispatcher.dispatch(length_objective)
+    try:
+        population = get_population()
+        lengths = {ind.uid: ind.graph.length for ind in population}
+        evaluated_population = evaluator(population)
+        assert len(evaluated_population) == len(population)
+        # graphs computed by the delegate evaluator are evaluated
+        assert all(ind.fitness.value == -(lengths[ind.uid] - 1) for ind in evaluated_population)
+    finally:
+        dispatcher.shutdown()
+
+
+def test_distributed_dispatcher_generates_printable_authkey():
+    dispatcher = DistributedDispatcher(DirectAdapter())
+    # generated key can be passed to the workers started from the command line
+    assert dispatcher.authkey.decode().isalnum()
+    assert DistributedDispatcher(DirectAdapter(), authkey=b'key').authkey == b'key'
@@ -1,5 +1,13 @@
+import asyncio
 import datetime
+import os
+import signal
+import threading
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
 from functools import partial
+from pathlib import Path
 
 import pytest
 from joblib import cpu_count
@@ -7,11 +15,15 @@ from joblib import cpu_count
 from golem.core.adapter import DirectAdapter
 from golem.core.dag.graph import Graph
 from golem.core.optimisers.fitness import Fitness, null_fitness
+from golem.core.optimisers.genetic.async_evaluation import AsyncDispatcher
 from golem.core.optimisers.genetic.evaluation import MultiprocessingDispatcher, SequentialDispatcher, \
-    ObjectiveEvaluationDispatcher
+    ObjectiveEvaluationDispatcher, ThreadPoolDispatcher
+from golem.core.optimisers.genetic import evaluation
+from golem.core.optimisers.genetic.evaluation_memory import MemoryThrottle
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache, structural_key
 from golem.core.optimisers.meta.surrogate_evaluator import SurrogateDispatcher
-from golem.core.optimisers.objective import Objective
-from golem.core.optimisers.opt_history_objects.individual import Individual
+from golem.core.optimisers.objective import BatchObjective, MultiFidelityObjective, Objective
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
 from golem.core.optimisers.timer import OptimisationTimer
 from golem.utilities.utilities import determine_n_jobs
 from test.unit.utils import graph_first, graph_second, graph_third, graph_fourth, RandomMetric
@@ -33,11 +45,39 @@ def invalid_objective(graph: Graph) -> Fitness:
     return null_fitness()
 
 
+class BatchLengthMetric:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, graphs):
+        self.batch_sizes.append(len(graphs))
+        return [-graph.length for graph in graphs]
+
+
+class FidelityLengthMetric:
+    def __init__(self):
+        self.fidelities = []
+
+    def __call__(self, graph, fidelity):
+        self.fidelities.append(fidelity)
+        return graph.length
+
+
+def hanging_objective(graph: Graph, hang_seconds: float = 30.) -> Fitness:
+    """Objective that hangs on the largest test graph."""
+    if graph.length >= graph_second().length:
+        start_time = timeit.default_timer()
+        while timeit.default_timer() - start_time < hang_seconds:
+            pass
+    return get_objective(graph)
+
+
 @pytest.mark.parametrize(
     'dispatcher',
     [SequentialDispatcher(DirectAdapter()),
      MultiprocessingDispatcher(DirectAdapter()),
-     MultiprocessingDispatcher(DirectAdapter(), n_jobs=-1)]
+     MultiprocessingDispatcher(DirectAdapter(), n_jobs=-1),
+     ThreadPoolDispatcher(DirectAdapter(), n_jobs=-1)]
 )
 def test_dispatchers_with_and_without_multiprocessing(dispatcher):
     _, population = set_up_tests()
@@ -56,7 +96,8 @@ def test_dispatchers_with_and_without_multiprocessing(dispatcher):
 @pytest.mark.parametrize(
     'dispatcher',
     [MultiprocessingDispatcher(DirectAdapter()),
-     SequentialDispatcher(DirectAdapter())]
+     SequentialDispatcher(DirectAdapter()),
+     ThreadPoolDispatcher(DirectAdapter(), n_jobs=-1)]
 )
 def test_dispatchers_with_faulty_objectives(objective, dispatcher):
     adapter, population = set_up_tests()
@@ -69,6 +110,7 @@ def test_dispatchers_with_faulty_objectives(objective, dispatcher):
     MultiprocessingDispatcher(DirectAdapter()),
     SequentialDispatcher(DirectAdapter()),
     SurrogateDispatcher(DirectAdapter()),
+    ThreadPoolDispatcher(DirectAdapter()),
 ])
 def test_dispatcher_with_timeout(dispatcher: ObjectiveEvaluationDispatcher):
     adapter, population = set_up_tests()
@@ -102,3 +144,409 @@ def test_n_jobs_for_dispatcher():
     for n_jobs in (0, -cpu_count() - 1, -cpu_count() - 2):
         with pytest.raises(ValueError):
             _ = determine_n_jobs(n_jobs)
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of workers is used only with several CPUs')
+def test_multiprocessing_dispatcher_reuses_pool():
+    _, population = set_up_tests()
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2)
+
+    evaluator = dispatcher.dispatch(get_objective)
+    first_population = evaluator(population)
+    pool = dispatcher._pool
+    assert pool is not None, "Pool must be started on the first evaluation"
+
+    _, next_population = set_up_tests()
+    second_population = evaluator(next_population)
+    assert dispatcher._pool is pool, "Pool must be kept between generations"
+    assert len(first_population) == len(second_population) == len(population)
+
+    dispatcher.shutdown()
+    assert dispatcher._pool is None
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of workers is used only with several CPUs')
+def test_multiprocessing_dispatcher_with_shared_memory_population():
+    _, population = set_up_tests()
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2, shared_memory_population=True)
+    evaluator = dispatcher.dispatch(get_objective)
+
+    evaluated_population = evaluator(population)
+    assert len(evaluated_population) == len(population)
+    assert all(ind.fitness.valid for ind in evaluated_population)
+    assert not dispatcher._graph_transport.is_sharing, 'Shared memory must be released after the evaluation'
+    dispatcher.shutdown()
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of workers is used only with several CPUs')
+def test_multiprocessing_dispatcher_with_memory_budget():
+    _, population = set_up_tests()
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2, memory_budget=1024 ** 2)
+    evaluator = dispatcher.dispatch(get_objective)
+
+    evaluated_population = evaluator(population)
+    assert len(evaluated_population) == len(population)
+    assert all(ind.metadata['peak_memory_in_mib'] > 0 for ind in evaluated_population)
+    assert dispatcher.memory_model.predict(population[0].graph) is not None
+    dispatcher.shutdown()
+
+
+def test_memory_throttle_keeps_running_evaluations_within_budget():
+    memory_budget = 100.
+    running_memory = []
+    peaks = {'memory': 0., 'tasks': 0}
+    lock = threading.Lock()
+
+    def evaluate(memory):
+        with lock:
+            running_memory.append(memory)
+            peaks['memory'] = max(peaks['memory'], sum(running_memory))
+            peaks['tasks'] = max(peaks['tasks'], len(running_memory))
+        time.sleep(0.05)
+        with lock:
+            running_memory.remove(memory)
+        return memory
+
+    throttle = MemoryThrottle(memory_budget, slots_num=4)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        tasks_memory = [60., 60., 60., 10., 10., 10., 10., 10., 10.]
+        futures = [throttle.submit(partial(pool.submit, evaluate, memory), memory) for memory in tasks_memory]
+        assert [future.result(timeout=10) for future in futures] == tasks_memory
+    throttle.close()
+
+    assert peaks['memory'] <= memory_budget
+    # small graphs are evaluated on all slots
+    assert peaks['tasks'] == 4
+    assert throttle.throttled_tasks_num > 0
+
+
+def test_memory_throttle_drops_cancelled_tasks():
+    release = threading.Event()
+    throttle = MemoryThrottle(memory_budget=100., slots_num=1)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        running = throttle.submit(partial(pool.submit, release.wait), 10.)
+        queued = [throttle.submit(partial(pool.submit, lambda: None), 10.) for _ in range(10)]
+        for future in queued:
+            assert future.cancel()
+        assert not throttle._queue, 'Cancelled tasks must not be kept in the queue'
+        release.set()
+        assert running.result(timeout=10)
+    throttle.close()
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of threads is used only with several CPUs')
+def test_thread_pool_dispatcher_reuses_pool():
+    _, population = set_up_tests()
+    dispatcher = ThreadPoolDispatcher(DirectAdapter(), n_jobs=2)
+
+    evaluator = dispatcher.dispatch(get_objective)
+    first_population = evaluator(population)
+    pool = dispatcher._pool
+    assert pool is not None, "Pool must be started on the first evaluation"
+
+    _, next_population = set_up_tests()
+    second_population = evaluator(next_population)
+    assert dispatcher._pool is pool, "Pool must be kept between generations"
+    assert len(first_population) == len(second_population) == len(population)
+
+    dispatcher.shutdown()
+    assert dispatcher._pool is None
+
+
+@pytest.mark.parametrize('dispatcher', [
+    MultiprocessingDispatcher(DirectAdapter(), max_graph_fit_time=datetime.timedelta(seconds=1)),
+    SequentialDispatcher(DirectAdapter(), max_graph_fit_time=datetime.timedelta(seconds=1)),
+])
+def test_dispatcher_with_graph_fit_timeout(dispatcher):
+    _, population = set_up_tests()
+    evaluator = dispatcher.dispatch(hanging_objective)
+
+    start_time = timeit.default_timer()
+    evaluated_population = evaluator(population)
+    assert timeit.default_timer() - start_time < 10, "Hanging evaluation must be interrupted"
+    assert len(evaluated_population) == len(population) - 1
+    assert all(ind.fitness.valid for ind in evaluated_population)
+    timed_out_individual = next(ind for ind in population if ind not in evaluated_population)
+    assert not timed_out_individual.fitness.valid
+    assert timed_out_individual.metadata['evaluation_timeout']
+    assert dispatcher.timeouts_num == 1
+
+
+@pytest.mark.parametrize('dispatcher_type', [MultiprocessingDispatcher, SequentialDispatcher, ThreadPoolDispatcher])
+def test_dispatcher_with_batch_objective(dispatcher_type):
+    _, population = set_up_tests()
+    metric = BatchLengthMetric()
+    dispatcher = dispatcher_type(DirectAdapter(), objective_batch_size=3)
+
+    evaluator = dispatcher.dispatch(BatchObjective({'length': metric}))
+    evaluated_population = evaluator(population)
+    assert len(evaluated_population) == len(population)
+    assert all(ind.fitness.valid for ind in evaluated_population)
+    assert all(ind.fitness.value == -ind.graph.length for ind in evaluated_population)
+    if metric.batch_sizes:
+        # metric is called in the worker processes in case of multiprocessing
+        assert sorted(metric.batch_sizes) == [1, 3]
+    if dispatcher_type is not MultiprocessingDispatcher:
+        assert metric.batch_sizes
+
+
+def test_batch_objective_single_graph_and_errors():
+    objective = BatchObjective({'length': lambda graphs: [graph.length for graph in graphs]})
+    assert objective(graph_first()).value == graph_first().length
+
+    faulty_objective = BatchObjective({'length': lambda graphs: [1.]})
+    fitnesses = faulty_objective.evaluate_batch([graph_first(), graph_second()])
+    assert len(fitnesses) == 2
+    assert not any(fitness.valid for fitness in fitnesses)
+
+
+@pytest.mark.parametrize('dispatcher_type', [MultiprocessingDispatcher, SequentialDispatcher])
+def test_dispatcher_without_returning_graphs(dispatcher_type):
+    _, population = set_up_tests()
+    graphs = [ind.graph for ind in population]
+    dispatcher = dispatcher_type(DirectAdapter(), return_evaluated_graphs=False)
+
+    evaluator = dispatcher.dispatch(get_objective)
+    evaluated_population = evaluator(population)
+    assert len(evaluated_population) == len(population)
+    assert all(ind.fitness.valid for ind in evaluated_population)
+    assert all(ind.graph is graph for ind, graph in zip(population, graphs))
+
+
+@pytest.mark.parametrize('dispatcher_type', [SequentialDispatcher, ThreadPoolDispatcher, AsyncDispatcher])
+def test_dispatcher_with_multi_fidelity_objective(dispatcher_type):
+    _, population = set_up_tests()
+    metric = FidelityLengthMetric()
+    objective = MultiFidelityObjective({'length': metric}, fidelities=(1., 0.25, 0.5), promotion_fraction=0.5)
+    dispatcher = dispatcher_type(DirectAdapter(), n_jobs=2)
+
+    evaluator = dispatcher.dispatch(objective)
+    evaluated_population = evaluator(population)
+    dispatcher.shutdown()
+    assert len(evaluated_population) == len(population)
+    # graphs are evaluated with successive halving
+    assert sorted(metric.fidelities) == [0.25] * 4 + [0.5] * 2 + [1.]
+    fidelities = [ind.metadata['evaluation_fidelity'] for ind in evaluated_population]
+    assert sorted(fidelities) == [0.25, 0.25, 0.5, 1.]
+    best_individual = max(evaluated_population, key=lambda ind: ind.fitness)
+    assert best_individual.metadata['evaluation_fidelity'] == objective.max_fidelity
+
+
+def test_multi_fidelity_promotion_with_multi_objective_fitness():
+    adapter = DirectAdapter()
+    graphs = [graph_first(), graph_second(), graph_third(), graph_fourth()]
+    # the smallest graphs are the best by the first objective, the largest ones by the second objective
+    objective = MultiFidelityObjective({'length': lambda graph, fidelity: graph.length,
+                                        'inverted_length': lambda graph, fidelity: -graph.length},
+                                       fidelities=(0.5, 1.), promotion_fraction=0.5, is_multi_objective=True)
+    promoted_graphs = set()
+    for ordered_graphs in (graphs, list(reversed(graphs))):
+        population = [Individual(adapter.adapt(graph)) for graph in ordered_graphs]
+        evaluated_population = SequentialDispatcher(adapter).dispatch(objective)(population)
+        promoted_graphs.add(frozenset(ind.graph.descriptive_id for ind in evaluated_population
+                                      if ind.metadata['evaluation_fidelity'] == objective.max_fidelity))
+    # all graphs are on the same Pareto front, so the boundary ones are promoted regardless of the order
+    assert len(promoted_graphs) == 1
+    lengths = sorted(graph.length for graph in graphs)
+    promoted_lengths = sorted(graph.length for graph in graphs
+                              if graph.descriptive_id in next(iter(promoted_graphs)))
+    assert promoted_lengths == [lengths[0], lengths[-1]]
+
+
+def test_multi_fidelity_objective_with_fitness_cache():
+    _, population = set_up_tests()
+    metric = FidelityLengthMetric()
+    objective = MultiFidelityObjective({'length': metric}, fidelities=(0.5, 1.))
+    dispatcher = SequentialDispatcher(DirectAdapter(), fitness_cache=FitnessCache())
+    evaluator = dispatcher.dispatch(objective)
+    evaluator(population)
+
+    # only the results of the full fidelity are cached
+    assert len(dispatcher.fitness_cache) == 2
+    assert objective(graph_first()).value == graph_first().length
+    assert metric.fidelities[-1] == objective.max_fidelity
+
+
+def straggling_objective(graph: Graph, markers_dir: Path, straggle_seconds: float = 10.) -> Fitness:
+    """Objective that is slow on the first evaluation of the largest test graph only."""
+    marker = markers_dir / str(graph.length)
+    if graph.length >= graph_second().length and not marker.exists():
+        marker.touch()
+        time.sleep(straggle_seconds)
+    return get_objective(graph)
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of workers is used only with several CPUs')
+def test_multiprocessing_dispatcher_with_speculative_evaluation(tmp_path):
+    _, population = set_up_tests()
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2, speculative_evaluation=True)
+
+    evaluator = dispatcher.dispatch(partial(straggling_objective, markers_dir=tmp_path))
+    start_time = timeit.default_timer()
+    evaluated_population = evaluator(population)
+    dispatcher.shutdown(kill_workers=True)
+
+    assert timeit.default_timer() - start_time < 10
+    assert len(evaluated_population) == len(population)
+    assert dispatcher.speculative_evaluations_num == 1
+    assert sum(bool(ind.metadata.get('speculative_evaluation')) for ind in evaluated_population) == 1
+
+
+def test_slow_evaluation_is_duplicated_on_idle_worker():
+    _, population = set_up_tests()
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2, speculative_evaluation=True)
+
+    def evaluate(individual: Individual, seconds: float) -> GraphEvalResult:
+        time.sleep(seconds)
+        return GraphEvalResult(uid_of_individual=individual.uid, fitness=null_fitness(), graph=individual.graph,
+                               metadata={'computation_time_in_seconds': seconds})
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        slow_individual = population[0]
+        tasks = {pool.submit(evaluate, ind, 3. if ind is slow_individual else 0.1): [ind] for ind in population}
+        start_time = timeit.default_timer()
+        finished_futures = dispatcher._wait_for_workers(tasks, n_jobs=2,
+                                                        resubmit=lambda batch: pool.submit(evaluate, batch[0], 0.1))
+        assert timeit.default_timer() - start_time < 3
+
+    slow_future = next(future for future, batch in tasks.items() if batch[0] is slow_individual)
+    assert finished_futures[slow_future] is not slow_future
+    assert all(finished_futures[future] is future for future in tasks if future is not slow_future)
+    assert dispatcher.speculative_evaluations_num == 1
+
+
+def crashing_objective(graph: Graph) -> Fitness:
+    """Objective that crashes the process on the largest test graph."""
+    if graph.length >= graph_second().length:
+        os.kill(os.getpid(), signal.SIGSEGV)
+    return get_objective(graph)
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of workers is used only with several CPUs')
+def test_multiprocessing_dispatcher_with_crashing_objective():
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2, evaluation_retries=1)
+    evaluator = dispatcher.dispatch(crashing_objective)
+
+    _, population = set_up_tests()
+    evaluated_population = evaluator(population)
+    assert len(evaluated_population) == len(population) - 1
+    crashed_individual = next(ind for ind in population if ind not in evaluated_population)
+    assert crashed_individual.metadata['evaluation_crashed']
+
+    # the graph that crashes the worker is not evaluated again
+    _, next_population = set_up_tests()
+    evaluated_population = evaluator(next_population)
+    dispatcher.shutdown()
+    assert len(evaluated_population) == len(population) - 1
+    assert sum(bool(ind.metadata.get('evaluation_quarantined')) for ind in next_population) == 1
+    assert dispatcher.crashes_num == 1
+
+
+def test_quarantined_graphs_are_not_evaluated():
+    _, population = set_up_tests()
+    dispatcher = MultiprocessingDispatcher(DirectAdapter())
+    dispatcher._crash_isolation.quarantine.add(structural_key(population[0].graph))
+
+    evaluated_population = dispatcher.dispatch(get_objective)(population)
+    assert len(evaluated_population) == len(population) - 1
+    assert population[0] not in evaluated_population
+    assert population[0].metadata['evaluation_quarantined']
+
+
+@pytest.mark.parametrize('collect_garbage', [True, False])
+def test_dispatcher_garbage_collection_policy(collect_garbage, monkeypatch):
+    collections = []
+    monkeypatch.setattr(evaluation.gc, 'collect', lambda: collections.append(1))
+    _, population = set_up_tests()
+    dispatcher = SequentialDispatcher(DirectAdapter(), collect_garbage=collect_garbage)
+
+    dispatcher.dispatch(get_objective)(population)
+    assert len(collections) == (len(population) if collect_garbage else 0)
+
+
+def test_workers_are_recycled_after_max_tasks():
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2, max_tasks_per_worker=2)
+    dispatcher._pool_size = 2
+    dispatcher._pool_tasks_num = 3
+    assert not dispatcher._are_workers_worn_out()
+    dispatcher._pool_tasks_num = 4
+    assert dispatcher._are_workers_worn_out()
+
+
+class AsyncSimulatorObjective:
+    """Objective that waits for the response of the external simulator."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, graph: Graph) -> Fitness:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delay)
+        self.running -= 1
+        return get_objective(graph)
+
+
+@pytest.mark.parametrize('n_jobs', [2, -1])
+def test_async_dispatcher_runs_evaluations_concurrently(n_jobs):
+    adapter = DirectAdapter()
+    population = [Individual(adapter.adapt(graph_first())) for _ in range(20)]
+    objective = AsyncSimulatorObjective()
+    dispatcher = AsyncDispatcher(adapter, n_jobs=n_jobs)
+
+    evaluator = dispatcher.dispatch(objective)
+    start_time = timeit.default_timer()
+    evaluated_population = evaluator(population)
+    dispatcher.shutdown()
+
+    assert len(evaluated_population) == len(population)
+    assert all(ind.fitness.valid for ind in evaluated_population)
+    if n_jobs == -1:
+        assert objective.max_running == len(population)
+        assert timeit.default_timer() - start_time < objective.delay * len(population) / 2
+    else:
+        assert objective.max_running == n_jobs
+
+
+@pytest.mark.parametrize('unsupported_params', [{'objective_batch_size': 2}, {'collect_garbage': True}])
+def test_async_dispatcher_rejects_unsupported_params(unsupported_params):
+    with pytest.raises(ValueError):
+        AsyncDispatcher(DirectAdapter(), **unsupported_params)
+
+
+def test_async_dispatcher_with_timeout():
+    _, population = set_up_tests()
+    dispatcher = AsyncDispatcher(DirectAdapter(), n_jobs=1, max_graph_fit_time=datetime.timedelta(seconds=0.5))
+
+    with OptimisationTimer(timeout=datetime.timedelta(seconds=0.3)) as t:
+        evaluator = dispatcher.dispatch(AsyncSimulatorObjective(delay=0.2), timer=t)
+        evaluated_population = evaluator(population)
+    assert 1 <= len(evaluated_population) < len(population), "Not all graphs should be evaluated (not enough time)"
+
+    individual = Individual(DirectAdapter().adapt(graph_first()))
+    evaluator = dispatcher.dispatch(AsyncSimulatorObjective(delay=5))
+    evaluated_population = evaluator([individual])
+    dispatcher.shutdown()
+    assert not evaluated_population
+    assert individual.metadata['evaluation_timeout']
+
+
+async def async_metric(graph: Graph) -> float:
+    await asyncio.sleep(0)
+    return graph.length
+
+
+def test_objective_rejects_async_metrics():
+    with pytest.raises(ValueError, match='async'):
+        Objective(quality_metrics={'m': async_metric})
+    with pytest.raises(ValueError, match='async'):
+        Objective(quality_metrics={'m': AsyncSimulatorObjective()})
+
+    # awaitable results of the metrics that aren't declared as async aren't used as metric values
+    objective = Objective(quality_metrics={'m': lambda graph: async_metric(graph)})
+    dispatcher = AsyncDispatcher(DirectAdapter())
+    evaluated_population = dispatcher.dispatch(objective)([Individual(DirectAdapter().adapt(graph_first()))])
+    dispatcher.shutdown()
+    assert not evaluated_population
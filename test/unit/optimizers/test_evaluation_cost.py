@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from golem.core.adapter import DirectAdapter
+from golem.core.optimisers.fitness import Fitness, SingleObjFitness
+from golem.core.optimisers.genetic.evaluation import SequentialDispatcher
+from golem.core.optimisers.genetic.evaluation_cost import EvaluationCostModel, graph_cost_features
+from golem.core.optimisers.opt_history_objects.individual import Individual
+from test.unit.utils import graph_first, graph_second, graph_third, graph_fourth
+
+
+class SleepingObjective:
+    """Objective which computation time is proportional to the graph size."""
+
+    def __init__(self, seconds_per_node: float = 0.01):
+        self.seconds_per_node = seconds_per_node
+        self.evaluated_lengths = []
+
+    def __call__(self, graph) -> Fitness:
+        self.evaluated_lengths.append(graph.length)
+        time.sleep(self.seconds_per_node * graph.length)
+        return SingleObjFitness(graph.length)
+
+
+def test_cost_model_predicts_computation_time():
+    graphs = [graph_first(), graph_second(), graph_third(), graph_fourth()]
+    model = EvaluationCostModel()
+    assert model.predict(graphs[0]) is None
+
+    for graph in graphs:
+        model.update(graph, 0.1 * graph.length)
+    for graph in graphs:
+        assert model.predict(graph) == pytest.approx(0.1 * graph.length, abs=1e-2)
+
+    model.update(graphs[0], 1., predicted_time=0.5)
+    assert model.mean_absolute_error == pytest.approx(0.5)
+
+
+def test_graph_cost_features():
+    graph = graph_first()
+    features = graph_cost_features(graph, fidelity=0.5)
+    assert features['length'] == graph.length
+    assert features['depth'] == graph.depth
+    assert features['fidelity'] == 0.5
+    assert sum(num for name, num in features.items() if name.startswith('operation_')) == graph.length
+
+
+def test_dispatcher_schedules_longest_jobs_first():
+    adapter = DirectAdapter()
+    graphs = [graph_third(), graph_first(), graph_fourth(), graph_second()]
+    objective = SleepingObjective()
+    dispatcher = SequentialDispatcher(adapter, n_jobs=2)
+    evaluator = dispatcher.dispatch(objective)
+
+    # model is fitted on the exact times to not depend on the timings of the test machine
+    for graph in graphs:
+        dispatcher.cost_model.update(adapter.adapt(graph), objective.seconds_per_node * graph.length)
+    population = [Individual(adapter.adapt(graph)) for graph in graphs]
+    evaluated_population = evaluator(population)
+
+    assert objective.evaluated_lengths == sorted((graph.length for graph in graphs), reverse=True)
+    # population order is kept
+    assert [ind.uid for ind in evaluated_population] == [ind.uid for ind in population]
+    for ind in evaluated_population:
+        assert ind.metadata['predicted_computation_time_in_seconds'] >= 0
+        assert 'computation_time_in_seconds' in ind.metadata
+    assert dispatcher.cost_model.mean_absolute_error is not None
+
+
+def test_batches_are_balanced_by_predicted_cost():
+    adapter = DirectAdapter()
+    population = [Individual(adapter.adapt(graph_first())) for _ in range(4)]
+    dispatcher = SequentialDispatcher(adapter, objective_batch_size=2)
+    dispatcher._cost_scheduler.predicted_costs = dict(zip((ind.uid for ind in population), (4., 3., 2., 1.)))
+
+    batches = dispatcher._split_into_batches(population, n_jobs=2)
+    batch_costs = [sum(dispatcher._cost_scheduler.predicted_costs[ind.uid] for ind in batch) for batch in batches]
+    assert batch_costs == [5., 5.]
@@ -0,0 +1,107 @@
+import datetime
+import json
+
+import pytest
+from joblib import cpu_count
+
+from golem.core.adapter import DirectAdapter
+from golem.core.optimisers.fitness import SingleObjFitness, null_fitness
+from golem.core.optimisers.genetic.evaluation import MultiprocessingDispatcher, SequentialDispatcher
+from golem.core.optimisers.genetic.evaluation_telemetry import EvaluationTelemetry, JsonLinesTelemetryWriter, \
+    PrometheusTelemetryWriter
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache
+from golem.core.optimisers.opt_history_objects.individual import GraphEvalResult, Individual
+from golem.core.optimisers.opt_history_objects.parent_operator import ParentOperator
+from test.unit.utils import graph_first, graph_second, graph_third
+
+
+def length_objective(graph):
+    return SingleObjFitness(-graph.length)
+
+
+def get_population():
+    adapter = DirectAdapter()
+    return [Individual(adapter.adapt(graph)) for graph in (graph_first(), graph_second(), graph_third())]
+
+
+def test_telemetry_collects_evaluation_results():
+    started_at = datetime.datetime(2024, 1, 1)
+    parent = Individual(graph_first())
+    individuals = [Individual(graph_first(), parent_operator=ParentOperator('mutation', ['simple'], [parent]))
+                   for _ in range(5)]
+    finished_at = (started_at + datetime.timedelta(seconds=3)).isoformat()
+    results = [
+        GraphEvalResult(individuals[0].uid, SingleObjFitness(1.), None,
+                        {'computation_time_in_seconds': 1., 'evaluation_time_iso': finished_at}),
+        GraphEvalResult(individuals[1].uid, SingleObjFitness(1.), None,
+                        {'computation_time_in_seconds': 0.02, 'evaluation_time_iso': finished_at}),
+        GraphEvalResult(individuals[2].uid, null_fitness(), None, {'evaluation_timeout': True}),
+        GraphEvalResult(individuals[3].uid, SingleObjFitness(1.), None,
+                        {'computation_time_in_seconds': 5., 'cached_evaluation': True}),
+        None,
+    ]
+    telemetry = EvaluationTelemetry.collect(individuals, results, started_at, wall_time=4., n_jobs=2, ipc_bytes=10)
+
+    assert telemetry.evaluations_num == 5
+    assert telemetry.successful_num == 3
+    assert telemetry.failures_num == 2
+    assert telemetry.timeouts_num == 1
+    assert telemetry.cache_hit_rate == pytest.approx(0.2)
+    assert telemetry.computation_time == pytest.approx(1.02)
+    assert telemetry.worker_utilisation == pytest.approx(1.02 / 8)
+    assert telemetry.queue_wait_time == pytest.approx(2. + 2.98)
+    assert telemetry.computation_time_histogram['0.01'] == 0
+    assert telemetry.computation_time_histogram['0.05'] == 1
+    assert telemetry.computation_time_histogram['+Inf'] == 2
+    assert telemetry.operator_computation_time['mutation:simple'] == (pytest.approx(1.02), 2)
+
+
+def test_dispatcher_reports_telemetry(tmp_path):
+    records = []
+    json_writer = JsonLinesTelemetryWriter(tmp_path / 'telemetry.jsonl')
+    prometheus_writer = PrometheusTelemetryWriter(tmp_path / 'telemetry.prom')
+    dispatcher = SequentialDispatcher(DirectAdapter(), fitness_cache=FitnessCache())
+
+    def report_telemetry(telemetry):
+        records.append(telemetry)
+        json_writer(telemetry)
+        prometheus_writer(telemetry)
+
+    dispatcher.set_telemetry_callback(report_telemetry)
+    evaluator = dispatcher.dispatch(length_objective)
+
+    evaluator(get_population())
+    evaluator(get_population())
+
+    assert len(records) == 2
+    assert records[0].successful_num == records[1].successful_num == 3
+    assert records[0].cached_num == 0
+    assert records[1].cache_hit_rate == 1.
+
+    lines = (tmp_path / 'telemetry.jsonl').read_text().splitlines()
+    assert [json.loads(line)['cache_hit_rate'] for line in lines] == [0., 1.]
+    prometheus_text = (tmp_path / 'telemetry.prom').read_text()
+    assert '# TYPE golem_evaluation_computation_seconds histogram' in prometheus_text
+    assert 'golem_evaluation_computation_seconds_bucket{le="+Inf"} 0' in prometheus_text
+    assert 'golem_evaluation_cache_hit_rate 1.0' in prometheus_text
+
+
+@pytest.mark.skipif(cpu_count() < 2, reason='Pool of workers is used only with several CPUs')
+@pytest.mark.parametrize('count_ipc_bytes', [False, True])
+def test_ipc_bytes_are_counted_on_demand(count_ipc_bytes):
+    records = []
+    dispatcher = MultiprocessingDispatcher(DirectAdapter(), n_jobs=2)
+    dispatcher.set_telemetry_callback(records.append, count_ipc_bytes=count_ipc_bytes)
+    dispatcher.dispatch(length_objective)(get_population())
+    dispatcher.shutdown()
+
+    assert len(records) == 1
+    assert (records[0].ipc_bytes > 0) == count_ipc_bytes
+
+
+def test_prometheus_export_keeps_generation_out_of_labels():
+    telemetry = EvaluationTelemetry(generation_num=3, evaluations_num=2)
+    prometheus_text = telemetry.to_prometheus()
+    assert 'golem_evaluation_generation 3' in prometheus_text
+    assert 'golem_evaluation_individuals 2' in prometheus_text
+    assert 'generation="' not in prometheus_text
@@ -0,0 +1,169 @@
+import threading
+from functools import partial
+
+import numpy as np
+
+from golem.core.adapter import DirectAdapter
+from golem.core.optimisers.fitness import Fitness, SingleObjFitness
+from golem.core.optimisers.genetic.evaluation import SequentialDispatcher
+from golem.core.optimisers.genetic.fitness_cache import FitnessCache, objective_fingerprint
+from golem.core.optimisers.objective import Objective, ObjectiveEvaluate
+from golem.core.optimisers.opt_history_objects.individual import Individual
+from test.unit.utils import graph_first, graph_second, graph_third
+
+
+class CountingObjective:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, graph) -> Fitness:
+        self.calls += 1
+        return SingleObjFitness(graph.length)
+
+
+def test_fitness_cache_lru_eviction():
+    cache = FitnessCache(maxsize=2)
+    graphs = [graph_first(), graph_second(), graph_third()]
+    keys = [cache.key(graph) for graph in graphs]
+    for key, graph in zip(keys, graphs):
+        cache.put(key, SingleObjFitness(graph.length))
+
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2])[0] == SingleObjFitness(graphs[2].length)
+    assert cache.hits == 1 and cache.misses == 1
+
+
+def test_fitness_cache_same_key_for_identical_structures():
+    cache = FitnessCache()
+    assert cache.key(graph_first()) == cache.key(graph_first())
+    assert cache.key(graph_first()) != cache.key(graph_second())
+
+
+def test_fitness_cache_on_disk_store(tmp_path):
+    path = tmp_path / 'fitness_cache'
+    graph = graph_first()
+    cache = FitnessCache(path=path)
+    cache.put(cache.key(graph), SingleObjFitness(1.), {'computation_time_in_seconds': 1.})
+    cache.close()
+
+    restored_cache = FitnessCache(path=path)
+    fitness, metadata = restored_cache.get(restored_cache.key(graph))
+    restored_cache.close()
+    assert fitness == SingleObjFitness(1.)
+    assert metadata['computation_time_in_seconds'] == 1.
+
+
+def graph_length(graph) -> float:
+    return graph.length
+
+
+def graph_depth(graph) -> float:
+    return graph.depth
+
+
+def test_objective_fingerprint():
+    objective = ObjectiveEvaluate(Objective({'length': graph_length}))
+    assert objective_fingerprint(objective) == objective_fingerprint(
+        ObjectiveEvaluate(Objective({'length': graph_length})))
+    assert objective_fingerprint(objective.evaluate) == objective_fingerprint(
+        ObjectiveEvaluate(Objective({'length': graph_length})).evaluate)
+    assert objective_fingerprint(objective) != objective_fingerprint(
+        ObjectiveEvaluate(Objective({'length': graph_depth})))
+    assert objective_fingerprint(objective) != objective_fingerprint(
+        ObjectiveEvaluate(Objective({'length': graph_length}, complexity_metrics={'depth': graph_depth})))
+
+
+def test_fitness_cache_on_disk_store_is_shared_by_objectives(tmp_path):
+    path = tmp_path / 'fitness_cache'
+    graph = graph_first()
+    objective = ObjectiveEvaluate(Objective({'length': graph_length}))
+    other_objective = ObjectiveEvaluate(Objective({'depth': graph_depth}))
+
+    cache = FitnessCache(path=path)
+    cache.set_objective(objective.evaluate)
+    cache.put(cache.key(graph), SingleObjFitness(1.))
+    cache.close()
+
+    for cache_objective, fingerprint, is_cached in ((objective, None, True),
+                                                    (other_objective, None, False),
+                                                    (objective, 'other data', False)):
+        restored_cache = FitnessCache(path=path, fingerprint=fingerprint)
+        restored_cache.set_objective(cache_objective.evaluate)
+        assert (restored_cache.get(restored_cache.key(graph)) is not None) == is_cached
+        restored_cache.close()
+
+
+def test_dispatcher_does_not_reevaluate_duplicates():
+    adapter = DirectAdapter()
+    objective = CountingObjective()
+    dispatcher = SequentialDispatcher(adapter, fitness_cache=FitnessCache())
+    evaluator = dispatcher.dispatch(objective)
+
+    population = [Individual(adapter.adapt(graph)) for graph in (graph_first(), graph_first(), graph_second())]
+    evaluated = evaluator(population)
+    assert len(evaluated) == len(population)
+    assert objective.calls == 2
+
+    next_population = [Individual(adapter.adapt(graph)) for graph in (graph_second(), graph_third())]
+    evaluated = evaluator(next_population)
+    assert len(evaluated) == len(next_population)
+    assert objective.calls == 3
+    assert all(ind.fitness.valid for ind in evaluated)
+    assert next_population[0].metadata['cached_evaluation']
+
+
+def graph_distance(graph, data) -> float:
+    return float(np.sum(data)) - graph.length
+
+
+def test_objective_fingerprint_reflects_objective_data():
+    zeros_objective = Objective({'distance': partial(graph_distance, data=np.zeros(3))})
+    ones_objective = Objective({'distance': partial(graph_distance, data=np.ones(3))})
+    assert objective_fingerprint(zeros_objective) == objective_fingerprint(
+        Objective({'distance': partial(graph_distance, data=np.zeros(3))}))
+    assert objective_fingerprint(zeros_objective) != objective_fingerprint(ones_objective)
+
+    assert objective_fingerprint(lambda graph: graph.length) != objective_fingerprint(lambda graph: graph.depth)
+
+    def closure_metric(data):
+        return lambda graph: float(np.sum(data))
+
+    assert objective_fingerprint(closure_metric(np.zeros(3))) != objective_fingerprint(closure_metric(np.ones(3)))
+
+
+def test_fitness_cache_does_not_store_not_fingerprinted_objective(tmp_path):
+    path = tmp_path / 'fitness_cache'
+    graph = graph_first()
+    # lock can't be pickled, so the objective can't be fingerprinted
+    objective = partial(graph_distance, data=threading.Lock())
+    assert objective_fingerprint(objective) is None
+
+    cache = FitnessCache(path=path)
+    cache.set_objective(objective)
+    cache.put(cache.key(graph), SingleObjFitness(1.))
+    assert cache.get(cache.key(graph)) is not None
+    cache.close()
+
+    restored_cache = FitnessCache(path=path)
+    restored_cache.set_objective(objective)
+    assert restored_cache.get(restored_cache.key(graph)) is None
+    restored_cache.close()
+
+
+class MetricsObjective:
+    # objects don't have the default __getstate__ before Python 3.11
+    __getstate__ = None
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def __call__(self, graph) -> Fitness:
+        return SingleObjFitness(*(metric(graph) for metric in self.metrics))
+
+
+def test_objective_fingerprint_without_getstate():
+    assert objective_fingerprint(MetricsObjective([graph_length])) == objective_fingerprint(
+        MetricsObjective([graph_length]))
+    assert objective_fingerprint(MetricsObjective([graph_length])) != objective_fingerprint(
+        MetricsObjective([graph_depth]))
@@ -4,7 +4,7 @@ from golem.core.optimisers.archive import GenerationKeeper
 from golem.core.optimisers.fitness import Fitness, MultiObjFitness, null_fitness
 from golem.core.optimisers.genetic.operators.operator import PopulationT
 from golem.core.optimisers.graph import OptGraph, OptNode
-from golem.core.optimisers.objective import Objective
+from golem.core.optimisers.objective import MultiFidelityObjective, Objective
 from golem.core.optimisers.opt_history_objects.individual import Individual
 from test.unit.utils import RandomMetric, DepthMetric
 
@@ -74,3 +74,30 @@ def test_archive_multiobj_one_improvement():
     assert len(archive.best_individuals) == previous_size + 1
     assert archive.is_complexity_improved
     assert not archive.is_quality_improved
+
+
+def test_archive_update_before_generation_end():
+    archive = generation_keeper(population1())
+    for individual in population2():
+        archive.update_archive([individual])
+    # best individuals are available before the generation is finished
+    assert len(archive.best_individuals) == 3
+    assert archive.generation_num == 1
+
+    archive.append(population2())
+    # improvement is computed relative to the archive of the previous generation
+    assert archive.is_any_improved
+    assert archive.is_complexity_improved
+    assert archive.generation_num == 2
+
+
+def test_archive_with_multi_fidelity_objective():
+    objective = MultiFidelityObjective(quality_metrics={'random_metric': RandomMetric.get_value},
+                                       fidelities=(0.5, 1.))
+    population = create_population([MultiObjFitness([1.], weights=-1), MultiObjFitness([2.], weights=-1)])
+    for individual, fidelity in zip(population, objective.fidelities):
+        individual.metadata['evaluation_fidelity'] = fidelity
+    archive = GenerationKeeper(objective, keep_n_best=2, initial_generation=population)
+
+    # individuals evaluated at the lower fidelity are not compared with the others
+    assert [ind.uid for ind in archive.best_individuals] == [population[1].uid]
@@ -0,0 +1,130 @@
+import pickle
+import threading
+import time
+
+from golem.core.optimisers.objective import BatchObjective, MultiFidelityObjective, Objective
+from test.unit.utils import graph_first, graph_second
+
+
+class RecordingMetric:
+    def __init__(self, name: str, calls: list, value: float = 1., delay: float = 0.):
+        self.name = name
+        self.calls = calls
+        self.value = value
+        self.delay = delay
+
+    def __call__(self, graph) -> float:
+        self.calls.append(self.name)
+        time.sleep(self.delay)
+        return self.value
+
+
+def test_objective_evaluates_cheap_metrics_first():
+    calls = []
+    objective = Objective(quality_metrics={'quality': RecordingMetric('quality', calls, value=0.5)},
+                          complexity_metrics={'size': RecordingMetric('size', calls, value=7.)},
+                          is_multi_objective=True,
+                          metric_costs={'size': 0.01, 'quality': 10.})
+
+    fitness = objective(graph_first())
+    assert calls == ['size', 'quality']
+    # fitness values keep the order of the metrics
+    assert fitness.values == (0.5, 7.)
+
+
+def test_objective_rejects_graph_before_expensive_metrics():
+    calls = []
+    objective = Objective(quality_metrics={'quality': RecordingMetric('quality', calls)},
+                          complexity_metrics={'size': lambda graph: graph.length},
+                          is_multi_objective=True,
+                          metric_costs={'size': 0.01},
+                          rejection_predicate=lambda metrics: metrics['size'] > graph_first().length)
+
+    assert objective(graph_first()).valid
+    assert calls == ['quality']
+    assert not objective(graph_second()).valid
+    assert calls == ['quality'], 'Expensive metric must not be evaluated for the rejected graph'
+
+    objective.rejection_penalty = 100.
+    fitness = objective(graph_second())
+    assert fitness.valid
+    assert fitness.values == (100., graph_second().length)
+
+
+def test_objective_evaluates_expensive_metrics_concurrently():
+    calls = []
+    threads = set()
+
+    def expensive_metric(graph):
+        threads.add(threading.get_ident())
+        time.sleep(0.2)
+        return 1.
+
+    objective = Objective(quality_metrics={'first': expensive_metric, 'second': expensive_metric},
+                          complexity_metrics={'size': RecordingMetric('size', calls)},
+                          is_multi_objective=True,
+                          metric_costs={'size': 0.01},
+                          metrics_n_jobs=-1)
+    fitness = objective(graph_first())
+    assert fitness.valid
+    assert len(threads) == 2
+
+
+def parallel_metric(graph) -> float:
+    return float(threading.get_ident())
+
+
+def test_objective_reuses_metric_threads():
+    objective = Objective(quality_metrics={'first': parallel_metric, 'second': parallel_metric},
+                          is_multi_objective=True, metrics_n_jobs=2)
+    threads = set()
+    for _ in range(5):
+        threads.update(objective(graph_first()).values)
+    assert len(threads) <= 2
+
+    # thread pool isn't pickled with the objective
+    objective_copy = pickle.loads(pickle.dumps(objective))
+    assert objective_copy(graph_first()).valid
+    assert objective_copy._metrics_executor is not objective._metrics_executor
+
+
+def test_objective_with_failed_metric_in_parallel():
+    def failed_metric(graph):
+        raise ValueError('Metric failed')
+
+    objective = Objective(quality_metrics={'first': lambda graph: 1., 'second': failed_metric},
+                          is_multi_objective=True, metrics_n_jobs=2)
+    assert not objective(graph_first()).valid
+
+
+def test_batch_objective_rejects_graphs_before_expensive_metrics():
+    batches = []
+
+    def expensive_metric(graphs):
+        batches.append([graph.length for graph in graphs])
+        return [1.] * len(graphs)
+
+    objective = BatchObjective(quality_metrics={'quality': expensive_metric},
+                               complexity_metrics={'size': lambda graphs: [graph.length for graph in graphs]},
+                               is_multi_objective=True,
+                               metric_costs={'size': 0.01},
+                               rejection_predicate=lambda metrics: metrics['size'] > graph_first().length,
+                               rejection_penalty=100.)
+
+    fitnesses = objective.evaluate_batch([graph_first(), graph_second()])
+    assert batches == [[graph_first().length]], 'Expensive metric must not be evaluated for the rejected graph'
+    assert fitnesses[0].values == (1., graph_first().length)
+    assert fitnesses[1].values == (100., graph_second().length)
+
+
+def test_multi_fidelity_objective_rejects_graph():
+    calls = []
+    objective = MultiFidelityObjective(quality_metrics={'quality': lambda graph, fidelity: calls.append(fidelity)},
+                                       complexity_metrics={'size': lambda graph, fidelity: graph.length},
+                                       is_multi_objective=True,
+                                       fidelities=(0.5, 1.),
+                                       metric_costs={'size': 0.01},
+                                       rejection_predicate=lambda metrics: metrics['size'] > graph_first().length)
+
+    assert not objective(graph_second(), fidelity=0.5).valid
+    assert not calls
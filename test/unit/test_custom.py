@@ -86,3 +86,131 @@ def test_custom_graph_opt():
     assert isinstance(optimized_network, CustomModel)
     assert isinstance(optimized_network.nodes[0], CustomNode)
     assert optimized_network.length > 1
+
+
+def test_custom_graph_opt_asynchronous_evaluation():
+    requirements = GraphRequirements(num_of_generations=3, show_progress=False)
+    optimiser_parameters = GPAlgorithmParameters(
+        pop_size=5,
+        asynchronous_evaluation=True,
+        evaluations_in_flight=2,
+        mutation_types=[MutationTypesEnum.simple, MutationTypesEnum.growth])
+    graph_generation_params = GraphGenerationParams(
+        adapter=DirectAdapter(CustomModel, CustomNode),
+        rules_for_constraint=[has_no_self_cycled_nodes],
+        node_factory=DefaultOptNodeFactory(available_node_types=['A', 'B', 'C', 'D']))
+
+    objective = Objective({'custom': custom_metric})
+    initial_graphs = [graph_first(), graph_second(), graph_third(), graph_fourth(), graph_fifth()]
+    optimiser = EvoGraphOptimizer(
+        graph_generation_params=graph_generation_params,
+        objective=objective,
+        graph_optimizer_params=optimiser_parameters,
+        requirements=requirements,
+        initial_graphs=graph_generation_params.adapter.adapt(initial_graphs))
+    optimized_graphs = optimiser.optimise(ObjectiveEvaluate(objective))
+
+    assert optimiser.current_generation_num >= 3
+    assert len(optimiser.population) <= optimiser_parameters.pop_size
+    assert all(ind.fitness.valid for ind in optimiser.population)
+    assert optimiser.reproducer.evaluation_throughput is not None
+    assert optimized_graphs
+
+
+def test_custom_graph_opt_pipelined_evaluation():
+    requirements = GraphRequirements(num_of_generations=3, show_progress=False)
+    optimiser_parameters = GPAlgorithmParameters(
+        pop_size=5,
+        pipelined_evaluation=True,
+        mutation_types=[MutationTypesEnum.simple, MutationTypesEnum.growth])
+    graph_generation_params = GraphGenerationParams(
+        adapter=DirectAdapter(CustomModel, CustomNode),
+        rules_for_constraint=[has_no_self_cycled_nodes],
+        node_factory=DefaultOptNodeFactory(available_node_types=['A', 'B', 'C', 'D']))
+
+    objective = Objective({'custom': custom_metric})
+    initial_graphs = [graph_first(), graph_second(), graph_third(), graph_fourth(), graph_fifth()]
+    optimiser = EvoGraphOptimizer(
+        graph_generation_params=graph_generation_params,
+        objective=objective,
+        graph_optimizer_params=optimiser_parameters,
+        requirements=requirements,
+        initial_graphs=graph_generation_params.adapter.adapt(initial_graphs))
+    reconciled_offspring = []
+    reconcile_speculative_offspring = optimiser._reconcile_speculative_offspring
+
+    def reconcile(population):
+        reconciled = reconcile_speculative_offspring(population)
+        reconciled_offspring.extend(reconciled.values())
+        return reconciled
+
+    optimiser._reconcile_speculative_offspring = reconcile
+    optimized_graphs = optimiser.optimise(ObjectiveEvaluate(objective))
+
+    assert optimiser.current_generation_num >= 3
+    assert all(ind.fitness.valid for ind in optimiser.population)
+    # reconciled speculative offspring are evaluated by the time generation is finished
+    assert all(ind.fitness.valid for ind in reconciled_offspring)
+    assert optimiser.reproducer.evaluation_throughput is not None
+    assert optimized_graphs
+
+
+def test_speculative_mutation_experience_is_kept_for_accepted_offspring():
+    optimiser_parameters = GPAlgorithmParameters(pop_size=5, pipelined_evaluation=True,
+                                                 mutation_types=[MutationTypesEnum.simple])
+    graph_generation_params = GraphGenerationParams(
+        adapter=DirectAdapter(CustomModel, CustomNode),
+        rules_for_constraint=[has_no_self_cycled_nodes],
+        node_factory=DefaultOptNodeFactory(available_node_types=['A', 'B', 'C', 'D']))
+    objective = Objective({'custom': custom_metric})
+    initial_graphs = [graph_first(), graph_second(), graph_third(), graph_fourth(), graph_fifth()]
+    optimiser = EvoGraphOptimizer(
+        graph_generation_params=graph_generation_params,
+        objective=objective,
+        graph_optimizer_params=optimiser_parameters,
+        requirements=GraphRequirements(n_jobs=8, show_progress=False),
+        initial_graphs=graph_generation_params.adapter.adapt(initial_graphs))
+    optimiser.eval_dispatcher.dispatch(ObjectiveEvaluate(objective))
+    population = optimiser.eval_dispatcher.evaluate_population(optimiser.initial_individuals)
+
+    def produce_failed_mutations(individuals, offspring_num):
+        # mutation that isn't applied records the negative experience for its source individual
+        for individual in individuals:
+            optimiser.mutation.agent_experience.collect_experience(individual, MutationTypesEnum.simple, -1.)
+        return []
+
+    optimiser.reproducer.produce_offspring = produce_failed_mutations
+    with optimiser.timer:
+        optimiser._speculate_offspring(population, generation_in_flight_num=0)
+    assert len(optimiser.mutation.agent_experience) == 0, 'Speculative experience must be kept aside'
+
+    optimiser._reconcile_speculative_offspring(population[:2])
+    assert len(optimiser.mutation.agent_experience) == 2
+
+
+def test_custom_graph_opt_evaluation_telemetry():
+    requirements = GraphRequirements(num_of_generations=2, show_progress=False)
+    optimiser_parameters = GPAlgorithmParameters(pop_size=5, mutation_types=[MutationTypesEnum.simple])
+    graph_generation_params = GraphGenerationParams(
+        adapter=DirectAdapter(CustomModel, CustomNode),
+        rules_for_constraint=[has_no_self_cycled_nodes],
+        node_factory=DefaultOptNodeFactory(available_node_types=['A', 'B', 'C', 'D']))
+
+    objective = Objective({'custom': custom_metric})
+    initial_graphs = [graph_first(), graph_second(), graph_third(), graph_fourth(), graph_fifth()]
+    optimiser = EvoGraphOptimizer(
+        graph_generation_params=graph_generation_params,
+        objective=objective,
+        graph_optimizer_params=optimiser_parameters,
+        requirements=requirements,
+        initial_graphs=graph_generation_params.adapter.adapt(initial_graphs))
+    telemetry_records = []
+    optimiser.set_evaluation_telemetry_callback(telemetry_records.append)
+    optimiser.optimise(ObjectiveEvaluate(objective))
+
+    assert telemetry_records
+    assert telemetry_records[0].generation_num == 0
+    generation_nums = [record.generation_num for record in telemetry_records]
+    assert generation_nums == sorted(generation_nums)
+    assert generation_nums[-1] > 0
+    assert all(record.evaluations_num > 0 for record in telemetry_records)
@@ -1,4 +1,5 @@
 import time
+from copy import deepcopy
 from numbers import Number
 from random import randint
 from typing import Sequence, Optional, List, Callable
@@ -21,6 +22,28 @@ def graphs_same(left: Graph, right: Graph) -> bool:
     return left == right
 
 
+def graph_state(graph: Graph) -> list:
+    """Returns snapshot of the graph nodes, their contents and edges to check that the graph isn't modified."""
+    return [(node, node.uid, deepcopy(node.content), list(node.nodes_from)) for node in graph.nodes]
+
+
+def with_nested_params(graph: Graph) -> Graph:
+    """Sets the parameters with mutable values to the graph nodes."""
+    for node in graph.nodes:
+        node.content['params'] = {'weights': [1., 2.], 'options': {'depth': 1}}
+    return graph
+
+
+def modify_nested_params(graph: Graph):
+    """Modifies the mutable parameters values of the graph nodes in place."""
+    for node in graph.nodes:
+        params = node.content.get('params') or {}
+        if 'weights' in params:
+            params['weights'].append(3.)
+        if 'options' in params:
+            params['options']['depth'] += 1
+
+
 def find_same_node(nodes: List[GraphNode], target: GraphNode) -> Optional[GraphNode]:
     return next(filter(lambda n: n.descriptive_id == target.descriptive_id, nodes), None)
 